@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Pixel conformance and throughput of the sprite_raster backends.
+
+Conformance renders every sprite that draws through ScaledDraw (blocks,
+decorations, river tiles and the spec sprites in scripts/specs) at each
+scale with every backend, and compares the result with the Pillow render:
+- differing - fraction of pixels whose RGBA differs at all
+- coverage  - alpha IoU, sum(min(a, b)) / sum(max(a, b)) over alpha
+
+A backend passes when every sprite stays within its TOLERANCES entry. The
+non-antialiased numpy backend follows Pillow's rasterization rules, so its
+limits are tight (ellipse edges are the only approximation). numpy-aa is
+judged on coverage alone, since antialiased edges differ from Pillow by
+design.
+
+Throughput renders the same sprite set repeatedly per backend and scale and
+reports sprites per second.
+
+Exits with status 1 if any backend fails conformance.
+
+Usage: python3 scripts/check_raster_backends.py [--scales 1 2 4] [--backends numpy numpy-aa]
+       [--runs 3] [--no-benchmark] [--verbose]
+"""
+
+from sprite_catalog import sprite_catalog, sprite_call
+from sprite_spec import spec_sprites
+import numpy as np
+import argparse
+import glob
+import os
+import sprite_raster
+import sys
+import time
+
+SPEC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "specs")
+REFERENCE = "pillow"
+BENCHMARK_RUNS = 3
+
+# backend -> (max differing pixel fraction, min alpha coverage IoU) per sprite
+TOLERANCES = {
+    "numpy": (0.01, 0.99),
+    "numpy-aa": (1.0, 0.85),
+}
+
+
+def scaled_sprites() -> dict:
+    """Map label -> callable(scale) for every sprite drawn through ScaledDraw."""
+    sprites = {}
+    for (asset, theme), entry in sprite_catalog().items():
+        if entry["scalable"]:
+            sprites[f"{theme or 'blocks'}/{asset}"] = \
+                lambda scale, entry=entry: sprite_call(entry, scale=scale)()
+    for path in sorted(glob.glob(os.path.join(SPEC_DIR, "*.json"))):
+        spec = os.path.splitext(os.path.basename(path))[0]
+        for name, render in spec_sprites(path).items():
+            sprites[f"spec:{spec}/{name}"] = render
+    return sprites
+
+
+def render(create, scale: float, backend: str) -> np.ndarray:
+    sprite_raster.use_backend(backend)
+    return np.asarray(create(scale).convert('RGBA')).astype(np.int16)
+
+
+def compare(reference: np.ndarray, candidate: np.ndarray) -> tuple:
+    """(differing pixel fraction, alpha coverage IoU) of two RGBA arrays."""
+    differing = float(np.any(reference != candidate, axis=-1).mean())
+    a, b = reference[..., 3], candidate[..., 3]
+    union = np.maximum(a, b).sum()
+    coverage = float(np.minimum(a, b).sum() / union) if union else 1.0
+    return differing, coverage
+
+
+def check_conformance(sprites: dict, backends: list, scales: list, verbose: bool) -> bool:
+    print(f"Conformance against {REFERENCE} ({len(sprites)} sprites x {len(scales)} scales)")
+    passed = True
+    for backend in backends:
+        max_differing, min_coverage = TOLERANCES[backend]
+        results, failures = [], []
+        for label, create in sprites.items():
+            for scale in scales:
+                differing, coverage = compare(render(create, scale, REFERENCE),
+                                              render(create, scale, backend))
+                results.append((differing, coverage))
+                if differing > max_differing or coverage < min_coverage:
+                    failures.append((label, scale, differing, coverage))
+                elif verbose:
+                    print(f"    {label}@{scale:g}x: {differing:.2%} differing, coverage {coverage:.4f}")
+
+        differing = np.array([r[0] for r in results])
+        coverage = np.array([r[1] for r in results])
+        status = "ok" if not failures else f"FAILED ({len(failures)})"
+        print(f"  {backend:9s} {status}: {np.count_nonzero(differing == 0)}/{len(results)} identical, "
+              f"mean {differing.mean():.3%} / worst {differing.max():.3%} differing, "
+              f"worst coverage {coverage.min():.4f}")
+        for label, scale, d, c in failures:
+            print(f"    {label}@{scale:g}x: {d:.2%} differing, coverage {c:.4f}")
+        passed &= not failures
+    sprite_raster.use_backend(REFERENCE)
+    return passed
+
+
+def benchmark(sprites: dict, backends: list, scales: list, runs: int) -> None:
+    """Print sprites per second for every backend and scale (best of `runs`)."""
+    print(f"\nThroughput (sprites/s, best of {runs} passes over {len(sprites)} sprites)")
+    print("  " + f"{'backend':9s}" + "".join(f"{f'{scale:g}x':>10s}" for scale in scales))
+    for backend in [REFERENCE] + backends:
+        sprite_raster.use_backend(backend)
+        row = []
+        for scale in scales:
+            best = float("inf")
+            for _ in range(runs):
+                start = time.perf_counter()
+                for create in sprites.values():
+                    create(scale)
+                best = min(best, time.perf_counter() - start)
+            row.append(len(sprites) / best)
+        print("  " + f"{backend:9s}" + "".join(f"{rate:10.1f}" for rate in row))
+    sprite_raster.use_backend(REFERENCE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check raster backends against Pillow and time them.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 2.0, 4.0])
+    parser.add_argument("--backends", nargs="+", default=[b for b in sprite_raster.BACKENDS if b != REFERENCE],
+                        choices=[b for b in sprite_raster.BACKENDS if b != REFERENCE])
+    parser.add_argument("--runs", type=int, default=BENCHMARK_RUNS, help="benchmark passes per backend and scale")
+    parser.add_argument("--no-benchmark", action="store_true", help="only check conformance")
+    parser.add_argument("--verbose", action="store_true", help="print every sprite's result")
+    args = parser.parse_args()
+
+    sprites = scaled_sprites()
+    passed = check_conformance(sprites, args.backends, args.scales, args.verbose)
+    if not args.no_benchmark:
+        benchmark(sprites, args.backends, args.scales, args.runs)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""Pack generated sprites into one memory-mappable archive per theme.
+
+Loading a theme opens dozens of loose PNGs (plus Godot .import sidecars).
+This stage gathers every generated file for a theme into a single archive
+whose index can be binary-searched straight from a memory map, with no
+parsing step:
+- assets/packs/<theme>.pack  - assets/sprites/terrain/<theme>/** and the
+                               theme's background from terrain.json
+- assets/packs/blocks.pack   - assets/sprites/blocks/**
+
+Entries are named by their path relative to assets/sprites/, e.g.
+"terrain/earth/bush.png" for res://assets/sprites/terrain/earth/bush.png.
+Payloads are stored as they are on disk (PNG, JSON, masks), not re-encoded.
+
+Pack layout (little-endian):
+- header (32 bytes): magic b"ARPK", u16 version, u16 reserved,
+  u32 entry_count, u32 index_offset, u32 names_offset, u32 data_offset,
+  8 bytes zero padding
+- index: entry_count INDEX_DTYPE records (32 bytes each) sorted by
+  hash - u64 FNV-1a of the utf-8 name, u64 payload offset, u32 size,
+  u32 crc32, u32 name offset, u16 name length, u16 pad
+- names: utf-8 names, concatenated, referenced from the index
+- payloads: each starts on a 16-byte boundary
+
+Lookup: hash the name, binary-search the hash column, then compare names
+to rule out collisions (equal hashes are adjacent).
+
+Usage: python3 scripts/generate_asset_packs.py [earth mars ...] [--benchmark [N]]
+"""
+
+from sprite_profile import trace_generator, trace_stage
+import numpy as np
+import argparse
+import json
+import mmap
+import os
+import statistics
+import struct
+import time
+import zlib
+
+TERRAIN_CONFIG = "data/terrain.json"
+SPRITES_ROOT = "assets/sprites"
+OUTPUT_DIR = "assets/packs"
+
+PACK_MAGIC = b"ARPK"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<4sHxxIIII8x")
+PAYLOAD_ALIGN = 16
+INDEX_DTYPE = np.dtype([
+    ("hash", "<u8"),
+    ("offset", "<u8"),
+    ("size", "<u4"),
+    ("crc32", "<u4"),
+    ("name_offset", "<u4"),
+    ("name_length", "<u2"),
+    ("pad", "<u2"),
+])
+
+SKIPPED_SUFFIXES = (".import", ".pack")
+BENCHMARK_RUNS = 20
+
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+
+
+def name_hash(name: str) -> int:
+    """64-bit FNV-1a of the utf-8 name."""
+    h = FNV_OFFSET
+    for byte in name.encode():
+        h = ((h ^ byte) * FNV_PRIME) & 0xFFFFFFFFFFFFFFFF
+    return h
+
+
+def _align(offset: int, alignment: int) -> int:
+    return offset + (-offset % alignment)
+
+
+def collect_files(directory: str, root: str = SPRITES_ROOT) -> dict:
+    """Map pack name -> file path for every generated file under `directory`."""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(SKIPPED_SUFFIXES) or filename.startswith("."):
+                continue
+            path = os.path.join(dirpath, filename)
+            files[os.path.relpath(path, root).replace(os.sep, "/")] = path
+    return files
+
+
+def pack_sources(config_path: str = TERRAIN_CONFIG) -> dict:
+    """Map pack name -> {entry name: path} for each theme plus blocks."""
+    with open(config_path) as f:
+        themes = json.load(f)["themes"]
+
+    packs = {}
+    for theme, data in themes.items():
+        files = collect_files(os.path.join(SPRITES_ROOT, "terrain", theme))
+        background = os.path.join(SPRITES_ROOT, "terrain", "backgrounds", data.get("background") or "")
+        if os.path.isfile(background):
+            files[os.path.relpath(background, SPRITES_ROOT).replace(os.sep, "/")] = background
+        packs[theme] = files
+    packs["blocks"] = collect_files(os.path.join(SPRITES_ROOT, "blocks"))
+    return packs
+
+
+@trace_stage
+def write_pack(path: str, files: dict) -> int:
+    """Write a pack of {entry name: file path}. Returns the pack size in bytes."""
+    names = sorted(files, key=name_hash)
+    encoded_names = [name.encode() for name in names]
+    payloads = []
+    for name in names:
+        with open(files[name], "rb") as f:
+            payloads.append(f.read())
+
+    index_offset = PACK_HEADER.size
+    names_offset = index_offset + INDEX_DTYPE.itemsize * len(names)
+    data_offset = _align(names_offset + sum(len(n) for n in encoded_names), PAYLOAD_ALIGN)
+
+    index = np.zeros(len(names), dtype=INDEX_DTYPE)
+    name_offset, offset = names_offset, data_offset
+    for i, (name, encoded, payload) in enumerate(zip(names, encoded_names, payloads)):
+        index[i] = (name_hash(name), offset, len(payload), zlib.crc32(payload),
+                    name_offset, len(encoded), 0)
+        name_offset += len(encoded)
+        offset = _align(offset + len(payload), PAYLOAD_ALIGN)
+
+    with open(path, "wb") as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(names), index_offset, names_offset, data_offset))
+        f.write(index.tobytes())
+        f.write(b"".join(encoded_names))
+        f.write(b"\0" * (data_offset - names_offset - sum(len(n) for n in encoded_names)))
+        for payload in payloads:
+            f.write(payload)
+            f.write(b"\0" * (-len(payload) % PAYLOAD_ALIGN))
+        return f.tell()
+
+
+class AssetPack:
+    """Memory-mapped reader for a .pack file.
+
+    Opening maps the file and views the index in place; nothing is parsed
+    or copied. get() returns a zero-copy memoryview of the payload.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, index_offset, names_offset, _ = PACK_HEADER.unpack_from(self._map, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            self.close()
+            raise ValueError(f"{path}: not a version {PACK_VERSION} asset pack")
+        self.index = np.frombuffer(self._map, dtype=INDEX_DTYPE, count=count, offset=index_offset)
+        self._hashes = self.index["hash"]
+
+    def _name(self, entry) -> bytes:
+        start = int(entry["name_offset"])
+        return self._map[start:start + int(entry["name_length"])]
+
+    def find(self, name: str) -> int:
+        """Index row of `name`, or -1 if it is not in the pack."""
+        h = name_hash(name)
+        encoded = name.encode()
+        row = int(np.searchsorted(self._hashes, np.uint64(h)))
+        while row < len(self.index) and self._hashes[row] == h:
+            if self._name(self.index[row]) == encoded:
+                return row
+            row += 1
+        return -1
+
+    def get(self, name: str) -> memoryview:
+        """Payload bytes of `name`; raises KeyError if missing.
+
+        The view points into the mapped pack. Release it (view.release() or
+        del) before close(), or the mapping stays open until it is collected.
+        """
+        row = self.find(name)
+        if row < 0:
+            raise KeyError(name)
+        offset, size = int(self.index[row]["offset"]), int(self.index[row]["size"])
+        return memoryview(self._map)[offset:offset + size]
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) >= 0
+
+    def names(self) -> list:
+        return [self._name(entry).decode() for entry in self.index]
+
+    def verify(self) -> list:
+        """Names whose payload no longer matches its stored crc32."""
+        return [name for name, entry in zip(self.names(), self.index)
+                if zlib.crc32(self.get(name)) != entry["crc32"]]
+
+    def close(self) -> None:
+        # Drop array views first; mmap refuses to close while exported
+        self.index = self._hashes = None
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # A get() view is still alive; the map closes when it is collected
+        self._file.close()
+
+    def __enter__(self) -> "AssetPack":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _evict(paths: list) -> None:
+    """Ask the OS to drop cached pages so loads start cold (best effort)."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        with open(path, "rb") as f:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def benchmark(pack_path: str, files: dict, runs: int) -> None:
+    """Time loading every asset from loose files vs from the pack."""
+    def load_loose() -> int:
+        total = 0
+        for path in files.values():
+            with open(path, "rb") as f:
+                total += len(f.read())
+        return total
+
+    def load_pack() -> int:
+        with AssetPack(pack_path) as pack:
+            total = 0
+            for name in files:
+                payload = pack.get(name)
+                total += len(bytes(payload))
+                payload.release()
+            return total
+
+    def median_ms(load, paths: list) -> float:
+        samples = []
+        for _ in range(runs):
+            _evict(paths)
+            start = time.perf_counter()
+            load()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    loose_ms = median_ms(load_loose, list(files.values()))
+    pack_ms = median_ms(load_pack, [pack_path])
+    print(f"    loose: {loose_ms:7.3f} ms  ({len(files)} files)")
+    print(f"    pack:  {pack_ms:7.3f} ms  (1 file, {len(files)} lookups)  {loose_ms / pack_ms:.1f}x")
+
+
+@trace_generator
+def main():
+    parser = argparse.ArgumentParser(description="Pack generated sprites into per-theme archives.")
+    parser.add_argument("packs", nargs="*", help="themes to pack (default: all themes and blocks)")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=BENCHMARK_RUNS, default=0,
+                        help="time cold loads from loose files vs the pack (default 20 runs)")
+    args = parser.parse_args()
+
+    print("Packing generated sprites")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    sources = pack_sources()
+    written = 0
+    for pack_name, files in sources.items():
+        if args.packs and pack_name not in args.packs:
+            continue
+        if not files:
+            print(f"  Skipped {pack_name}: no generated files")
+            continue
+        path = os.path.join(OUTPUT_DIR, f"{pack_name}.pack")
+        size = write_pack(path, files)
+        print(f"  Created {path} ({len(files)} entries, {size} bytes)")
+        written += 1
+        if args.benchmark:
+            benchmark(path, files, args.benchmark)
+
+    print(f"\nGenerated {written} asset packs")
+
+
+if __name__ == "__main__":
+    main()
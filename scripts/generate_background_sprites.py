@@ -8,12 +8,44 @@ Creates theme-specific background images:
 
 These render at z_index -2000 behind everything.
 
-Usage: python3 scripts/generate_background_sprites.py
+With --tiled, each image is split into tiles rendered by a process pool that
+writes into shared memory; the result is the same for any --workers value.
+
+With --skybox, the same skies are rendered for the 3D camera into
+skybox/<name>_<cube|panorama>_<tier>.png: a 3x2 cubemap (faces +X -X +Y /
+-Y +Z -Z) or a 2:1 equirectangular panorama. Tiers set the cube face size
+(low 256, medium 512, high 1024; panoramas are 4x the face size wide).
+
+With --layered, each background is composited from separately cached
+layers (gradient, mountain ranges, haze, nebula, stars). Layers are stored
+as memory-mapped .npy files under .cache/background_layers, keyed by their
+parameters, so only the layers whose parameters changed are rendered again.
+
+With --impostor, the 3D sandbox's distant scenery (SceneryBuilder skyline
+boxes and mountain cones) is baked into impostors/<preset>_skyline.png: a
+360 degree RGBA strip for one textured cylinder, with a .json holding its
+height mapping.
+
+Usage: python3 scripts/generate_background_sprites.py [--tiled] [--workers N]
+       [--skybox cube|panorama] [--tiers low medium high]
+       [--layered] [--layer-cache DIR] [--impostor [megastructure blank_slate]]
 """
 
 from PIL import Image, ImageDraw
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from sprite_profile import trace_generator, trace_span, trace_sprite, trace_stage
+from sprite_writer import PipelinedWriter
+import numpy as np
+import argparse
+import functools
+import hashlib
+import inspect
+import json
 import random
 import os
+import threading
+import zlib
 
 # Background dimensions (large to cover screen with camera movement)
 BG_WIDTH = 2048
@@ -26,11 +58,55 @@ def hex_to_rgb(hex_color: str) -> tuple:
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 
+@trace_stage(aggregate=True)
 def lerp_color(c1: tuple, c2: tuple, t: float) -> tuple:
     """Linearly interpolate between two RGB colors."""
     return tuple(int(c1[i] + (c2[i] - c1[i]) * t) for i in range(3))
 
 
+# Earth sky colors
+EARTH_SKY_TOP = hex_to_rgb("#4a90d9")      # Deep sky blue
+EARTH_SKY_MID = hex_to_rgb("#87ceeb")      # Sky blue
+EARTH_SKY_HORIZON = hex_to_rgb("#b8d4e8")  # Pale blue-white
+EARTH_HORIZON_Y = int(BG_HEIGHT * 0.75)    # Sky takes top 75%
+
+# Mountain colors
+MOUNTAIN_FAR = hex_to_rgb("#7a8fa8")   # Blue-gray distant
+MOUNTAIN_MID = hex_to_rgb("#5d7a94")   # Darker blue-gray
+
+# Distant mountain ranges, back to front. Farther ranges fade toward
+# the horizon haze; each layer has its own seed.
+EARTH_MOUNTAIN_LAYERS = [
+    {"seed": 101, "base_y": BG_HEIGHT * 0.68, "height": BG_HEIGHT * 0.09,
+     "roughness": 0.50, "color": MOUNTAIN_FAR, "fade": 0.45},
+    {"seed": 202, "base_y": BG_HEIGHT * 0.70, "height": BG_HEIGHT * 0.10,
+     "roughness": 0.55, "color": MOUNTAIN_FAR, "fade": 0.20},
+    {"seed": 303, "base_y": BG_HEIGHT * 0.75, "height": BG_HEIGHT * 0.12,
+     "roughness": 0.60, "color": MOUNTAIN_MID, "fade": 0.0},
+]
+
+# Mars sky colors
+MARS_SKY_TOP = hex_to_rgb("#8b5a3c")       # Brown-orange (upper)
+MARS_SKY_MID = hex_to_rgb("#d4856a")       # Salmon-orange (mid)
+MARS_SKY_HORIZON = hex_to_rgb("#e8b89d")   # Pale peach (horizon)
+MARS_GROUND_FADE = hex_to_rgb("#a0522d")   # Sienna (ground)
+MARS_HAZE = hex_to_rgb("#e8c8a8")
+MARS_HORIZON_Y = int(BG_HEIGHT * 0.7)
+
+# Space colors
+SPACE_BACKGROUND = hex_to_rgb("#0a0a1a")
+NEBULA_COLORS = [
+    hex_to_rgb("#1a1a3a"),  # Deep blue
+    hex_to_rgb("#2a1a2a"),  # Deep purple
+    hex_to_rgb("#1a2a2a"),  # Deep teal
+]
+STAR_WHITE = (255, 255, 255)
+STAR_BLUE = (200, 220, 255)
+STAR_YELLOW = (255, 255, 200)
+STAR_RED = (255, 200, 200)
+STAR_COLORS = [STAR_WHITE] * 7 + [STAR_BLUE] * 2 + [STAR_YELLOW] + [STAR_RED]
+
+
 def create_earth_sky() -> Image.Image:
     """Create Earth sky gradient with distant mountains.
 
@@ -40,17 +116,10 @@ def create_earth_sky() -> Image.Image:
     img = Image.new('RGB', (BG_WIDTH, BG_HEIGHT))
     draw = ImageDraw.Draw(img)
 
-    # Sky gradient colors
-    sky_top = hex_to_rgb("#4a90d9")      # Deep sky blue
-    sky_mid = hex_to_rgb("#87ceeb")      # Sky blue
-    sky_horizon = hex_to_rgb("#b8d4e8")  # Pale blue-white
-
-    # Mountain colors
-    mountain_far = hex_to_rgb("#7a8fa8")   # Blue-gray distant
-    mountain_mid = hex_to_rgb("#5d7a94")   # Darker blue-gray
+    sky_top, sky_mid, sky_horizon = EARTH_SKY_TOP, EARTH_SKY_MID, EARTH_SKY_HORIZON
 
     # Draw sky gradient
-    horizon_y = int(BG_HEIGHT * 0.75)  # Sky takes top 75%
+    horizon_y = EARTH_HORIZON_Y
 
     for y in range(horizon_y):
         # Two-stage gradient: top->mid, mid->horizon
@@ -66,46 +135,68 @@ def create_earth_sky() -> Image.Image:
     # Fill below horizon with horizon color
     draw.rectangle([0, horizon_y, BG_WIDTH, BG_HEIGHT], fill=sky_horizon)
 
-    # Draw distant mountains (silhouette)
-    random.seed(42)  # Deterministic mountains
+    return _draw_mountain_silhouettes(img, EARTH_MOUNTAIN_LAYERS, sky_horizon)
 
-    # Far mountains (lighter, smaller)
-    far_mountain_y = int(BG_HEIGHT * 0.70)
-    _draw_mountain_range(draw, far_mountain_y, BG_HEIGHT * 0.10, mountain_far, 8)
 
-    # Mid mountains (darker, taller)
-    mid_mountain_y = int(BG_HEIGHT * 0.75)
-    _draw_mountain_range(draw, mid_mountain_y, BG_HEIGHT * 0.12, mountain_mid, 6)
+@trace_stage
+def fractal_ridgeline(width: int, seed: int, roughness: float = 0.55,
+                      levels: int = None) -> np.ndarray:
+    """Compute a fractal ridgeline with midpoint displacement.
 
-    return img
+    Returns `width` heights in the range 0..1 (1 = tallest peak). All
+    midpoints of a subdivision level are displaced in one array operation,
+    so the cost is `levels` vector ops regardless of output resolution.
+    `roughness` scales the displacement at each level (higher = more jagged).
+    By default enough levels are used to give one control point per column.
+    """
+    if levels is None:
+        levels = max(1, int(np.ceil(np.log2(max(width - 1, 1)))))
+
+    rng = np.random.default_rng(seed)
+    heights = rng.random(2)
+    scale = 1.0
+
+    for _ in range(levels):
+        midpoints = (heights[:-1] + heights[1:]) * 0.5
+        midpoints += rng.uniform(-scale, scale, midpoints.size)
+        refined = np.empty(heights.size + midpoints.size)
+        refined[0::2] = heights
+        refined[1::2] = midpoints
+        heights = refined
+        scale *= roughness
 
+    heights -= heights.min()
+    peak = heights.max()
+    if peak > 0:
+        heights /= peak
 
-def _draw_mountain_range(draw: ImageDraw, base_y: int, max_height: float,
-                         color: tuple, num_peaks: int) -> None:
-    """Draw a silhouette mountain range."""
-    peak_width = BG_WIDTH // num_peaks
-    points = [(0, BG_HEIGHT)]  # Start bottom-left
+    # Resample the 2^levels + 1 control points to the requested width
+    return np.interp(np.linspace(0, heights.size - 1, width),
+                     np.arange(heights.size), heights)
 
-    for i in range(num_peaks + 1):
-        x = i * peak_width
-        # Vary peak heights
-        height = max_height * (0.5 + random.random() * 0.5)
-        peak_y = base_y - height
 
-        # Add some randomness to peak x position
-        peak_x = x + random.randint(-peak_width//4, peak_width//4)
-        peak_x = max(0, min(BG_WIDTH, peak_x))
+@trace_stage
+def _draw_mountain_silhouettes(img: Image.Image, layers: list,
+                               haze_color: tuple) -> Image.Image:
+    """Fill layered mountain ranges below their ridgelines.
 
-        # Add valley before peak
-        if i > 0:
-            valley_x = x - peak_width // 2
-            valley_y = base_y - height * 0.2
-            points.append((valley_x, valley_y))
+    Each layer dict has seed, base_y, height, roughness, color and fade
+    (0..1 blend toward haze_color for atmospheric perspective). Layers are
+    drawn in order, so list the farthest range first.
+    """
+    pixels = np.asarray(img, dtype=np.uint8).copy()
+    width, height = img.size
+    rows = np.arange(height)[:, None]
+    haze = np.array(haze_color, dtype=np.float64)
 
-        points.append((peak_x, peak_y))
+    for layer in layers:
+        ridge = fractal_ridgeline(width, layer["seed"], layer["roughness"])
+        peak_y = layer["base_y"] - ridge * layer["height"]
+        color = np.array(layer["color"], dtype=np.float64)
+        color += (haze - color) * layer["fade"]
+        pixels[rows >= peak_y[None, :]] = color.astype(np.uint8)
 
-    points.append((BG_WIDTH, BG_HEIGHT))  # End bottom-right
-    draw.polygon(points, fill=color)
+    return Image.fromarray(pixels, 'RGB')
 
 
 def create_mars_sky() -> Image.Image:
@@ -117,14 +208,11 @@ def create_mars_sky() -> Image.Image:
     img = Image.new('RGB', (BG_WIDTH, BG_HEIGHT))
     draw = ImageDraw.Draw(img)
 
-    # Mars sky gradient colors
-    sky_top = hex_to_rgb("#8b5a3c")       # Brown-orange (upper)
-    sky_mid = hex_to_rgb("#d4856a")       # Salmon-orange (mid)
-    sky_horizon = hex_to_rgb("#e8b89d")   # Pale peach (horizon)
-    ground_fade = hex_to_rgb("#a0522d")   # Sienna (ground)
+    sky_top, sky_mid, sky_horizon = MARS_SKY_TOP, MARS_SKY_MID, MARS_SKY_HORIZON
+    ground_fade = MARS_GROUND_FADE
 
     # Draw sky gradient
-    horizon_y = int(BG_HEIGHT * 0.7)
+    horizon_y = MARS_HORIZON_Y
 
     for y in range(horizon_y):
         mid_y = horizon_y // 2
@@ -144,7 +232,7 @@ def create_mars_sky() -> Image.Image:
 
     # Add subtle dust haze (scattered lighter pixels)
     random.seed(42)
-    haze_color = hex_to_rgb("#e8c8a8")
+    haze_color = MARS_HAZE
     for _ in range(2000):
         x = random.randint(0, BG_WIDTH - 1)
         y = random.randint(0, BG_HEIGHT - 1)
@@ -163,7 +251,7 @@ def create_space_stars() -> Image.Image:
     Deep black with scattered stars of varying brightness.
     Optional nebula colors for visual interest.
     """
-    img = Image.new('RGB', (BG_WIDTH, BG_HEIGHT), hex_to_rgb("#0a0a1a"))
+    img = Image.new('RGB', (BG_WIDTH, BG_HEIGHT), SPACE_BACKGROUND)
     draw = ImageDraw.Draw(img)
 
     random.seed(42)  # Deterministic stars
@@ -171,13 +259,7 @@ def create_space_stars() -> Image.Image:
     # Add subtle nebula colors (very faint)
     _add_nebula(img, draw)
 
-    # Star colors
-    star_white = (255, 255, 255)
-    star_blue = (200, 220, 255)
-    star_yellow = (255, 255, 200)
-    star_red = (255, 200, 200)
-
-    star_colors = [star_white] * 7 + [star_blue] * 2 + [star_yellow] + [star_red]
+    star_colors = STAR_COLORS
 
     # Draw stars of varying sizes and brightness
     # Small dim stars (many)
@@ -218,14 +300,10 @@ def create_space_stars() -> Image.Image:
     return img
 
 
+@trace_stage
 def _add_nebula(img: Image.Image, draw: ImageDraw) -> None:
     """Add subtle nebula color patches."""
-    # Nebula colors (very subtle)
-    nebula_colors = [
-        hex_to_rgb("#1a1a3a"),  # Deep blue
-        hex_to_rgb("#2a1a2a"),  # Deep purple
-        hex_to_rgb("#1a2a2a"),  # Deep teal
-    ]
+    nebula_colors = NEBULA_COLORS
 
     # Create a few nebula patches
     for _ in range(5):
@@ -249,26 +327,913 @@ def _add_nebula(img: Image.Image, draw: ImageDraw) -> None:
                         img.putpixel((x, y), blended)
 
 
+# --- Tiled parallel mode ------------------------------------------------------
+#
+# The canvas is split into TILE_SIZE tiles rendered by a process pool. Workers
+# write straight into a shared-memory canvas, so no pixel data is pickled and
+# nothing is stitched afterwards. Every random element comes from a stream
+# keyed by (background, tile x, tile y), never by worker, so the image is
+# identical for any worker count. Stars near a tile edge are evaluated by
+# each neighbouring tile and clipped, so tiles never write outside their own
+# rectangle.
+
+TILE_SIZE = 256
+TILED_SEED = 42
+
+# Star populations for the whole canvas: (count, brightness range, kind)
+STAR_LAYERS = [
+    (3000, (60, 150), "small"),
+    (500, (150, 220), "medium"),
+    (50, (255, 255), "bright"),
+]
+MARS_HAZE_COUNT = 2000
+NEBULA_PATCHES = 5
+
+# Vertical sky gradients as (y, rgb) stops
+EARTH_SKY_STOPS = [(0, EARTH_SKY_TOP), (EARTH_HORIZON_Y // 2, EARTH_SKY_MID),
+                   (EARTH_HORIZON_Y, EARTH_SKY_HORIZON), (BG_HEIGHT, EARTH_SKY_HORIZON)]
+MARS_SKY_STOPS = [(0, MARS_SKY_TOP), (MARS_HORIZON_Y // 2, MARS_SKY_MID),
+                  (MARS_HORIZON_Y, MARS_SKY_HORIZON), (BG_HEIGHT, MARS_GROUND_FADE)]
+
+
+def _tile_rng(name: str, tx: int, ty: int, stream: int = 0) -> np.random.Generator:
+    """Random stream for one tile of one background (worker independent)."""
+    return np.random.default_rng([TILED_SEED, zlib.crc32(name.encode()), tx, ty, stream])
+
+
+def _tile_rect(tx: int, ty: int) -> tuple:
+    """Pixel rectangle (x0, y0, x1, y1) covered by tile (tx, ty)."""
+    x0, y0 = tx * TILE_SIZE, ty * TILE_SIZE
+    return x0, y0, min(x0 + TILE_SIZE, BG_WIDTH), min(y0 + TILE_SIZE, BG_HEIGHT)
+
+
+def _tile_grid() -> tuple:
+    """Number of tiles across and down the canvas."""
+    return (-(-BG_WIDTH // TILE_SIZE), -(-BG_HEIGHT // TILE_SIZE))
+
+
+def _gradient_rows(ys: np.ndarray, stops: list) -> np.ndarray:
+    """Evaluate a piecewise-linear vertical gradient at rows `ys`.
+
+    `stops` is a list of (y, rgb) in increasing y. Returns (len(ys), 3) floats.
+    """
+    stop_y = [y for y, _ in stops]
+    return np.stack([np.interp(ys, stop_y, [c[i] for _, c in stops]) for i in range(3)], axis=1)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_ridgeline(seed: int, roughness: float) -> np.ndarray:
+    return fractal_ridgeline(BG_WIDTH, seed, roughness)
+
+
+@functools.lru_cache(maxsize=None)
+def _nebula_patches() -> list:
+    """Nebula centres, radii and colors for the whole canvas."""
+    rng = np.random.default_rng(TILED_SEED)
+    return [
+        (int(rng.integers(0, BG_WIDTH + 1)), int(rng.integers(0, BG_HEIGHT + 1)),
+         int(rng.integers(200, 501)), NEBULA_COLORS[rng.integers(len(NEBULA_COLORS))])
+        for _ in range(NEBULA_PATCHES)
+    ]
+
+
+def _earth_sky_tile(out: np.ndarray, x0: int, y0: int, tx: int, ty: int) -> None:
+    h, w = out.shape[:2]
+    ys = np.arange(y0, y0 + h)
+    tile = np.repeat(_gradient_rows(ys, EARTH_SKY_STOPS)[:, None, :], w, axis=1)
+
+    haze = np.array(EARTH_SKY_HORIZON, dtype=np.float64)
+    for layer in EARTH_MOUNTAIN_LAYERS:
+        ridge = _cached_ridgeline(layer["seed"], layer["roughness"])[x0:x0 + w]
+        peak_y = layer["base_y"] - ridge * layer["height"]
+        color = np.array(layer["color"], dtype=np.float64)
+        color += (haze - color) * layer["fade"]
+        tile[ys[:, None] >= peak_y[None, :]] = color.astype(np.uint8)
+
+    out[:] = tile.astype(np.uint8)
+
+
+def _mars_sky_tile(out: np.ndarray, x0: int, y0: int, tx: int, ty: int) -> None:
+    h, w = out.shape[:2]
+    ys = np.arange(y0, y0 + h)
+    tile = np.repeat(_gradient_rows(ys, MARS_SKY_STOPS)[:, None, :], w, axis=1)
+
+    # Dust haze: scattered lighter pixels, count proportional to tile area
+    rng = _tile_rng("mars_sky", tx, ty)
+    count = rng.poisson(MARS_HAZE_COUNT * h * w / (BG_WIDTH * BG_HEIGHT))
+    hy, hx = rng.integers(0, h, count), rng.integers(0, w, count)
+    alpha = rng.integers(20, 61, count)[:, None] / 255
+    tile[hy, hx] += (np.array(MARS_HAZE) - tile[hy, hx]) * alpha
+
+    out[:] = tile.astype(np.uint8)
+
+
+def _tile_stars(tx: int, ty: int) -> list:
+    """Stars anchored in tile (tx, ty): list of (kind, xs, ys, colors)."""
+    x0, y0, x1, y1 = _tile_rect(tx, ty)
+    area_share = (x1 - x0) * (y1 - y0) / (BG_WIDTH * BG_HEIGHT)
+    palette = np.array(STAR_COLORS, dtype=np.float64)
+    stars = []
+    for stream, (total, (low, high), kind) in enumerate(STAR_LAYERS):
+        rng = _tile_rng("space_stars", tx, ty, stream)
+        count = rng.poisson(total * area_share)
+        xs = rng.integers(x0, x1, count)
+        ys = rng.integers(y0, y1, count)
+        brightness = rng.integers(low, high + 1, count)[:, None] / 255
+        colors = palette[rng.integers(0, len(palette), count)] * brightness
+        stars.append((kind, xs, ys, colors))
+    return stars
+
+
+# Pixel offsets drawn for each star kind, with a brightness factor
+STAR_SHAPES = {
+    "small": [(0, 0, 1.0)],
+    "medium": [(0, 0, 1.0), (1, 0, 1.0), (0, 1, 1.0), (1, 1, 1.0)],
+    "bright": [(0, 0, 1.0), (-1, 0, 0.5), (1, 0, 0.5), (0, -1, 0.5), (0, 1, 0.5)],
+}
+
+
+def _space_stars_tile(out: np.ndarray, x0: int, y0: int, tx: int, ty: int) -> None:
+    h, w = out.shape[:2]
+    tile = np.empty((h, w, 3), dtype=np.float64)
+    tile[:] = SPACE_BACKGROUND
+
+    # Nebula: concentric rings of very faint color, evaluated per pixel
+    px = np.arange(x0, x0 + w)[None, :]
+    py = np.arange(y0, y0 + h)[:, None]
+    for cx, cy, radius, color in _nebula_patches():
+        if cx + radius < x0 or cx - radius > x0 + w or cy + radius < y0 or cy - radius > y0 + h:
+            continue
+        dist = np.sqrt((px - cx) ** 2 + (py - cy) ** 2)
+        for r in range(radius, 0, -20):
+            t = np.where(dist < r, 15 * (1 - r / radius) / 255 * (1 - dist / r), 0.0)
+            tile += (np.array(color) - tile) * t[..., None]
+
+    # Stars from this tile and its neighbours, clipped to this tile
+    cols, rows = _tile_grid()
+    neighbours = [(nx, ny) for ny in range(ty - 1, ty + 2) for nx in range(tx - 1, tx + 2)
+                  if 0 <= nx < cols and 0 <= ny < rows]
+    stars = [_tile_stars(nx, ny) for nx, ny in neighbours]
+    # Layer by layer across all neighbours, so overlaps resolve the same way in every tile
+    for layer in range(len(STAR_LAYERS)):
+        for tile_stars in stars:
+            kind, xs, ys, colors = tile_stars[layer]
+            for dx, dy, factor in STAR_SHAPES[kind]:
+                sx, sy = xs + dx - x0, ys + dy - y0
+                inside = (sx >= 0) & (sx < w) & (sy >= 0) & (sy < h)
+                tile[sy[inside], sx[inside]] = colors[inside] * factor
+
+    out[:] = tile.astype(np.uint8)
+
+
+TILE_RENDERERS = {
+    "earth_sky": _earth_sky_tile,
+    "mars_sky": _mars_sky_tile,
+    "space_stars": _space_stars_tile,
+}
+
+# Per-process view of the shared canvas, set by _attach_canvas
+_shared = {}
+
+
+def _attach_canvas(shm_name: str, shape: tuple) -> None:
+    """Pool initializer: map the shared canvas into this worker."""
+    # Workers share the parent's resource tracker, which unlinks the block
+    # once when the parent calls unlink(); attaching here adds no entry
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _shared["shm"] = shm
+    _shared["canvas"] = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+
+
+def _render_tile(job: tuple) -> None:
+    name, tx, ty = job
+    x0, y0, x1, y1 = _tile_rect(tx, ty)
+    TILE_RENDERERS[name](_shared["canvas"][y0:y1, x0:x1], x0, y0, tx, ty)
+
+
+def create_tiled(name: str, workers: int = None) -> Image.Image:
+    """Render a background tile-by-tile in a process pool.
+
+    Output is identical for any `workers` value (see section comment).
+    """
+    shape = (BG_HEIGHT, BG_WIDTH, 3)
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+    try:
+        cols, rows = _tile_grid()
+        jobs = [(name, tx, ty) for ty in range(rows) for tx in range(cols)]
+        with trace_span("tile_pool", tiles=len(jobs)), \
+                ProcessPoolExecutor(max_workers=workers, initializer=_attach_canvas,
+                                    initargs=(shm.name, shape)) as pool:
+            list(pool.map(_render_tile, jobs))
+        canvas = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        img = Image.fromarray(canvas.copy(), 'RGB')
+        del canvas
+    finally:
+        shm.close()
+        shm.unlink()
+    return img
+
+
+# --- Skybox mode -------------------------------------------------------------
+#
+# For the 3D orbital camera the skies are evaluated as functions of view
+# direction instead of screen position. A direction's elevation is mapped to
+# the row it would occupy in the flat image (SKY_PX_ANGLE radians per flat
+# pixel, horizon at the flat horizon row), so the gradients, mountain heights
+# and star sizes match the flat backgrounds. Mountains follow a ridgeline
+# that wraps around the full 360 degrees of azimuth; stars and nebulae are
+# fixed directions on the sphere, as many per pixel as in the flat image.
+#
+# Cube faces (Godot layer order +X, -X, +Y, -Y, +Z, -Z) or fixed-height strips
+# of the panorama render in a process pool. Random elements are keyed by
+# face or strip, so output does not depend on the worker count.
+
+SKYBOX_TIERS = {"low": 256, "medium": 512, "high": 1024}  # Cube face size in px
+SKY_PX_ANGLE = (np.pi / 2) / BG_WIDTH   # Flat image spans a 90 degree view
+PANORAMA_STRIP = 64                     # Panorama rows per pool job
+
+# face name -> (forward, right, down) basis; pixel direction is
+# forward + u * right + v * down for u, v in -1..1 (OpenGL cubemap layout)
+CUBE_FACES = {
+    "px": ((1, 0, 0), (0, 0, -1), (0, -1, 0)),
+    "nx": ((-1, 0, 0), (0, 0, 1), (0, -1, 0)),
+    "py": ((0, 1, 0), (1, 0, 0), (0, 0, 1)),
+    "ny": ((0, -1, 0), (1, 0, 0), (0, 0, -1)),
+    "pz": ((0, 0, 1), (1, 0, 0), (0, -1, 0)),
+    "nz": ((0, 0, -1), (-1, 0, 0), (0, -1, 0)),
+}
+CUBE_LAYOUT = ["px", "nx", "py", "ny", "pz", "nz"]  # 3x2 image, row by row
+
+
+@functools.lru_cache(maxsize=None)
+def _periodic_ridgeline(seed: int, roughness: float) -> np.ndarray:
+    """Ridgeline over 360 degrees of azimuth whose ends meet."""
+    samples = 4 * BG_WIDTH  # Same horizontal detail as the flat image
+    ridge = fractal_ridgeline(samples, seed, roughness)
+    ridge -= (ridge[-1] - ridge[0]) * np.linspace(0, 1, samples)
+    ridge -= ridge.min()
+    return ridge / ridge.max()
+
+
+@functools.lru_cache(maxsize=None)
+def _sky_nebulae() -> list:
+    """Nebula centre directions, radii (flat pixels) and colors."""
+    rng = np.random.default_rng(TILED_SEED)
+    centres = rng.normal(size=(NEBULA_PATCHES, 3))
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    return [(centre, int(rng.integers(200, 501)), NEBULA_COLORS[rng.integers(len(NEBULA_COLORS))])
+            for centre in centres]
+
+
+@functools.lru_cache(maxsize=None)
+def _sky_stars(sphere_pixels: int) -> list:
+    """Star directions for the whole sphere: list of (kind, dirs, colors).
+
+    Counts keep the flat image's stars per pixel, so small tiers are not
+    crowded; `sphere_pixels` is the output's total pixel count.
+    """
+    rng = np.random.default_rng(TILED_SEED)
+    density = sphere_pixels / (BG_WIDTH * BG_HEIGHT)
+    palette = np.array(STAR_COLORS, dtype=np.float64)
+    stars = []
+    for total, (low, high), kind in STAR_LAYERS:
+        count = int(round(total * density))
+        dirs = rng.normal(size=(count, 3))
+        dirs /= np.linalg.norm(dirs, axis=1, keepdims=True)
+        brightness = rng.integers(low, high + 1, count)[:, None] / 255
+        stars.append((kind, dirs, palette[rng.integers(0, len(palette), count)] * brightness))
+    return stars
+
+
+def _sky_colors(name: str, dirs: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Sky color (float RGB) for an (H, W, 3) array of unit view directions."""
+    elevation = np.arcsin(np.clip(dirs[..., 1], -1, 1))
+    azimuth = np.arctan2(dirs[..., 0], -dirs[..., 2])
+
+    if name == "space_stars":
+        tile = np.empty(dirs.shape, dtype=np.float64)
+        tile[:] = SPACE_BACKGROUND
+        for centre, radius, color in _sky_nebulae():
+            dist = np.arccos(np.clip(dirs @ centre, -1, 1)) / SKY_PX_ANGLE
+            if dist.min() >= radius:
+                continue
+            for r in range(radius, 0, -20):
+                t = np.where(dist < r, 15 * (1 - r / radius) / 255 * (1 - dist / r), 0.0)
+                tile += (np.array(color) - tile) * t[..., None]
+        return tile
+
+    if name == "earth_sky":
+        horizon_y, stops = EARTH_HORIZON_Y, EARTH_SKY_STOPS
+    else:
+        horizon_y, stops = MARS_HORIZON_Y, MARS_SKY_STOPS
+
+    # Row this direction would occupy in the flat image
+    rows = horizon_y - elevation / SKY_PX_ANGLE
+    tile = _gradient_rows(rows.ravel(), stops).reshape(dirs.shape)
+
+    if name == "earth_sky":
+        haze = np.array(EARTH_SKY_HORIZON, dtype=np.float64)
+        for layer in EARTH_MOUNTAIN_LAYERS:
+            ridge = _periodic_ridgeline(layer["seed"], layer["roughness"])
+            index = ((azimuth + np.pi) / (2 * np.pi) * ridge.size).astype(int) % ridge.size
+            peak_y = layer["base_y"] - ridge[index] * layer["height"]
+            color = np.array(layer["color"], dtype=np.float64)
+            color += (haze - color) * layer["fade"]
+            tile[rows >= peak_y] = color.astype(np.uint8)
+    else:
+        # Dust haze at the flat image's density per pixel
+        haze_pixels = rng.random(dirs.shape[:2]) < MARS_HAZE_COUNT / (BG_WIDTH * BG_HEIGHT)
+        alpha = rng.integers(20, 61, dirs.shape[:2])[..., None] / 255
+        tile = np.where(haze_pixels[..., None], tile + (np.array(MARS_HAZE) - tile) * alpha, tile)
+    return tile
+
+
+def _splat_stars(tile: np.ndarray, cols: np.ndarray, rows: np.ndarray,
+                 kind: str, colors: np.ndarray, wrap: bool) -> None:
+    """Draw projected stars into tile, clipped (or wrapped horizontally)."""
+    h, w = tile.shape[:2]
+    cols, rows = np.round(cols).astype(int), np.round(rows).astype(int)
+    for dx, dy, factor in STAR_SHAPES[kind]:
+        sx, sy = cols + dx, rows + dy
+        if wrap:
+            sx %= w
+        inside = (sx >= 0) & (sx < w) & (sy >= 0) & (sy < h)
+        tile[sy[inside], sx[inside]] = colors[inside] * factor
+
+
+def _render_sky_part(job: tuple) -> np.ndarray:
+    """Render one cube face or panorama strip. Runs in a pool worker."""
+    name, projection, part, size = job
+    rng = _tile_rng(f"{name}_{projection}", part if isinstance(part, int) else CUBE_LAYOUT.index(part), size)
+    coords = (np.arange(size) + 0.5) / size * 2 - 1
+
+    if projection == "cube":
+        forward, right, down = (np.array(v, dtype=np.float64) for v in CUBE_FACES[part])
+        dirs = forward + coords[None, :, None] * right + coords[:, None, None] * down
+        dirs /= np.linalg.norm(dirs, axis=-1, keepdims=True)
+    else:
+        width, height = 4 * size, 2 * size
+        row_ids = np.arange(part, min(part + PANORAMA_STRIP, height))
+        elevation = np.pi / 2 - (row_ids + 0.5) / height * np.pi
+        azimuth = (np.arange(width) + 0.5) / width * 2 * np.pi - np.pi
+        cos_el = np.cos(elevation)[:, None]
+        dirs = np.stack(np.broadcast_arrays(cos_el * np.sin(azimuth)[None, :],
+                                            np.sin(elevation)[:, None],
+                                            -cos_el * np.cos(azimuth)[None, :]), axis=-1)
+
+    tile = _sky_colors(name, dirs, rng)
+
+    if name == "space_stars":
+        sphere_pixels = (6 if projection == "cube" else 8) * size * size
+        for kind, star_dirs, colors in _sky_stars(sphere_pixels):
+            if projection == "cube":
+                depth = star_dirs @ forward
+                ahead = depth > 0
+                u = star_dirs[ahead] @ right / depth[ahead]
+                v = star_dirs[ahead] @ down / depth[ahead]
+                _splat_stars(tile, (u + 1) / 2 * size - 0.5, (v + 1) / 2 * size - 0.5,
+                             kind, colors[ahead], wrap=False)
+            else:
+                elevation = np.arcsin(np.clip(star_dirs[:, 1], -1, 1))
+                azimuth = np.arctan2(star_dirs[:, 0], -star_dirs[:, 2])
+                _splat_stars(tile, (azimuth + np.pi) / (2 * np.pi) * width - 0.5,
+                             (np.pi / 2 - elevation) / np.pi * height - 0.5 - part,
+                             kind, colors, wrap=True)
+
+    return tile.astype(np.uint8)
+
+
+def create_skybox(name: str, projection: str, size: int, workers: int = None) -> Image.Image:
+    """Render a sky as a 3x2 cubemap image or a 2:1 equirectangular panorama.
+
+    `size` is the cube face size; panoramas are 4 * size wide.
+    """
+    if projection == "cube":
+        jobs = [(name, projection, face, size) for face in CUBE_LAYOUT]
+    else:
+        jobs = [(name, projection, row, size) for row in range(0, 2 * size, PANORAMA_STRIP)]
+
+    with trace_span("sky_pool", parts=len(jobs)), ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_render_sky_part, jobs))
+
+    if projection == "cube":
+        rows = [np.concatenate(parts[i:i + 3], axis=1) for i in (0, 3)]
+        return Image.fromarray(np.concatenate(rows, axis=0), 'RGB')
+    return Image.fromarray(np.concatenate(parts, axis=0), 'RGB')
+
+
+# --- Layered mode ------------------------------------------------------------
+#
+# Each background is a stack of independent layers (gradient, mountain
+# ranges, dust haze, nebula, stars) composited bottom to top. Every layer is
+# an RGBA uint8 canvas cached on disk as a .npy file, named by a digest of
+# its stage, its parameters and the source of the stage function and every
+# helper and constant it uses (LAYER_DEPENDENCIES). A rerun maps cached
+# layers read-only with np.load(mmap_mode='r') and renders only the layers
+# whose key changed; raising star density re-renders the stars and keeps the
+# nebula. After a --layered run, layer files no background uses any more
+# are deleted, so the cache holds one file per current layer. The key holds
+# no theme name, so a layer identical in two themes would be stored once,
+# but the current themes have no layer in common. Layers then blend in one
+# vectorized "over" pass.
+
+LAYER_CACHE_DIR = ".cache/background_layers"
+COMPOSITE_ROWS = 256  # Rows blended per pass, bounding float32 working memory
+
+
+def _blank_layer() -> np.ndarray:
+    return np.zeros((BG_HEIGHT, BG_WIDTH, 4), dtype=np.uint8)
+
+
+@trace_stage
+def _gradient_layer(stops: list) -> np.ndarray:
+    layer = _blank_layer()
+    layer[..., :3] = _gradient_rows(np.arange(BG_HEIGHT), stops)[:, None, :].astype(np.uint8)
+    layer[..., 3] = 255
+    return layer
+
+
+@trace_stage
+def _mountain_layer(seed: int, base_y: float, height: float, roughness: float,
+                    color: tuple, fade: float, haze: tuple) -> np.ndarray:
+    layer = _blank_layer()
+    peak_y = base_y - _cached_ridgeline(seed, roughness) * height
+    rgb = np.array(color, dtype=np.float64)
+    rgb += (np.array(haze, dtype=np.float64) - rgb) * fade
+    layer[np.arange(BG_HEIGHT)[:, None] >= peak_y[None, :]] = (*rgb.astype(np.uint8), 255)
+    return layer
+
+
+@trace_stage
+def _haze_layer(seed: int, count: int, color: tuple, alpha: tuple) -> np.ndarray:
+    layer = _blank_layer()
+    rng = np.random.default_rng(seed)
+    ys, xs = rng.integers(0, BG_HEIGHT, count), rng.integers(0, BG_WIDTH, count)
+    layer[ys, xs, :3] = color
+    layer[ys, xs, 3] = rng.integers(alpha[0], alpha[1] + 1, count)
+    return layer
+
+
+@trace_stage
+def _nebula_layer(seed: int, patches: int, colors: list) -> np.ndarray:
+    """Faint concentric rings, accumulated as premultiplied color + coverage."""
+    premultiplied = np.zeros((BG_HEIGHT, BG_WIDTH, 3), dtype=np.float64)
+    coverage = np.zeros((BG_HEIGHT, BG_WIDTH), dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    for _ in range(patches):
+        cx, cy = int(rng.integers(0, BG_WIDTH + 1)), int(rng.integers(0, BG_HEIGHT + 1))
+        radius = int(rng.integers(200, 501))
+        color = np.array(colors[rng.integers(len(colors))], dtype=np.float64)
+        x0, x1 = max(0, cx - radius), min(BG_WIDTH, cx + radius)
+        y0, y1 = max(0, cy - radius), min(BG_HEIGHT, cy + radius)
+        dist = np.sqrt((np.arange(x0, x1)[None, :] - cx) ** 2 + (np.arange(y0, y1)[:, None] - cy) ** 2)
+        rgb, cover = premultiplied[y0:y1, x0:x1], coverage[y0:y1, x0:x1]
+        for r in range(radius, 0, -20):
+            t = np.where(dist < r, 15 * (1 - r / radius) / 255 * (1 - dist / r), 0.0)
+            rgb += (color - rgb) * t[..., None]
+            cover += (1 - cover) * t
+
+    layer = _blank_layer()
+    covered = coverage > 0
+    layer[covered, :3] = np.round(premultiplied[covered] / coverage[covered, None])
+    layer[..., 3] = np.round(coverage * 255)
+    return layer
+
+
+@trace_stage
+def _star_layer(seed: int, populations: list, colors: list) -> np.ndarray:
+    layer = _blank_layer()
+    rng = np.random.default_rng(seed)
+    palette = np.array(colors, dtype=np.float64)
+    for total, (low, high), kind in populations:
+        xs, ys = rng.integers(0, BG_WIDTH, total), rng.integers(0, BG_HEIGHT, total)
+        brightness = rng.integers(low, high + 1, total)[:, None] / 255
+        star_colors = palette[rng.integers(0, len(palette), total)] * brightness
+        for dx, dy, factor in STAR_SHAPES[kind]:
+            sx, sy = xs + dx, ys + dy
+            inside = (sx >= 0) & (sx < BG_WIDTH) & (sy >= 0) & (sy < BG_HEIGHT)
+            layer[sy[inside], sx[inside], :3] = star_colors[inside] * factor
+            layer[sy[inside], sx[inside], 3] = 255
+    return layer
+
+
+LAYER_STAGES = {
+    "gradient": _gradient_layer,
+    "mountains": _mountain_layer,
+    "haze": _haze_layer,
+    "nebula": _nebula_layer,
+    "stars": _star_layer,
+}
+
+# Stage -> helpers and constants its output depends on besides its parameters.
+# Keep this in step with the stage functions: anything missing here can be
+# edited without invalidating cached layers.
+LAYER_DEPENDENCIES = {
+    "gradient": [_blank_layer, _gradient_rows],
+    "mountains": [_blank_layer, _cached_ridgeline, fractal_ridgeline],
+    "haze": [_blank_layer],
+    "nebula": [_blank_layer],
+    "stars": [_blank_layer, STAR_SHAPES],
+}
+
+# Background name -> [(stage, parameters)], bottom layer first
+BACKGROUND_LAYERS = {
+    "earth_sky": [("gradient", {"stops": EARTH_SKY_STOPS})] + [
+        ("mountains", {**layer, "haze": EARTH_SKY_HORIZON}) for layer in EARTH_MOUNTAIN_LAYERS
+    ],
+    "mars_sky": [
+        ("gradient", {"stops": MARS_SKY_STOPS}),
+        ("haze", {"seed": TILED_SEED, "count": MARS_HAZE_COUNT, "color": MARS_HAZE, "alpha": (20, 60)}),
+    ],
+    "space_stars": [
+        ("gradient", {"stops": [(0, SPACE_BACKGROUND), (BG_HEIGHT, SPACE_BACKGROUND)]}),
+        ("nebula", {"seed": TILED_SEED, "patches": NEBULA_PATCHES, "colors": NEBULA_COLORS}),
+        ("stars", {"seed": TILED_SEED, "populations": STAR_LAYERS, "colors": STAR_COLORS}),
+    ],
+}
+
+
+class LayerCache:
+    """On-disk cache of rendered layers, memory-mapped on reuse."""
+
+    def __init__(self, cache_dir: str = LAYER_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = self.misses = 0
+
+    def key(self, stage: str, params: dict) -> str:
+        sources = [inspect.getsource(dep) if callable(dep) else dep
+                   for dep in [LAYER_STAGES[stage]] + LAYER_DEPENDENCIES[stage]]
+        payload = json.dumps([stage, params, BG_WIDTH, BG_HEIGHT, sources], sort_keys=True)
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    def path(self, stage: str, params: dict) -> str:
+        return os.path.join(self.cache_dir, f"{stage}_{self.key(stage, params)}.npy")
+
+    def layer(self, stage: str, params: dict) -> np.ndarray:
+        """The (BG_HEIGHT, BG_WIDTH, 4) layer, read-only, rendering it on a miss."""
+        path = self.path(stage, params)
+        if os.path.exists(path):
+            self.hits += 1
+            return np.load(path, mmap_mode='r')
+
+        self.misses += 1
+        os.makedirs(self.cache_dir, exist_ok=True)
+        pixels = LAYER_STAGES[stage](**params)
+        # Write under a temporary name so an interrupted run leaves no partial layer
+        partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        out = np.lib.format.open_memmap(partial, mode='w+', dtype=np.uint8, shape=pixels.shape)
+        out[:] = pixels
+        out.flush()
+        del out
+        os.replace(partial, path)
+        return np.load(path, mmap_mode='r')
+
+    def prune(self) -> int:
+        """Delete stage layers no BACKGROUND_LAYERS entry uses; returns the count."""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        keep = {os.path.basename(self.path(stage, params))
+                for layers in BACKGROUND_LAYERS.values() for stage, params in layers}
+        removed = 0
+        for filename in os.listdir(self.cache_dir):
+            stage = filename.rsplit("_", 1)[0]
+            if stage in LAYER_STAGES and filename.endswith(".npy") and filename not in keep:
+                os.remove(os.path.join(self.cache_dir, filename))
+                removed += 1
+        return removed
+
+
+@trace_stage
+def composite_layers(layers: list) -> np.ndarray:
+    """Blend RGBA layers bottom to top ("over") into an RGB uint8 array.
+
+    Each pixel's result is sum_i(rgb_i * alpha_i * prod_{j > i}(1 - alpha_j)),
+    evaluated for all layers at once over bands of COMPOSITE_ROWS rows.
+    """
+    out = np.empty((BG_HEIGHT, BG_WIDTH, 3), dtype=np.uint8)
+    for y0 in range(0, BG_HEIGHT, COMPOSITE_ROWS):
+        stack = np.stack([layer[y0:y0 + COMPOSITE_ROWS] for layer in layers]).astype(np.float32)
+        alpha = stack[..., 3:] / 255
+        # Fraction of each layer that shows through all the layers above it
+        through = np.ones_like(alpha)
+        through[:-1] = np.cumprod(1 - alpha[:0:-1], axis=0)[::-1]
+        rgb = (stack[..., :3] * alpha * through).sum(axis=0)
+        out[y0:y0 + COMPOSITE_ROWS] = np.clip(np.round(rgb), 0, 255).astype(np.uint8)
+    return out
+
+
+def create_layered(name: str, cache: LayerCache = None) -> Image.Image:
+    """Composite a background from its layers (see section comment).
+
+    Layers come from `cache` if given; without one they are rendered in
+    memory and nothing is written to disk.
+    """
+    if cache is None:
+        layers = [LAYER_STAGES[stage](**params) for stage, params in BACKGROUND_LAYERS[name]]
+    else:
+        layers = [cache.layer(stage, params) for stage, params in BACKGROUND_LAYERS[name]]
+    return Image.fromarray(composite_layers(layers), 'RGB')
+
+
+# --- Skyline impostor mode ---------------------------------------------------
+#
+# SceneryBuilder.build_skyline and build_mountains (src/game/scenery_builder.gd)
+# place hundreds of boxes and hexagonal cones 80-1200 units out. They are
+# never interactive and always far away, so they can be baked into one 360
+# degree RGBA strip and drawn on a single cylinder around the play area.
+#
+# The layout is regenerated exactly: Godot's RandomNumberGenerator is PCG32,
+# and GodotRng repeats its seeding and randf()/randf_range() draws. The
+# instances are then projected from the ground centre onto a cylinder:
+# - column = azimuth, from the Godot +X axis toward +Z, about the ground
+#   centre (ground_size * CELL_SIZE / 2 on x and z)
+# - row    = height / horizontal distance, from IMPOSTOR_TAN_TOP down
+#   to IMPOSTOR_TAN_BOTTOM
+# A cylinder of radius R should span heights R * tan_bottom .. R * tan_top
+# (written to the JSON next to the PNG). Scenery colours include each
+# instance's aerial-perspective shift and the scenario's exponential fog at
+# its true distance. The cylinder's material should therefore be unshaded,
+# with fog disabled.
+
+IMPOSTOR_WIDTH = 4096          # Panorama columns (360 degrees)
+IMPOSTOR_TAN_TOP = 0.8         # Tallest near building: 60 units at 80 units away
+IMPOSTOR_TAN_BOTTOM = -0.02    # A little below the horizon so bases meet the ground
+IMPOSTOR_SUPERSAMPLE = 3       # Drawn at 3x and box-filtered for antialiased edges
+
+# (share of building_count, min/max radius, min/max height, min/max width), near to far.
+# The far ring takes whatever the near and mid shares leave.
+SKYLINE_RINGS = [
+    (0.4, 80.0, 250.0, 8.0, 60.0, 6.0, 18.0),
+    (0.33, 200.0, 500.0, 15.0, 120.0, 8.0, 24.0),
+    (None, 400.0, 1000.0, 30.0, 250.0, 10.0, 30.0),
+]
+MOUNTAIN_RADIUS_RANGE = (500.0, 1200.0)
+MOUNTAIN_HAZE = (0.6, 0.65, 0.75)
+
+# Scenery of the VisualScenarioConfig presets that build skyline or mountains
+IMPOSTOR_PRESETS = {
+    "megastructure": {
+        "skyline": {"seed": 42, "building_count": 300},
+        "fog_density": 0.001, "fog_color": (0.55, 0.62, 0.72),
+    },
+    "blank_slate": {
+        "mountains": {"seed": 123, "count": 60, "min_height": 80.0, "max_height": 350.0,
+                      "min_radius": 30.0, "max_radius": 80.0,
+                      "base_color": (0.25, 0.45, 0.2), "peak_color": (0.55, 0.6, 0.7)},
+        "fog_density": 0.0005, "fog_color": (0.58, 0.65, 0.72),
+    },
+}
+
+_U64 = (1 << 64) - 1
+
+
+class GodotRng:
+    """Godot 4's RandomNumberGenerator (PCG32 with the default stream)."""
+
+    MULTIPLIER = 6364136223846793005
+    DEFAULT_INC = 1442695040888963407
+
+    def __init__(self, seed: int):
+        self.state = 0
+        self.inc = ((self.DEFAULT_INC << 1) | 1) & _U64
+        self._next()
+        self.state = (self.state + seed) & _U64
+        self._next()
+
+    def _next(self) -> int:
+        old = self.state
+        self.state = (old * self.MULTIPLIER + self.inc) & _U64
+        xorshifted = (((old >> 18) ^ old) >> 27) & 0xFFFFFFFF
+        rot = old >> 59
+        return ((xorshifted >> rot) | (xorshifted << ((-rot) & 31))) & 0xFFFFFFFF
+
+    def randf(self) -> float:
+        """Uniform float32 in [0, 1], drawn like RandomPCG::randf."""
+        exponent_bits = self._next()
+        if exponent_bits == 0:
+            return 0.0
+        leading_zeros = 32 - exponent_bits.bit_length()
+        return float(np.ldexp(np.float32(self._next() | 0x80000001), -32 - leading_zeros))
+
+    def randf_range(self, low: float, high: float) -> float:
+        return float(np.float32(self.randf()) * (np.float32(high) - np.float32(low)) + np.float32(low))
+
+
+def _lerp(a, b, t: float) -> np.ndarray:
+    return np.asarray(a, dtype=np.float64) + (np.asarray(b, dtype=np.float64) - a) * t
+
+
+def skyline_instances(seed: int, building_count: int) -> list:
+    """SceneryBuilder.build_skyline's boxes: (angle, radius, width, depth, height, rgb)."""
+    rng = GodotRng(seed)
+    counts = [int(building_count * share) for share, *_ in SKYLINE_RINGS[:-1]]
+    counts.append(building_count - sum(counts))
+    boxes = []
+    for count, (_, r_min, r_max, h_min, h_max, w_min, w_max) in zip(counts, SKYLINE_RINGS):
+        for _ in range(count):
+            angle = rng.randf() * 2 * np.pi
+            radius = rng.randf_range(r_min, r_max)
+            width = rng.randf_range(w_min, w_max)
+            depth = rng.randf_range(w_min, w_max)
+            height = max(rng.randf_range(h_min, h_max) * rng.randf() ** 0.8, h_min)
+            # Aerial perspective: far buildings cooler and lighter
+            dist_t = min(max((radius - r_min) / max(r_max - r_min, 1.0), 0.0), 1.0)
+            grey = rng.randf_range(0.25, 0.42)
+            blue_shift = _lerp(0.01, 0.1, dist_t) + rng.randf_range(0.0, 0.03)
+            fade = _lerp(0.0, 0.08, dist_t)
+            rgb = (grey - blue_shift + fade, grey + fade, grey + blue_shift + fade)
+            boxes.append((angle, radius, width, depth, height, rgb))
+    return boxes
+
+
+def mountain_instances(seed: int, count: int, min_height: float, max_height: float,
+                       min_radius: float, max_radius: float, base_color: tuple,
+                       peak_color: tuple) -> list:
+    """SceneryBuilder.build_mountains' cones: (angle, radius, base_radius, height, rgb)."""
+    rng = GodotRng(seed)
+    r_min, r_max = MOUNTAIN_RADIUS_RANGE
+    cones = []
+    for _ in range(count):
+        angle = rng.randf() * 2 * np.pi
+        radius = rng.randf_range(r_min, r_max)
+        height = rng.randf_range(min_height, max_height)
+        base_radius = rng.randf_range(min_radius, max_radius)
+        dist_t = min(max((radius - r_min) / (r_max - r_min), 0.0), 1.0)
+        rgb = _lerp(_lerp(base_color, peak_color, dist_t), MOUNTAIN_HAZE, dist_t * 0.3)
+        cones.append((angle, radius, base_radius, height, tuple(rgb)))
+    return cones
+
+
+def _convex_hull(points: np.ndarray) -> list:
+    """Monotone-chain convex hull of (N, 2) points, as a polygon."""
+    pts = sorted(map(tuple, points))
+    if len(pts) < 3:
+        return pts
+
+    def half(seq):
+        hull = []
+        for p in seq:
+            while len(hull) >= 2 and ((hull[-1][0] - hull[-2][0]) * (p[1] - hull[-2][1]) -
+                                      (hull[-1][1] - hull[-2][1]) * (p[0] - hull[-2][0])) <= 0:
+                hull.pop()
+            hull.append(p)
+        return hull[:-1]
+
+    return half(pts) + half(reversed(pts))
+
+
+def _project(corners: np.ndarray, centre_angle: float, width: int, row_scale: float) -> np.ndarray:
+    """(N, 3) points relative to the eye -> (N, 2) panorama pixel coordinates.
+
+    Azimuths are unwrapped around `centre_angle`, so an instance straddling
+    the 0/360 seam stays in one piece (drawn again shifted by the width).
+    """
+    azimuth = np.arctan2(corners[:, 2], corners[:, 0])
+    azimuth = centre_angle + (azimuth - centre_angle + np.pi) % (2 * np.pi) - np.pi
+    slope = corners[:, 1] / np.hypot(corners[:, 0], corners[:, 2])
+    return np.stack([azimuth / (2 * np.pi) * width, (IMPOSTOR_TAN_TOP - slope) * row_scale], axis=1)
+
+
+def _fogged(rgb: tuple, distance: float, density: float, fog_color: tuple) -> tuple:
+    """Instance colour after Godot's exponential fog, as 8-bit sRGB-encoded RGBA."""
+    amount = 1 - np.exp(-distance * density)
+    color = np.clip(_lerp(rgb, fog_color, amount), 0, 1)
+    return tuple(int(round(c * 255)) for c in color) + (255,)
+
+
+@trace_stage
+def create_skyline_impostor(preset: str) -> tuple:
+    """Bake a preset's skyline/mountain instances into a 360 degree RGBA strip.
+
+    Returns (image, manifest dict with the cylinder mapping).
+    """
+    config = IMPOSTOR_PRESETS[preset]
+    ss = IMPOSTOR_SUPERSAMPLE
+    width = IMPOSTOR_WIDTH * ss
+    row_scale = width / (2 * np.pi)  # Square pixels at the horizon
+    height = int(np.ceil((IMPOSTOR_TAN_TOP - IMPOSTOR_TAN_BOTTOM) * row_scale / ss)) * ss
+
+    # Every instance as (distance, angle, 3D corners, rgb); cones use their hexagon and apex
+    shapes = []
+    skyline = skyline_instances(**config["skyline"]) if "skyline" in config else []
+    for angle, radius, box_w, box_d, box_h, rgb in skyline:
+        cx, cz = np.cos(angle) * radius, np.sin(angle) * radius
+        corners = np.array([(cx + sx * box_w / 2, y, cz + sz * box_d / 2)
+                            for sx in (-1, 1) for sz in (-1, 1) for y in (0.0, box_h)])
+        shapes.append((radius, angle, corners, rgb))
+    mountains = mountain_instances(**config["mountains"]) if "mountains" in config else []
+    hexagon = np.arange(6) / 6 * 2 * np.pi  # CylinderMesh vertices: x = sin, z = cos
+    for angle, radius, base_radius, cone_h, rgb in mountains:
+        cx, cz = np.cos(angle) * radius, np.sin(angle) * radius
+        # The mesh has bottom_radius 1 and is scaled by base_radius * 2 on x and
+        # z, so the in-game cone's radius is twice base_radius
+        cone_r = 2 * base_radius
+        corners = np.array([(cx + np.sin(a) * cone_r, 0.0, cz + np.cos(a) * cone_r)
+                            for a in hexagon] + [(cx, cone_h, cz)])
+        shapes.append((radius, angle, corners, rgb))
+
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    # Painter's order: farthest first
+    for distance, angle, corners, rgb in sorted(shapes, key=lambda s: -s[0]):
+        outline = np.array(_convex_hull(_project(corners, angle, width, row_scale)))
+        fill = _fogged(rgb, distance, config["fog_density"], config["fog_color"])
+        for shift in (-width, 0, width):
+            xs = outline[:, 0] + shift
+            if xs.max() >= 0 and xs.min() < width:
+                draw.polygon([(x, y) for x, y in zip(xs, outline[:, 1])], fill=fill)
+
+    # Box filter in premultiplied alpha so edges do not darken
+    img = img.convert('RGBa').reduce(ss).convert('RGBA')
+    manifest = {"preset": preset, "width": img.width, "height": img.height,
+                "tan_top": IMPOSTOR_TAN_TOP, "tan_bottom": IMPOSTOR_TAN_BOTTOM,
+                "skyline_buildings": len(skyline), "mountains": len(mountains)}
+    return img, manifest
+
+
+# Background name (terrain.json `background`, without .png) -> generator
+BACKGROUND_SPRITES = {
+    "earth_sky": create_earth_sky,
+    "mars_sky": create_mars_sky,
+    "space_stars": create_space_stars,
+}
+
+
+@trace_generator
 def main():
+    parser = argparse.ArgumentParser(description="Generate background sprites.")
+    parser.add_argument("--tiled", action="store_true",
+                        help="render each image in parallel tiles via shared memory")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process pool size for --tiled and --skybox")
+    parser.add_argument("--skybox", choices=["cube", "panorama"],
+                        help="render 3D skyboxes instead of flat backgrounds")
+    parser.add_argument("--tiers", nargs="+", choices=list(SKYBOX_TIERS), default=list(SKYBOX_TIERS),
+                        help="skybox quality tiers to emit")
+    parser.add_argument("--layered", action="store_true",
+                        help="composite each image from cached per-stage layers")
+    parser.add_argument("--layer-cache", default=LAYER_CACHE_DIR,
+                        help="directory for --layered layer files")
+    parser.add_argument("--impostor", nargs="*", choices=list(IMPOSTOR_PRESETS),
+                        help="bake skyline/mountain panorama impostors (default: every preset)")
+    args = parser.parse_args()
+
     output_dir = "assets/sprites/terrain/backgrounds"
     os.makedirs(output_dir, exist_ok=True)
 
-    print(f"Generating background sprites in {output_dir}/")
+    sprites = BACKGROUND_SPRITES
+
+    if args.impostor is not None:
+        impostor_dir = os.path.join(output_dir, "impostors")
+        os.makedirs(impostor_dir, exist_ok=True)
+        print(f"Baking skyline impostors in {impostor_dir}/")
+        presets = args.impostor or list(IMPOSTOR_PRESETS)
+        for preset in presets:
+            with trace_sprite(f"{preset}_skyline"):
+                img, manifest = create_skyline_impostor(preset)
+            path = os.path.join(impostor_dir, f"{preset}_skyline.png")
+            img.save(path, 'PNG')
+            with open(os.path.splitext(path)[0] + ".json", "w") as f:
+                json.dump(manifest, f, indent=2)
+                f.write("\n")
+            print(f"  Created {path} ({img.width}x{img.height}, "
+                  f"{manifest['skyline_buildings']} buildings, {manifest['mountains']} mountains)")
+        print(f"\nBaked {len(presets)} skyline impostors")
+        return
 
-    sprites = {
-        "earth_sky": create_earth_sky,
-        "mars_sky": create_mars_sky,
-        "space_stars": create_space_stars,
-    }
+    if args.skybox:
+        skybox_dir = os.path.join(output_dir, "skybox")
+        os.makedirs(skybox_dir, exist_ok=True)
+        print(f"Generating {args.skybox} skyboxes in {skybox_dir}/")
+        with PipelinedWriter() as writer:
+            for name in sprites:
+                for tier in args.tiers:
+                    with trace_sprite(f"{name}_{args.skybox}_{tier}"):
+                        img = create_skybox(name, args.skybox, SKYBOX_TIERS[tier], args.workers)
+                    writer.submit(img, os.path.join(skybox_dir, f"{name}_{args.skybox}_{tier}.png"))
+        print(f"\nGenerated {len(sprites) * len(args.tiers)} skyboxes")
+        return
+
+    print(f"Generating background sprites in {output_dir}/")
+    cache = LayerCache(args.layer_cache)
 
-    for name, create_func in sprites.items():
-        print(f"  Creating {name}.png...")
-        img = create_func()
-        output_path = os.path.join(output_dir, f"{name}.png")
-        img.save(output_path, 'PNG')
-        print(f"    Saved {output_path} ({img.width}x{img.height})")
+    # Each large PNG encodes on a writer thread while the next one renders
+    with PipelinedWriter() as writer:
+        for name, create_func in sprites.items():
+            print(f"  Creating {name}.png...")
+            with trace_sprite(name, tiled=args.tiled, layered=args.layered):
+                if args.layered:
+                    img = create_layered(name, cache)
+                elif args.tiled:
+                    img = create_tiled(name, args.workers)
+                else:
+                    img = create_func()
+            writer.submit(img, os.path.join(output_dir, f"{name}.png"))
 
     print(f"\nGenerated {len(sprites)} background sprites")
+    if args.layered:
+        print(f"Layers: {cache.hits} reused from {cache.cache_dir}, {cache.misses} rendered, "
+              f"{cache.prune()} stale removed")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""Compile blocks.json and terrain.json into a binary registry for Arcology.
+
+At startup BlockRegistry parses blocks.json, then builds one definition per
+block and resolves its colour and palette order. Terrain themes are parsed
+the same way. This build step validates both files against a schema and
+precomputes everything the loader derives, writing one little-endian file
+that the game can read with a single buffer read:
+- data/registry.bin
+
+Validation errors name the offending field (e.g. `blocks.json: corridor.size`)
+and abort the build, so a malformed entry fails here instead of at runtime.
+
+Layout (every section starts on an 8-byte boundary):
+- header: magic b"ARBR", u16 version, u16 table_count, u32 string_count,
+  u32 source_crc (crc32 of the two JSON files, for staleness checks)
+- table directory: per table u16 name, u16 column_count, u32 row_count,
+  u32 column directory offset
+- column directories: per column u16 name, u8 dtype code (DTYPE_CODES),
+  u8 pad, u32 data offset
+- strings: u32 offsets[string_count + 1] into a utf-8 blob. Every string
+  in the registry is interned once; index 0 is "" (absent)
+- column data: row_count values per column, fixed width
+
+Tables (see build_tables): colors, categories, blocks, palette, properties,
+themes, decorations, river_tiles, underground_layers. Rows refer to each
+other by index, e.g. blocks.category -> categories and blocks.color ->
+colors. Per-block optional fields go to properties. Each block owns the
+rows first_property .. first_property + property_count - 1.
+
+Usage: python3 scripts/generate_block_registry.py [--output data/registry.bin]
+       [--benchmark [N]]
+"""
+
+from generate_sprites import BLOCK_COLOR_OVERRIDES, CATEGORY_COLORS, FALLBACK_COLOR
+from sprite_profile import trace_generator, trace_stage
+import numpy as np
+import argparse
+import json
+import os
+import re
+import statistics
+import struct
+import time
+import zlib
+
+BLOCKS_CONFIG = "data/blocks.json"
+TERRAIN_CONFIG = "data/terrain.json"
+DEFAULT_OUTPUT = "data/registry.bin"
+
+REGISTRY_MAGIC = b"ARBR"
+REGISTRY_VERSION = 1
+REGISTRY_HEADER = struct.Struct("<4sHHII")
+TABLE_ENTRY = struct.Struct("<HHII")
+COLUMN_ENTRY = struct.Struct("<HBxI")
+
+DTYPE_CODES = {"u1": 0, "u2": 1, "u4": 2, "i4": 3, "f4": 4}
+DTYPES = {code: np.dtype("<" + name) for name, code in DTYPE_CODES.items()}
+
+# Mirrors src/game/block_registry.gd
+CATEGORY_ORDER = ["transit", "residential", "commercial", "industrial",
+                  "civic", "infrastructure", "green", "entertainment"]
+TRAVERSABILITY = ("public", "private")
+PANEL_MATERIALS = ("solid", "glass", "metal", "solar", "garden", "force_field")
+
+# Bits of blocks.flags
+BLOCK_FLAGS = ("ground_only", "connects_horizontal", "connects_vertical")
+# Bits of themes.flags
+THEME_FLAGS = ("has_river", "has_clear_zone", "has_underground")
+# properties.kind -> which value column holds the value
+PROPERTY_KINDS = ("bool", "int", "float")
+
+# Schemas: field -> (type, required). Optional fields may also be null.
+# float accepts ints; int and float never accept bools.
+BLOCK_SCHEMA = {
+    "name": (str, True),
+    "category": (str, True),
+    "traversability": (str, True),
+    "size": (list, True),
+    "cost": (int, True),
+    "capacity": (int, False),
+    "jobs": (int, False),
+    "panel_material": (str, False),
+}
+THEME_SCHEMA = {
+    "base_color": (str, False),
+    "base_texture": (str, False),
+    "background_color": (str, True),
+    "background": (str, True),
+    "decorations": (list, True),
+    "decoration_density": (float, True),
+    "decoration_clear_zone": (dict, False),
+    "has_river": (bool, True),
+    "river": (dict, False),
+    "underground": (dict, False),
+}
+DECORATION_SCHEMA = {"type": (str, True), "weight": (float, True), "size": (list, True)}
+CLEAR_ZONE_SCHEMA = {"center": (list, True), "radius": (float, True)}
+RIVER_SCHEMA = {"width": (int, True), "sprite_path": (str, True), "tiles": (dict, True)}
+UNDERGROUND_SCHEMA = {"sprite_path": (str, True), "layers": (dict, True), "default_layer": (str, True)}
+
+HEX_COLOR = re.compile(r"^#[0-9a-fA-F]{6}$")
+BENCHMARK_RUNS = 50
+
+
+def load_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _is_type(value, expected: type) -> bool:
+    if isinstance(value, bool):
+        return expected is bool
+    if expected is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, expected)
+
+
+def _check_fields(entry, schema: dict, path: str, errors: list) -> bool:
+    """Check required fields and types. Returns False if `entry` is not a dict."""
+    if not isinstance(entry, dict):
+        errors.append(f"{path}: expected an object")
+        return False
+    for field, (expected, required) in schema.items():
+        if field not in entry:
+            if required:
+                errors.append(f"{path}.{field}: missing")
+            continue
+        value = entry[field]
+        if value is None and not required:
+            continue
+        if not _is_type(value, expected):
+            expected_name = "number" if expected is float else expected.__name__
+            errors.append(f"{path}.{field}: expected {expected_name}, got {type(value).__name__}")
+    return True
+
+
+def _check_ints(value, count: int, path: str, errors: list, low: int = 1, high: int = 255) -> None:
+    if (not isinstance(value, list) or len(value) != count
+            or not all(_is_type(v, int) and low <= v <= high for v in value)):
+        errors.append(f"{path}: expected {count} integers in {low}..{high}")
+
+
+def validate_blocks(blocks, source: str = "blocks.json") -> list:
+    """Return schema errors for blocks.json (empty when valid)."""
+    errors = []
+    if not isinstance(blocks, dict) or not blocks:
+        return [f"{source}: expected an object of block definitions"]
+
+    property_types = {}
+    for block_id, entry in blocks.items():
+        path = f"{source}: {block_id}"
+        if not _check_fields(entry, BLOCK_SCHEMA, path, errors):
+            continue
+        if isinstance(entry.get("category"), str) and entry["category"] not in CATEGORY_ORDER:
+            errors.append(f"{path}.category: unknown category {entry['category']!r}")
+        if isinstance(entry.get("traversability"), str) and entry["traversability"] not in TRAVERSABILITY:
+            errors.append(f"{path}.traversability: expected one of {', '.join(TRAVERSABILITY)}")
+        if "size" in entry:
+            _check_ints(entry["size"], 3, f"{path}.size", errors)
+        material = entry.get("panel_material")
+        if isinstance(material, str) and material.lower() not in PANEL_MATERIALS:
+            errors.append(f"{path}.panel_material: unknown material {material!r}")
+
+        # Any other field is a scalar property with one kind across all blocks
+        for field, value in entry.items():
+            if field in BLOCK_SCHEMA or field in BLOCK_FLAGS:
+                if field in BLOCK_FLAGS and not isinstance(value, bool):
+                    errors.append(f"{path}.{field}: expected bool, got {type(value).__name__}")
+                continue
+            if isinstance(value, bool):
+                kind = "bool"
+            elif isinstance(value, int):
+                kind = "int"
+            elif isinstance(value, float):
+                kind = "float"
+            else:
+                errors.append(f"{path}.{field}: expected a number or bool, got {type(value).__name__}")
+                continue
+            known = property_types.setdefault(field, kind)
+            if known != kind:
+                if {known, kind} == {"int", "float"}:
+                    property_types[field] = "float"
+                else:
+                    errors.append(f"{path}.{field}: {kind} value for a {known} property")
+    return errors
+
+
+def validate_terrain(terrain, source: str = "terrain.json") -> list:
+    """Return schema errors for terrain.json (empty when valid)."""
+    errors = []
+    themes = terrain.get("themes") if isinstance(terrain, dict) else None
+    if not isinstance(themes, dict) or not themes:
+        return [f"{source}: expected a \"themes\" object"]
+
+    for theme_name, theme in themes.items():
+        path = f"{source}: themes.{theme_name}"
+        if not _check_fields(theme, THEME_SCHEMA, path, errors):
+            continue
+        for field in ("base_color", "background_color"):
+            value = theme.get(field)
+            if isinstance(value, str) and not HEX_COLOR.match(value):
+                errors.append(f"{path}.{field}: expected #RRGGBB, got {value!r}")
+
+        for i, decoration in enumerate(theme.get("decorations") or []):
+            if _check_fields(decoration, DECORATION_SCHEMA, f"{path}.decorations[{i}]", errors):
+                if "size" in decoration:
+                    _check_ints(decoration["size"], 2, f"{path}.decorations[{i}].size", errors)
+
+        if theme.get("decoration_clear_zone") and _check_fields(
+                theme["decoration_clear_zone"], CLEAR_ZONE_SCHEMA, f"{path}.decoration_clear_zone", errors):
+            center = theme["decoration_clear_zone"].get("center")
+            if center is not None:
+                _check_ints(center, 2, f"{path}.decoration_clear_zone.center", errors, -32768, 32767)
+
+        if theme.get("has_river") is True and not theme.get("river"):
+            errors.append(f"{path}.river: required when has_river is true")
+        if theme.get("river") and _check_fields(theme["river"], RIVER_SCHEMA, f"{path}.river", errors):
+            for tile, file in (theme["river"].get("tiles") or {}).items():
+                if not isinstance(file, str):
+                    errors.append(f"{path}.river.tiles.{tile}: expected str")
+
+        if theme.get("underground") and _check_fields(
+                theme["underground"], UNDERGROUND_SCHEMA, f"{path}.underground", errors):
+            for z, file in (theme["underground"].get("layers") or {}).items():
+                if not re.match(r"^-?\d+$", z):
+                    errors.append(f"{path}.underground.layers.{z}: key must be an integer Z level")
+                if not isinstance(file, str):
+                    errors.append(f"{path}.underground.layers.{z}: expected str")
+    return errors
+
+
+class StringTable:
+    """Interned strings; index 0 is the empty string."""
+
+    def __init__(self):
+        self.strings = [""]
+        self.index = {"": 0}
+
+    def __call__(self, value) -> int:
+        if value is None:
+            return 0
+        if value not in self.index:
+            self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return self.index[value]
+
+    def encode(self) -> bytes:
+        blobs = [s.encode() for s in self.strings]
+        offsets = np.cumsum([0] + [len(b) for b in blobs], dtype="<u4")
+        return offsets.tobytes() + b"".join(blobs)
+
+
+def _hex_rgba(value) -> int:
+    """#RRGGBB -> 0xRRGGBBFF, or 0 when absent."""
+    return (int(value[1:], 16) << 8 | 0xFF) if value else 0
+
+
+def _columns(rows: list, spec: dict) -> dict:
+    """Turn a list of row tuples into typed columns, one per spec entry."""
+    values = list(zip(*rows)) if rows else [()] * len(spec)
+    return {name: np.array(column, dtype="<" + dtype) for (name, dtype), column in zip(spec.items(), values)}
+
+
+@trace_stage
+def build_tables(blocks: dict, terrain: dict, intern: StringTable) -> dict:
+    """Precompute every registry table as name -> {column: array}."""
+    # Colour palette: categories in order, then id overrides, then fallback
+    colors = [CATEGORY_COLORS.get(c, FALLBACK_COLOR) for c in CATEGORY_ORDER]
+    override_index = {}
+    for block_id, color in BLOCK_COLOR_OVERRIDES.items():
+        override_index[block_id] = len(colors)
+        colors.append(color)
+    colors.append(FALLBACK_COLOR)
+
+    # Palette order: category order, then blocks.json order within a category
+    block_ids = list(blocks)
+    palette = sorted(range(len(block_ids)), key=lambda i: CATEGORY_ORDER.index(blocks[block_ids[i]]["category"]))
+    palette_position = {row: position for position, row in enumerate(palette)}
+
+    categories = []
+    for index, category in enumerate(CATEGORY_ORDER):
+        members = [p for p, row in enumerate(palette) if blocks[block_ids[row]]["category"] == category]
+        categories.append((intern(category), index, members[0] if members else 0, len(members)))
+
+    # Property kinds are decided over all blocks (an int in a float property is stored as float)
+    kinds = {}
+    for entry in blocks.values():
+        for field, value in entry.items():
+            if field in BLOCK_SCHEMA or field in BLOCK_FLAGS:
+                continue
+            kind = "bool" if isinstance(value, bool) else "int" if isinstance(value, int) else "float"
+            kinds[field] = "float" if kinds.get(field, kind) != kind else kind
+
+    block_rows, properties = [], []
+    for row, block_id in enumerate(block_ids):
+        entry = blocks[block_id]
+        sx, sy, sz = entry["size"]
+        flags = sum(1 << bit for bit, flag in enumerate(BLOCK_FLAGS) if entry.get(flag))
+        category = CATEGORY_ORDER.index(entry["category"])
+        color = override_index.get(block_id, category)
+        first_property = len(properties)
+        for field, value in entry.items():
+            if field in kinds:
+                kind = kinds[field]
+                properties.append((intern(field), PROPERTY_KINDS.index(kind),
+                                   int(value) if kind != "float" else 0,
+                                   float(value) if kind == "float" else 0.0))
+        block_rows.append((
+            intern(block_id), intern(entry["name"]), category, intern(entry["traversability"]),
+            intern((entry.get("panel_material") or "").lower()),
+            sx, sy, sz, sx * sz, sx * sy * sz, color, flags,
+            entry["cost"], entry.get("capacity") or 0, entry.get("jobs") or 0,
+            palette_position[row], first_property, len(properties) - first_property,
+        ))
+
+    themes, decorations, river_tiles, layers = [], [], [], []
+    for theme_name, theme in terrain["themes"].items():
+        clear_zone = theme.get("decoration_clear_zone") or {}
+        river = theme.get("river") or {}
+        underground = theme.get("underground") or {}
+        flags = sum(1 << bit for bit, present in enumerate(
+            (theme["has_river"], bool(clear_zone), bool(underground))) if present)
+
+        first_decoration, first_tile, first_layer = len(decorations), len(river_tiles), len(layers)
+        for decoration in theme["decorations"]:
+            decorations.append((intern(decoration["type"]), decoration["weight"], *decoration["size"]))
+        for tile, file in river.get("tiles", {}).items():
+            river_tiles.append((intern(tile), intern(file)))
+        for z, file in sorted(underground.get("layers", {}).items(), key=lambda item: -int(item[0])):
+            layers.append((int(z), intern(file)))
+
+        themes.append((
+            intern(theme_name), _hex_rgba(theme.get("base_color")), intern(theme.get("base_texture")),
+            _hex_rgba(theme["background_color"]), intern(theme["background"]),
+            theme["decoration_density"], *clear_zone.get("center", (0, 0)), clear_zone.get("radius", 0),
+            flags, river.get("width", 0), intern(river.get("sprite_path")),
+            intern(underground.get("sprite_path")), intern(underground.get("default_layer")),
+            first_decoration, len(decorations) - first_decoration,
+            first_tile, len(river_tiles) - first_tile,
+            first_layer, len(layers) - first_layer,
+        ))
+
+    return {
+        "colors": _columns(colors, {"r": "f4", "g": "f4", "b": "f4"}),
+        "categories": _columns(categories, {
+            "name": "u2", "color": "u1", "first_palette": "u2", "block_count": "u2"}),
+        "blocks": _columns(block_rows, {
+            "id": "u2", "name": "u2", "category": "u1", "traversability": "u2",
+            "panel_material": "u2", "size_x": "u1", "size_y": "u1", "size_z": "u1",
+            "footprint": "u4", "volume": "u4", "color": "u1", "flags": "u1",
+            "cost": "i4", "capacity": "i4", "jobs": "i4",
+            "palette_order": "u2", "first_property": "u2", "property_count": "u1"}),
+        "palette": _columns([(row,) for row in palette], {"block": "u2"}),
+        "properties": _columns(properties, {"key": "u2", "kind": "u1", "int_value": "i4", "float_value": "f4"}),
+        "themes": _columns(themes, {
+            "name": "u2", "base_color": "u4", "base_texture": "u2",
+            "background_color": "u4", "background": "u2", "decoration_density": "f4",
+            "clear_center_x": "i4", "clear_center_y": "i4", "clear_radius": "f4",
+            "flags": "u1", "river_width": "u1", "river_path": "u2",
+            "underground_path": "u2", "underground_default": "u2",
+            "first_decoration": "u2", "decoration_count": "u1",
+            "first_river_tile": "u2", "river_tile_count": "u1",
+            "first_layer": "u2", "layer_count": "u1"}),
+        "decorations": _columns(decorations, {"type": "u2", "weight": "f4", "size_x": "u1", "size_y": "u1"}),
+        "river_tiles": _columns(river_tiles, {"name": "u2", "file": "u2"}),
+        "underground_layers": _columns(layers, {"z": "i4", "file": "u2"}),
+    }
+
+
+def _align(offset: int) -> int:
+    return offset + (-offset % 8)
+
+
+def encode_registry(tables: dict, intern: StringTable, source_crc: int) -> bytes:
+    """Serialize tables (see module docstring for layout)."""
+    for name, columns in tables.items():
+        intern(name)
+        for column in columns:
+            intern(column)
+    strings = intern.encode()
+
+    offset = _align(REGISTRY_HEADER.size + TABLE_ENTRY.size * len(tables))
+    directory_offsets = []
+    for columns in tables.values():
+        directory_offsets.append(offset)
+        offset = _align(offset + COLUMN_ENTRY.size * len(columns))
+    strings_offset = offset
+    offset = _align(offset + len(strings))
+
+    out = bytearray(REGISTRY_HEADER.pack(REGISTRY_MAGIC, REGISTRY_VERSION, len(tables),
+                                         len(intern.strings), source_crc))
+    directories, data = bytearray(), bytearray()
+    for (name, columns), directory_offset in zip(tables.items(), directory_offsets):
+        rows = len(next(iter(columns.values())))
+        out += TABLE_ENTRY.pack(intern(name), len(columns), rows, directory_offset)
+        entries = bytearray()
+        for column_name, values in columns.items():
+            entries += COLUMN_ENTRY.pack(intern(column_name), DTYPE_CODES[values.dtype.str[1:]],
+                                         offset + len(data))
+            data += values.tobytes()
+            data += b"\0" * (-len(data) % 8)
+        directories += entries + b"\0" * (-len(entries) % 8)
+
+    out += b"\0" * (-len(out) % 8)
+    out += directories
+    assert len(out) == strings_offset
+    out += strings + b"\0" * (-len(strings) % 8)
+    return bytes(out + data)
+
+
+def read_registry(path: str) -> tuple:
+    """Read a registry file. Returns (strings, tables, source_crc).
+
+    tables maps name -> {column: read-only array view into the file data}.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, table_count, string_count, source_crc = REGISTRY_HEADER.unpack_from(data, 0)
+    if magic != REGISTRY_MAGIC or version != REGISTRY_VERSION:
+        raise ValueError(f"{path}: not a version {REGISTRY_VERSION} block registry")
+
+    entries = [TABLE_ENTRY.unpack_from(data, REGISTRY_HEADER.size + i * TABLE_ENTRY.size)
+               for i in range(table_count)]
+    # The string table follows the last column directory
+    _, last_columns, _, last_directory = entries[-1]
+    strings_offset = _align(last_directory + COLUMN_ENTRY.size * last_columns)
+    offsets = np.frombuffer(data, dtype="<u4", count=string_count + 1, offset=strings_offset).tolist()
+    blob = data[strings_offset + 4 * (string_count + 1):]
+    strings = [blob[start:end].decode() for start, end in zip(offsets, offsets[1:])]
+
+    tables = {}
+    for name, column_count, rows, directory in entries:
+        columns = {}
+        for i in range(column_count):
+            column, code, column_offset = COLUMN_ENTRY.unpack_from(data, directory + i * COLUMN_ENTRY.size)
+            columns[strings[column]] = np.frombuffer(data, dtype=DTYPES[code], count=rows, offset=column_offset)
+        tables[strings[name]] = columns
+    return strings, tables, source_crc
+
+
+def _load_json_registry(blocks_path: str, terrain_path: str) -> dict:
+    """The JSON startup path: parse both files and derive what BlockRegistry does."""
+    blocks = load_json(blocks_path)
+    load_json(terrain_path)
+    definitions = {}
+    by_category = {}
+    for block_id, entry in blocks.items():
+        category = entry.get("category", "")
+        size = entry.get("size", [1, 1, 1])
+        definitions[block_id] = {
+            "name": entry.get("name", block_id),
+            "size": (int(size[0]), int(size[1]), int(size[2])),
+            "category": category,
+            "color": BLOCK_COLOR_OVERRIDES.get(block_id, CATEGORY_COLORS.get(category, FALLBACK_COLOR)),
+        }
+        by_category.setdefault(category, []).append(block_id)
+    palette = [block_id for category in CATEGORY_ORDER for block_id in by_category.get(category, [])]
+    return {"definitions": definitions, "palette_order": palette}
+
+
+def _load_binary_registry(path: str) -> dict:
+    """The binary startup path: one read, column views and an id lookup."""
+    strings, tables, _ = read_registry(path)
+    ids = tables["blocks"]["id"].tolist()
+    return {"index": {strings[i]: row for row, i in enumerate(ids)}, "tables": tables}
+
+
+def benchmark(output: str, runs: int) -> None:
+    """Time both startup paths and print the median of `runs` loads each."""
+    def median_ms(load) -> float:
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            load()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    json_ms = median_ms(lambda: _load_json_registry(BLOCKS_CONFIG, TERRAIN_CONFIG))
+    binary_ms = median_ms(lambda: _load_binary_registry(output))
+    json_bytes = os.path.getsize(BLOCKS_CONFIG) + os.path.getsize(TERRAIN_CONFIG)
+
+    print(f"\nStartup benchmark (median of {runs} loads)")
+    print(f"  JSON:   {json_ms:7.3f} ms  ({json_bytes} bytes)")
+    print(f"  binary: {binary_ms:7.3f} ms  ({os.path.getsize(output)} bytes)")
+    print(f"  speedup: {json_ms / binary_ms:.1f}x")
+
+
+@trace_generator
+def main():
+    parser = argparse.ArgumentParser(description="Validate and compile the block registry.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="registry file to write")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=BENCHMARK_RUNS, default=0,
+                        help="time JSON vs binary startup loads (default 50 runs)")
+    args = parser.parse_args()
+
+    print("Compiling block registry")
+
+    with open(BLOCKS_CONFIG, "rb") as f:
+        blocks_raw = f.read()
+    with open(TERRAIN_CONFIG, "rb") as f:
+        terrain_raw = f.read()
+    blocks, terrain = json.loads(blocks_raw), json.loads(terrain_raw)
+
+    errors = validate_blocks(blocks) + validate_terrain(terrain)
+    if errors:
+        for error in errors:
+            print(f"  {error}")
+        raise SystemExit(f"Registry validation failed ({len(errors)} errors)")
+
+    intern = StringTable()
+    tables = build_tables(blocks, terrain, intern)
+    registry = encode_registry(tables, intern, zlib.crc32(terrain_raw, zlib.crc32(blocks_raw)))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "wb") as f:
+        f.write(registry)
+    print(f"  Created {args.output} ({len(registry)} bytes, {len(blocks)} blocks, "
+          f"{len(terrain['themes'])} themes, {len(intern.strings)} strings)")
+
+    if args.benchmark:
+        benchmark(args.output, args.benchmark)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Bake terrain decoration placements for an Arcology scenario.
+
+Runs the decoration rules from data/terrain.json (`decorations` weights and
+sizes, `decoration_density`, `decoration_clear_zone`) offline and writes a
+compact binary instance buffer the runtime can upload straight into a
+MultiMesh, instead of scattering decorations at scene build time:
+- placements/<scenario>.decorations.bin
+
+Placement is Poisson-disk sampling on the cell grid: candidates are thinned
+in vectorized rounds (a cell is kept when it has the highest random priority
+within MIN_SPACING), so decorations never clump or overlap. Multi-cell
+types such as rock_large (2x2) only land where their whole footprint is free.
+
+Buffer layout (little-endian):
+- header: magic b"ARDP", u16 version, u16 type_count, u32 instance_count
+- type table: per type u8 width, u8 height, u8 name_len, name (utf-8)
+- zero padding to an 8-byte boundary
+- instances: INSTANCE_DTYPE records (8 bytes each), cells in world coordinates
+
+Usage: python3 scripts/generate_decoration_placements.py [data/scenarios/earth_standard.json]
+       [--seed 42]
+"""
+
+from sprite_profile import trace_generator, trace_stage
+import numpy as np
+import argparse
+import json
+import os
+import struct
+
+TERRAIN_CONFIG = "data/terrain.json"
+DEFAULT_SCENARIO = "data/scenarios/earth_standard.json"
+
+# Minimum distance between decoration anchors, in cells. Must be at least 2
+# so 2x2 footprints can never overlap another decoration.
+MIN_SPACING = 2.0
+CANDIDATE_OVERSAMPLE = 2.0  # Candidates drawn per target decoration
+DECORATION_VARIANTS = 4     # Variant ids per type (tint/mesh variation at runtime)
+
+# River layout
+RIVER_MEANDER = 0.3  # Chance per step of jogging east/west instead of south
+
+# Connected edges -> river tile name (see generate_river_sprites)
+RIVER_TILES = {
+    frozenset("NS"): "straight_ns",
+    frozenset("EW"): "straight_ew",
+    frozenset("NE"): "corner_ne",
+    frozenset("NW"): "corner_nw",
+    frozenset("SE"): "corner_se",
+    frozenset("SW"): "corner_sw",
+    frozenset("N"): "end_n",
+    frozenset("S"): "end_s",
+    frozenset("E"): "end_e",
+    frozenset("W"): "end_w",
+}
+
+STEPS = {"N": (0, -1), "S": (0, 1), "E": (1, 0), "W": (-1, 0)}
+OPPOSITE = {"N": "S", "S": "N", "E": "W", "W": "E"}
+
+BUFFER_MAGIC = b"ARDP"
+BUFFER_VERSION = 1
+BUFFER_HEADER = struct.Struct("<4sHHI")
+
+INSTANCE_DTYPE = np.dtype([
+    ("x", "<i2"),        # World cell x (footprint top-left)
+    ("y", "<i2"),        # World cell y
+    ("type", "u1"),      # Index into the type table (terrain.json order)
+    ("variant", "u1"),   # 0..DECORATION_VARIANTS-1
+    ("rotation", "u1"),  # Quarter turns, 0..3
+    ("reserved", "u1"),
+])
+
+
+def load_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def in_clear_zone(x: int, y: int, origin: tuple, clear_zone: dict, margin: int = 0) -> bool:
+    """Check whether build-zone cell (x, y) lies in the theme's clear zone."""
+    if not clear_zone:
+        return False
+    cx, cy = clear_zone["center"]
+    wx, wy = origin[0] + x, origin[1] + y
+    return (wx - cx) ** 2 + (wy - cy) ** 2 <= (clear_zone["radius"] + margin) ** 2
+
+
+@trace_stage
+def plan_river(size: tuple, origin: tuple, clear_zone: dict,
+               rng: np.random.Generator) -> dict:
+    """Lay a river from the north edge to the south edge of the zone.
+
+    The river meanders east/west but never enters the clear zone: when the
+    cell to the south is in it, the river jogs sideways (away from the
+    zone's centre where it can, never doubling back) until the way south
+    is clear. Raises ValueError if the zone covers the start or pins the river
+    against an edge. Returns a dict mapping cell (x, y) -> river tile name.
+    """
+    width, height = size
+    x = int(rng.integers(width // 8, width // 4 + 1))
+    y = 0
+    if in_clear_zone(x, y, origin, clear_zone):
+        raise ValueError(f"river start ({x}, {y}) is inside the clear zone")
+    # The river enters from beyond the north edge
+    connections = {(x, y): {"N"}}
+    previous = "S"
+
+    while y < height - 1:
+        step = "S"
+        if rng.random() < RIVER_MEANDER:
+            side = "E" if rng.random() < 0.5 else "W"
+            if side != OPPOSITE[previous]:
+                dx, _ = STEPS[side]
+                nx = x + dx
+                if 0 <= nx < width and not in_clear_zone(nx, y, origin, clear_zone, margin=1):
+                    step = side
+        if step == "S" and in_clear_zone(x, y + 1, origin, clear_zone):
+            # Going south would enter the clear zone: jog around it instead
+            away = "W" if origin[0] + x < clear_zone["center"][0] else "E"
+            sides = [side for side in (away, OPPOSITE[away]) if side != OPPOSITE[previous]
+                     and 0 <= x + STEPS[side][0] < width
+                     and not in_clear_zone(x + STEPS[side][0], y, origin, clear_zone)]
+            if not sides:
+                raise ValueError(f"river at ({x}, {y}) cannot get around the clear zone")
+            step = sides[0]
+
+        dx, dy = STEPS[step]
+        connections[(x, y)].add(step)
+        x, y = x + dx, y + dy
+        connections.setdefault((x, y), set()).add(OPPOSITE[step])
+        previous = step
+
+    # ...and leaves beyond the south edge
+    connections[(x, y)].add("S")
+    return {cell: RIVER_TILES[frozenset(edges)] for cell, edges in connections.items()}
+
+
+def _shift(grid: np.ndarray, dy: int, dx: int, fill) -> np.ndarray:
+    """Return grid shifted so out[y, x] = grid[y + dy, x + dx] (fill outside)."""
+    out = np.full_like(grid, fill)
+    h, w = grid.shape
+    ys, yd = slice(max(dy, 0), h + min(dy, 0)), slice(max(-dy, 0), h + min(-dy, 0))
+    xs, xd = slice(max(dx, 0), w + min(dx, 0)), slice(max(-dx, 0), w + min(-dx, 0))
+    out[yd, xd] = grid[ys, xs]
+    return out
+
+
+@trace_stage
+def poisson_disk_cells(candidates: np.ndarray, spacing: float,
+                       rng: np.random.Generator) -> tuple:
+    """Select a Poisson-disk subset of candidate cells.
+
+    Every round keeps each active candidate whose random priority is the
+    highest within `spacing`, then retires all candidates near a kept cell.
+    Each round is a handful of whole-grid array ops. Returns (selected,
+    priority): a boolean grid of kept cells and the priorities used, so
+    callers can cap the count by priority.
+    """
+    priority = np.where(candidates, rng.random(candidates.shape), -1.0)
+    reach = int(np.ceil(spacing))
+    offsets = [(dy, dx) for dy in range(-reach, reach + 1) for dx in range(-reach, reach + 1)
+               if 0 < dy * dy + dx * dx < spacing * spacing]
+
+    selected = np.zeros(candidates.shape, dtype=bool)
+    active = candidates.copy()
+    while active.any():
+        live = np.where(active, priority, -1.0)
+        local_max = active.copy()
+        for dy, dx in offsets:
+            local_max &= live > _shift(live, dy, dx, -1.0)
+        selected |= local_max
+
+        retired = local_max.copy()
+        for dy, dx in offsets:
+            retired |= _shift(local_max, dy, dx, False)
+        active &= ~retired
+
+    return selected, priority
+
+
+@trace_stage
+def place_decorations(size: tuple, origin: tuple, theme: dict, blocked: np.ndarray,
+                      rng: np.random.Generator) -> np.ndarray:
+    """Place theme decorations over a build zone.
+
+    `blocked` is a (height, width) boolean grid of cells that must stay
+    empty (e.g. river). Returns an INSTANCE_DTYPE array in world cells.
+    """
+    decorations = theme.get("decorations", [])
+    density = theme.get("decoration_density", 0)
+    if not decorations or density <= 0:
+        return np.zeros(0, dtype=INSTANCE_DTYPE)
+
+    width, height = size
+    ys, xs = np.mgrid[0:height, 0:width]
+    free = ~blocked
+    clear_zone = theme.get("decoration_clear_zone")
+    if clear_zone:
+        cx, cy = clear_zone["center"]
+        dist_sq = (xs + origin[0] - cx) ** 2 + (ys + origin[1] - cy) ** 2
+        free &= dist_sq > clear_zone["radius"] ** 2
+
+    candidates = free & (rng.random(free.shape) < min(1.0, density * CANDIDATE_OVERSAMPLE))
+    selected, priority = poisson_disk_cells(candidates, MIN_SPACING, rng)
+
+    # Cap to the configured density, keeping the highest priorities
+    target = int(round(density * free.sum()))
+    cell_y, cell_x = np.nonzero(selected)
+    if cell_x.size > target:
+        keep = np.argsort(priority[cell_y, cell_x])[::-1][:target]
+        keep.sort()
+        cell_y, cell_x = cell_y[keep], cell_x[keep]
+
+    # Weighted type selection, all anchors at once
+    weights = np.array([d["weight"] for d in decorations], dtype=np.float64)
+    sizes = np.array([d["size"] for d in decorations])
+    types = rng.choice(len(decorations), size=cell_x.size, p=weights / weights.sum())
+
+    # Multi-cell types need their whole footprint free; otherwise fall back
+    # to a weighted single-cell type
+    padded = np.zeros((height + 1, width + 1), dtype=bool)
+    padded[:height, :width] = free
+    fits = np.ones(cell_x.size, dtype=bool)
+    for dy in range(sizes[:, 1].max()):
+        for dx in range(sizes[:, 0].max()):
+            needed = (sizes[types, 0] > dx) & (sizes[types, 1] > dy)
+            cover = padded[np.minimum(cell_y + dy, height), np.minimum(cell_x + dx, width)]
+            fits &= ~needed | cover
+
+    single = (sizes[:, 0] == 1) & (sizes[:, 1] == 1)
+    if (~fits).any() and single.any():
+        single_weights = np.where(single, weights, 0.0)
+        types[~fits] = rng.choice(len(decorations), size=(~fits).sum(),
+                                  p=single_weights / single_weights.sum())
+    elif (~fits).any():
+        cell_x, cell_y, types = cell_x[fits], cell_y[fits], types[fits]
+
+    instances = np.zeros(cell_x.size, dtype=INSTANCE_DTYPE)
+    instances["x"] = cell_x + origin[0]
+    instances["y"] = cell_y + origin[1]
+    instances["type"] = types
+    instances["variant"] = rng.integers(0, DECORATION_VARIANTS, cell_x.size)
+    instances["rotation"] = rng.integers(0, 4, cell_x.size)
+    return instances
+
+
+def plan_layout(scenario: dict, theme: dict, seed: int) -> tuple:
+    """Plan river cells and decoration instances for a scenario.
+
+    Returns (river, instances): river maps zone cell (x, y) -> tile name;
+    instances is an INSTANCE_DTYPE array in world cells.
+    """
+    size = tuple(scenario["build_zone_size"])
+    origin = tuple(scenario["build_zone_origin"])
+    rng = np.random.default_rng(seed)
+
+    river = {}
+    if theme.get("has_river"):
+        river = plan_river(size, origin, theme.get("decoration_clear_zone"), rng)
+
+    blocked = np.zeros((size[1], size[0]), dtype=bool)
+    for x, y in river:
+        blocked[y, x] = True
+
+    return river, place_decorations(size, origin, theme, blocked, rng)
+
+
+def write_instances(path: str, decorations: list, instances: np.ndarray) -> None:
+    """Write the binary instance buffer (see module docstring for layout)."""
+    type_table = b"".join(
+        struct.pack("<BBB", d["size"][0], d["size"][1], len(d["type"].encode())) + d["type"].encode()
+        for d in decorations
+    )
+    header = BUFFER_HEADER.pack(BUFFER_MAGIC, BUFFER_VERSION, len(decorations), instances.size)
+    padding = b"\0" * (-(len(header) + len(type_table)) % 8)
+    with open(path, "wb") as f:
+        f.write(header + type_table + padding)
+        f.write(instances.astype(INSTANCE_DTYPE, copy=False).tobytes())
+
+
+def read_instances(path: str) -> tuple:
+    """Read an instance buffer. Returns (types, instances).
+
+    types is a list of (name, (width, height)) indexed by instance type id.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, type_count, count = BUFFER_HEADER.unpack_from(data, 0)
+    if magic != BUFFER_MAGIC or version != BUFFER_VERSION:
+        raise ValueError(f"{path}: not a version {BUFFER_VERSION} decoration buffer")
+
+    offset = BUFFER_HEADER.size
+    types = []
+    for _ in range(type_count):
+        w, h, name_len = struct.unpack_from("<BBB", data, offset)
+        offset += 3
+        types.append((data[offset:offset + name_len].decode(), (w, h)))
+        offset += name_len
+    offset += -offset % 8
+
+    instances = np.frombuffer(data, dtype=INSTANCE_DTYPE, count=count, offset=offset)
+    return types, instances
+
+
+@trace_generator
+def main():
+    parser = argparse.ArgumentParser(description="Bake decoration placements for a scenario.")
+    parser.add_argument("scenario", nargs="?", default=DEFAULT_SCENARIO)
+    parser.add_argument("--seed", type=int, default=42, help="river and decoration layout seed")
+    args = parser.parse_args()
+
+    scenario = load_json(args.scenario)
+    theme_name = scenario["ground_type"]
+    themes = load_json(TERRAIN_CONFIG)["themes"]
+    if theme_name not in themes:
+        print(f"No terrain theme '{theme_name}' in {TERRAIN_CONFIG}; nothing to bake")
+        return
+    theme = themes[theme_name]
+
+    output_dir = os.path.join("assets/sprites/terrain", theme_name, "placements")
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"Baking decoration placements for {args.scenario}")
+
+    _, instances = plan_layout(scenario, theme, args.seed)
+    scenario_name = os.path.splitext(os.path.basename(args.scenario))[0]
+    output_path = os.path.join(output_dir, f"{scenario_name}.decorations.bin")
+    write_instances(output_path, theme.get("decorations", []), instances)
+    print(f"  Created {output_path} ({instances.size} instances, {os.path.getsize(output_path)} bytes)")
+
+    counts = np.bincount(instances["type"], minlength=len(theme.get("decorations", [])))
+    for deco, count in zip(theme.get("decorations", []), counts):
+        print(f"    {deco['type']}: {count}")
+
+
+if __name__ == "__main__":
+    main()
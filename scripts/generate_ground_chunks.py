@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Bake whole-map ground chunk textures for an Arcology scenario.
+
+Composites the theme base texture, river tiles and decorations for a
+scenario's build zone into fixed-size top-down chunk textures, so the
+runtime draws a few dozen chunks instead of one sprite per cell:
+- chunks/<scenario>/chunk_<cx>_<cy>.png (512x512 for 8x8 cells at 64px)
+- chunks/<scenario>/chunk_index.json - chunk files and the cells they cover
+
+Inputs are a scenario from data/scenarios/ (build_zone_origin,
+build_zone_size, ground_type) and the matching theme in data/terrain.json.
+River tiles are isometric diamonds; they are unwarped into square cells so
+they lie flat on the ground plane. River and decoration layout come from
+generate_decoration_placements.plan_layout, so chunks match the baked
+placement buffer for the same seed. Chunks render in a process pool.
+
+Usage: python3 scripts/generate_ground_chunks.py [data/scenarios/earth_standard.json]
+       [--chunk-cells 8] [--cell-px 64] [--seed 42] [--workers N]
+"""
+
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from generate_decoration_placements import load_json, plan_layout
+from generate_ground_textures import BASE_TEXTURES, create_base_texture, hex_to_rgb
+from generate_river_sprites import grid_to_design, symmetric_sprites
+from generate_terrain_sprites import DECORATION_SPRITES
+from sprite_profile import trace_generator, trace_span, trace_stage
+import numpy as np
+import argparse
+import json
+import os
+
+TERRAIN_CONFIG = "data/terrain.json"
+DEFAULT_SCENARIO = "data/scenarios/earth_standard.json"
+
+# Chunk layout
+CELL_PX = 64       # Pixels per ground cell in the baked texture
+CHUNK_CELLS = 8    # Cells per chunk side (8x8 cells -> 512x512 at 64px)
+
+
+@trace_stage
+def iso_to_topdown(tile: Image.Image, cell_px: int) -> np.ndarray:
+    """Unwarp an isometric diamond tile into a square top-down cell.
+
+    Each output pixel is mapped back to grid coordinates (u, v) and sampled
+    from the diamond (nearest neighbour) in one vectorized gather.
+    """
+    pixels = np.asarray(tile.convert('RGBA'))
+    scale = tile.width / 64
+    uv = (np.arange(cell_px) + 0.5) / cell_px
+    x, y = grid_to_design(uv[None, :], uv[:, None])
+    cols = np.clip(np.round(x * scale).astype(int), 0, tile.width - 1)
+    rows = np.clip(np.round(y * scale).astype(int), 0, tile.height - 1)
+    return pixels[rows, cols]
+
+
+@trace_stage
+def decoration_decal(sprite: Image.Image, w: int, h: int, cell_px: int) -> Image.Image:
+    """Fit a decoration sprite into its w x h cell footprint (bottom-aligned)."""
+    box_w, box_h = w * cell_px, h * cell_px
+    ratio = min(box_w / sprite.width, box_h / sprite.height)
+    fitted = sprite.resize((max(1, round(sprite.width * ratio)),
+                            max(1, round(sprite.height * ratio))), Image.LANCZOS)
+    decal = Image.new('RGBA', (box_w, box_h), (0, 0, 0, 0))
+    decal.paste(fitted, ((box_w - fitted.width) // 2, box_h - fitted.height))
+    return decal
+
+
+# Per-process render state, set once by _init_worker
+_assets = {}
+
+
+def _init_worker(base: np.ndarray, river_tiles: dict, decals: dict, cell_px: int) -> None:
+    _assets.update(base=base, river_tiles=river_tiles, decals=decals, cell_px=cell_px)
+
+
+def render_chunk(job: dict) -> str:
+    """Render one chunk and write it to job['path']. Runs in a worker."""
+    cell_px = _assets["cell_px"]
+    x0, y0, x1, y1 = job["cells"]
+    width, height = (x1 - x0) * cell_px, (y1 - y0) * cell_px
+
+    # Base texture, repeated with wrap-around so it stays seamless across chunks
+    base = _assets["base"]
+    rows = (np.arange(height) + y0 * cell_px) % base.shape[0]
+    cols = (np.arange(width) + x0 * cell_px) % base.shape[1]
+    pixels = np.empty((height, width, 4), dtype=np.uint8)
+    pixels[..., :3] = base[rows[:, None], cols[None, :]]
+    pixels[..., 3] = 255
+
+    # River cells fully replace the ground where the tile is opaque
+    for (x, y), tile in job["river"]:
+        cell = _assets["river_tiles"][tile]
+        px, py = (x - x0) * cell_px, (y - y0) * cell_px
+        target = pixels[py:py + cell_px, px:px + cell_px]
+        opaque = cell[..., 3] > 0
+        target[opaque] = cell[opaque]
+
+    img = Image.fromarray(pixels, 'RGBA')
+
+    # Decorations may straddle chunk edges; each chunk draws its part
+    for deco_type, x, y in job["decorations"]:
+        decal = _assets["decals"][deco_type]
+        px, py = (x - x0) * cell_px, (y - y0) * cell_px
+        img.alpha_composite(decal, dest=(max(0, px), max(0, py)),
+                            source=(max(0, -px), max(0, -py)))
+
+    img.save(job["path"], 'PNG')
+    return job["path"]
+
+
+def load_base_texture(theme: dict) -> np.ndarray:
+    """Return the theme base texture as an RGB array (flat base_color fallback)."""
+    texture_name = theme.get("base_texture")
+    if texture_name in BASE_TEXTURES:
+        return np.asarray(create_base_texture(texture_name))
+    return np.full((1, 1, 3), hex_to_rgb(theme["base_color"]), dtype=np.uint8)
+
+
+def plan_chunks(size: tuple, chunk_cells: int, output_dir: str,
+                river: dict, decorations: list) -> list:
+    """Split the build zone into chunk jobs with the river and decorations they touch."""
+    width, height = size
+    jobs = []
+    for cy in range((height + chunk_cells - 1) // chunk_cells):
+        for cx in range((width + chunk_cells - 1) // chunk_cells):
+            x0, y0 = cx * chunk_cells, cy * chunk_cells
+            x1, y1 = min(x0 + chunk_cells, width), min(y0 + chunk_cells, height)
+            jobs.append({
+                "chunk": [cx, cy],
+                "cells": [x0, y0, x1, y1],
+                "path": os.path.join(output_dir, f"chunk_{cx}_{cy}.png"),
+                "river": [(cell, tile) for cell, tile in river.items()
+                          if x0 <= cell[0] < x1 and y0 <= cell[1] < y1],
+                "decorations": [(t, x, y) for t, x, y, w, h in decorations
+                                if x < x1 and x + w > x0 and y < y1 and y + h > y0],
+            })
+    return jobs
+
+
+def bake(scenario_path: str, chunk_cells: int = CHUNK_CELLS, cell_px: int = CELL_PX,
+         seed: int = 42, workers: int = None) -> str:
+    """Bake all chunks for a scenario. Returns the chunk index path."""
+    scenario = load_json(scenario_path)
+    theme_name = scenario["ground_type"]
+    theme = load_json(TERRAIN_CONFIG)["themes"].get(theme_name)
+    if not theme or not theme.get("base_color"):
+        raise ValueError(f"Theme '{theme_name}' has no ground to bake")
+
+    size = tuple(scenario["build_zone_size"])
+    origin = tuple(scenario["build_zone_origin"])
+    river, instances = plan_layout(scenario, theme, seed)
+
+    river_tiles = {
+        name: iso_to_topdown(create_func(cell_px / 64), cell_px)
+        for name, create_func in symmetric_sprites().items()
+        if name in set(river.values())
+    }
+    decals = {}
+    for deco in theme.get("decorations", []):
+        create_func = DECORATION_SPRITES.get(deco["type"])
+        if create_func is None:
+            print(f"  Skipped decoration '{deco['type']}': no generator")
+            continue
+        decals[deco["type"]] = decoration_decal(create_func(cell_px / 64), *deco["size"], cell_px)
+
+    # Instances are in world cells; chunks work in build-zone cells
+    theme_decorations = theme.get("decorations", [])
+    decorations = [
+        (theme_decorations[i]["type"], x - origin[0], y - origin[1], *theme_decorations[i]["size"])
+        for x, y, i in zip(instances["x"].tolist(), instances["y"].tolist(), instances["type"].tolist())
+        if theme_decorations[i]["type"] in decals
+    ]
+
+    scenario_name = os.path.splitext(os.path.basename(scenario_path))[0]
+    output_dir = os.path.join("assets/sprites/terrain", theme_name, "chunks", scenario_name)
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = plan_chunks(size, chunk_cells, output_dir, river, decorations)
+    init_args = (load_base_texture(theme), river_tiles, decals, cell_px)
+    with trace_span("chunk_pool", chunks=len(jobs)), \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=init_args) as pool:
+        for path in pool.map(render_chunk, jobs):
+            print(f"  Created {path}")
+
+    index = {
+        "scenario": scenario_name,
+        "theme": theme_name,
+        "build_zone_origin": list(origin),
+        "build_zone_size": list(size),
+        "cell_px": cell_px,
+        "chunk_cells": chunk_cells,
+        "chunk_px": chunk_cells * cell_px,
+        "chunks": [
+            {"file": os.path.basename(job["path"]), "chunk": job["chunk"], "cells": job["cells"]}
+            for job in jobs
+        ],
+    }
+    index_path = os.path.join(output_dir, "chunk_index.json")
+    with open(index_path, "w") as f:
+        json.dump(index, f, indent=2)
+    return index_path
+
+
+@trace_generator
+def main():
+    parser = argparse.ArgumentParser(description="Bake ground chunk textures for a scenario.")
+    parser.add_argument("scenario", nargs="?", default=DEFAULT_SCENARIO)
+    parser.add_argument("--chunk-cells", type=int, default=CHUNK_CELLS)
+    parser.add_argument("--cell-px", type=int, default=CELL_PX)
+    parser.add_argument("--seed", type=int, default=42, help="river and decoration layout seed")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    args = parser.parse_args()
+
+    print(f"Baking ground chunks for {args.scenario}")
+    index_path = bake(args.scenario, args.chunk_cells, args.cell_px, args.seed, args.workers)
+    with open(index_path) as f:
+        chunk_count = len(json.load(f)["chunks"])
+    print(f"\nBaked {chunk_count} chunks ({index_path})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Generate tileable ground base textures for Arcology terrain themes.
+
+Creates one small seamless texture per theme `base_texture` in data/terrain.json:
+- earth/grass_noise.png (256x256) - mottled grass
+- mars/rocky_dust.png (256x256) - dusty regolith with pebbles
+
+Textures are built from multi-octave periodic value noise, so the left/right
+and top/bottom edges match and the tile can repeat across the whole build
+zone (100x100 cells) without seams.
+
+Usage: python3 scripts/generate_ground_textures.py
+"""
+
+from PIL import Image
+from sprite_profile import trace_generator, trace_sprite, trace_stage
+from sprite_writer import PipelinedWriter
+import numpy as np
+import json
+import os
+
+# Tile dimensions (repeated across the ground plane at runtime)
+TEXTURE_SIZE = 256
+
+TERRAIN_CONFIG = "data/terrain.json"
+VARIANT_SEED_STRIDE = 10007  # Seed offset per variant (keeps texture seeds apart)
+
+# Per-texture generation settings, keyed by terrain.json `base_texture`.
+# Each theme gets its own seed so textures are reproducible and independent.
+BASE_TEXTURES = {
+    "grass_noise": {
+        "seed": 1101,
+        "base_period": 4,      # Noise cells across the tile at octave 0
+        "octaves": 5,
+        "persistence": 0.55,
+        "palette": ["#2f5a32", "#4a7c4e", "#6a9a5a"],  # dark, base, light
+        "speckle": 0.0,
+    },
+    "rocky_dust": {
+        "seed": 2202,
+        "base_period": 3,
+        "octaves": 6,
+        "persistence": 0.6,
+        "palette": ["#6b3410", "#8b4513", "#b0683a"],
+        "speckle": 0.04,       # Fraction of pixels turned into dark pebbles
+    },
+}
+
+
+def hex_to_rgb(hex_color: str) -> tuple:
+    """Convert hex color to RGB tuple."""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def periodic_value_noise(size: int, period: int, rng: np.random.Generator) -> np.ndarray:
+    """Return a size x size array of smooth value noise that wraps at the edges.
+
+    A period x period lattice of random values is sampled with wrap-around
+    indexing and blended with a smoothstep curve, so the result tiles exactly.
+    """
+    lattice = rng.random((period, period))
+
+    coords = np.arange(size) * period / size
+    i0 = np.floor(coords).astype(int)
+    i1 = (i0 + 1) % period
+    t = coords - i0
+    t = t * t * (3.0 - 2.0 * t)  # Smoothstep
+
+    # Gather the four lattice corners for every pixel at once
+    v00 = lattice[i0[:, None], i0[None, :]]
+    v01 = lattice[i0[:, None], i1[None, :]]
+    v10 = lattice[i1[:, None], i0[None, :]]
+    v11 = lattice[i1[:, None], i1[None, :]]
+
+    tx = t[None, :]
+    ty = t[:, None]
+    top = v00 + (v01 - v00) * tx
+    bottom = v10 + (v11 - v10) * tx
+    return top + (bottom - top) * ty
+
+
+@trace_stage
+def fractal_noise(size: int, base_period: int, octaves: int,
+                  persistence: float, seed: int) -> np.ndarray:
+    """Sum octaves of periodic value noise, normalised to 0..1.
+
+    Each octave doubles the lattice period so every layer still wraps.
+    """
+    rng = np.random.default_rng(seed)
+    total = np.zeros((size, size))
+    amplitude = 1.0
+    period = base_period
+
+    for _ in range(octaves):
+        total += periodic_value_noise(size, min(period, size), rng) * amplitude
+        amplitude *= persistence
+        period *= 2
+
+    total -= total.min()
+    peak = total.max()
+    if peak > 0:
+        total /= peak
+    return total
+
+
+def create_base_texture(name: str, size: int = TEXTURE_SIZE, variant: int = 0) -> Image.Image:
+    """Create a tileable base texture from its BASE_TEXTURES config.
+
+    Variants reseed the noise; variant 0 is the shipped texture.
+    """
+    config = BASE_TEXTURES[name]
+    seed = config["seed"] + variant * VARIANT_SEED_STRIDE
+    noise = fractal_noise(size, config["base_period"], config["octaves"],
+                          config["persistence"], seed)
+
+    # Map noise through a three-stop palette: dark -> base -> light
+    dark, base, light = (np.array(hex_to_rgb(c), dtype=np.float64) for c in config["palette"])
+    n = noise[..., None]
+    low = dark + (base - dark) * np.clip(n * 2.0, 0.0, 1.0)
+    pixels = np.where(n < 0.5, low, base + (light - base) * np.clip(n * 2.0 - 1.0, 0.0, 1.0))
+
+    if config["speckle"] > 0:
+        rng = np.random.default_rng(seed + 1)
+        pebbles = rng.random((size, size)) < config["speckle"]
+        pixels[pebbles] = pixels[pebbles] * 0.7
+
+    return Image.fromarray(pixels.round().astype(np.uint8), 'RGB')
+
+
+def load_theme_textures(config_path: str = TERRAIN_CONFIG) -> dict:
+    """Map theme name -> base_texture name for themes that define one."""
+    with open(config_path) as f:
+        themes = json.load(f)["themes"]
+    return {
+        theme: data["base_texture"]
+        for theme, data in themes.items()
+        if data.get("base_texture")
+    }
+
+
+@trace_generator
+def main():
+    theme_textures = load_theme_textures()
+
+    print("Generating ground base textures")
+
+    generated = 0
+    with PipelinedWriter() as writer:
+        for theme, texture_name in theme_textures.items():
+            if texture_name not in BASE_TEXTURES:
+                print(f"  Skipped {theme}: no generator for '{texture_name}'")
+                continue
+
+            output_dir = os.path.join("assets/sprites/terrain", theme)
+            os.makedirs(output_dir, exist_ok=True)
+
+            with trace_sprite(texture_name, theme=theme):
+                img = create_base_texture(texture_name)
+            writer.submit(img, os.path.join(output_dir, f"{texture_name}.png"))
+            generated += 1
+
+    print(f"\nGenerated {generated} base textures")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,17 +16,29 @@ Creates Earth theme river tiles:
 Note: In isometric view, N/S alignment runs along the Y axis (NE-SW screen diagonal)
 and E/W alignment runs along the X axis (NW-SE screen diagonal).
 
-Usage: python3 scripts/generate_river_sprites.py
+With --symmetric, four canonical prototypes are rendered and the other tiles
+are derived from them by mirroring; river_atlas.png/.json hold only the
+prototype pixels plus a per-tile flip flag.
+
+Usage: python3 scripts/generate_river_sprites.py [--scales 1 2 4] [--symmetric]
+       [--trim [--hull]] [--masks]
 """
 
-from PIL import Image, ImageDraw
+from PIL import Image
+from sprite_profile import trace_generator, trace_stage
+from sprite_scale import ScaledDraw, export_scales, scale_arg_parser, scale_suffix, scaled_size
+from sprite_writer import PipelinedWriter
+import numpy as np
+import functools
+import json
+import math
 import os
 
 # Standard sprite dimensions (isometric diamond)
 TILE_WIDTH = 64
 TILE_HEIGHT = 64
 
-# Diamond coordinates (isometric top-down view)
+# Diamond coordinates in 64x64 design units (isometric top-down view)
 # The visible ground is a diamond shape
 DIAMOND_TOP = (32, 16)     # Top point
 DIAMOND_RIGHT = (56, 32)   # Right point
@@ -40,6 +52,7 @@ def hex_to_rgb(hex_color: str) -> tuple:
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 
+@trace_stage(aggregate=True)
 def lerp_color(c1: tuple, c2: tuple, t: float) -> tuple:
     """Linear interpolate between two colors."""
     return tuple(int(c1[i] + (c2[i] - c1[i]) * t) for i in range(3))
@@ -54,24 +67,24 @@ BANK_DARK = hex_to_rgb("#5c4827")      # River bank (earth)
 BANK_LIGHT = hex_to_rgb("#8b7355")     # Bank highlight
 
 
-def create_base_diamond() -> Image.Image:
+def create_base_diamond(scale: float = 1.0) -> Image.Image:
     """Create a base transparent image with diamond reference."""
-    return Image.new('RGBA', (TILE_WIDTH, TILE_HEIGHT), (0, 0, 0, 0))
+    return Image.new('RGBA', scaled_size(TILE_WIDTH, TILE_HEIGHT, scale), (0, 0, 0, 0))
 
 
-def draw_isometric_diamond(draw: ImageDraw.Draw, points: list, fill: tuple, outline=None):
+def draw_isometric_diamond(draw: ScaledDraw, points: list, fill: tuple, outline=None):
     """Draw an isometric diamond shape."""
     draw.polygon(points, fill=fill, outline=outline)
 
 
-def create_straight_ns() -> Image.Image:
+def create_straight_ns(scale: float = 1.0) -> Image.Image:
     """Create north-south oriented river (flows along Y axis).
 
     In isometric view, this runs from top-left to bottom-right diagonal.
     The river fills the middle of the diamond from N to S edges.
     """
-    img = create_base_diamond()
-    draw = ImageDraw.Draw(img)
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
 
     # River channel runs from top to bottom of diamond
     # Banks on left and right sides
@@ -141,13 +154,13 @@ def create_straight_ns() -> Image.Image:
     return img
 
 
-def create_straight_ew() -> Image.Image:
+def create_straight_ew(scale: float = 1.0) -> Image.Image:
     """Create east-west oriented river (flows along X axis).
 
     In isometric view, this runs from top-right to bottom-left diagonal.
     """
-    img = create_base_diamond()
-    draw = ImageDraw.Draw(img)
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
 
     # Top bank
     bank_top = [
@@ -208,10 +221,10 @@ def create_straight_ew() -> Image.Image:
     return img
 
 
-def create_corner_ne() -> Image.Image:
+def create_corner_ne(scale: float = 1.0) -> Image.Image:
     """Create corner turning from N to E (or E to N)."""
-    img = create_base_diamond()
-    draw = ImageDraw.Draw(img)
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
 
     # This corner has water in the NE quadrant, banks elsewhere
 
@@ -271,10 +284,10 @@ def create_corner_ne() -> Image.Image:
     return img
 
 
-def create_corner_nw() -> Image.Image:
+def create_corner_nw(scale: float = 1.0) -> Image.Image:
     """Create corner turning from N to W (or W to N)."""
-    img = create_base_diamond()
-    draw = ImageDraw.Draw(img)
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
 
     # SE bank (large)
     bank_se = [
@@ -332,10 +345,10 @@ def create_corner_nw() -> Image.Image:
     return img
 
 
-def create_corner_se() -> Image.Image:
+def create_corner_se(scale: float = 1.0) -> Image.Image:
     """Create corner turning from S to E (or E to S)."""
-    img = create_base_diamond()
-    draw = ImageDraw.Draw(img)
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
 
     # NW bank
     bank_nw = [
@@ -385,10 +398,10 @@ def create_corner_se() -> Image.Image:
     return img
 
 
-def create_corner_sw() -> Image.Image:
+def create_corner_sw(scale: float = 1.0) -> Image.Image:
     """Create corner turning from S to W (or W to S)."""
-    img = create_base_diamond()
-    draw = ImageDraw.Draw(img)
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
 
     # NE bank
     bank_ne = [
@@ -438,10 +451,10 @@ def create_corner_sw() -> Image.Image:
     return img
 
 
-def create_end_n() -> Image.Image:
+def create_end_n(scale: float = 1.0) -> Image.Image:
     """Create river end pointing north (source/sink)."""
-    img = create_base_diamond()
-    draw = ImageDraw.Draw(img)
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
 
     # Banks on all sides except where water enters from south
     # Bank around the pool
@@ -469,10 +482,10 @@ def create_end_n() -> Image.Image:
     return img
 
 
-def create_end_s() -> Image.Image:
+def create_end_s(scale: float = 1.0) -> Image.Image:
     """Create river end pointing south."""
-    img = create_base_diamond()
-    draw = ImageDraw.Draw(img)
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
 
     # Bank all around
     draw.polygon([DIAMOND_TOP, DIAMOND_RIGHT, DIAMOND_BOTTOM, DIAMOND_LEFT], fill=BANK_DARK)
@@ -497,10 +510,10 @@ def create_end_s() -> Image.Image:
     return img
 
 
-def create_end_e() -> Image.Image:
+def create_end_e(scale: float = 1.0) -> Image.Image:
     """Create river end pointing east."""
-    img = create_base_diamond()
-    draw = ImageDraw.Draw(img)
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
 
     # Bank all around
     draw.polygon([DIAMOND_TOP, DIAMOND_RIGHT, DIAMOND_BOTTOM, DIAMOND_LEFT], fill=BANK_DARK)
@@ -523,10 +536,10 @@ def create_end_e() -> Image.Image:
     return img
 
 
-def create_end_w() -> Image.Image:
+def create_end_w(scale: float = 1.0) -> Image.Image:
     """Create river end pointing west."""
-    img = create_base_diamond()
-    draw = ImageDraw.Draw(img)
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
 
     # Bank all around
     draw.polygon([DIAMOND_TOP, DIAMOND_RIGHT, DIAMOND_BOTTOM, DIAMOND_LEFT], fill=BANK_DARK)
@@ -549,32 +562,260 @@ def create_end_w() -> Image.Image:
     return img
 
 
+# Tile name (terrain.json `river.tiles`) -> generator
+RIVER_SPRITES = {
+    "straight_ns": create_straight_ns,
+    "straight_ew": create_straight_ew,
+    "corner_ne": create_corner_ne,
+    "corner_nw": create_corner_nw,
+    "corner_se": create_corner_se,
+    "corner_sw": create_corner_sw,
+    "end_n": create_end_n,
+    "end_s": create_end_s,
+    "end_e": create_end_e,
+    "end_w": create_end_w,
+}
+
+
+# --- Symmetric mode: canonical prototypes + flip transforms -----------------
+#
+# The river tiles are mirror images of each other in isometric space. A point
+# in the cell is written as grid coordinates (u, v) in 0..1, with the diamond
+# corners (0,0)=top, (1,0)=right, (1,1)=bottom, (0,1)=left. The grid edges are
+# N (v=0, top-right), E (u=1, bottom-right), S (v=1, bottom-left) and
+# W (u=0, top-left), matching the N/S = NE-SW diagonal convention above.
+#
+# Mirroring the sprite horizontally swaps u and v (N<->W, E<->S); mirroring
+# vertically maps (u, v) -> (1-v, 1-u) (N<->E, S<->W). Four prototypes
+# therefore cover all ten tiles. Transposes are not used: the diamond is
+# twice as wide as it is tall, so a pixel transpose is not an isometric
+# symmetry.
+
+RIVER_HALF_WIDTH = 0.16  # Water channel half-width in grid units
+RIVER_RIM = 0.08         # Light bank rim around the water
+RIVER_DEEP = 0.5         # Deep core as a fraction of the half-width
+ARC_STEPS = 12           # Polygon segments per quarter arc
+
+# prototype name -> (tile name -> (flip_h, flip_v))
+RIVER_PROTOTYPES = {
+    "straight": {
+        "straight_ns": (False, False),
+        "straight_ew": (True, False),
+    },
+    "corner_ne": {
+        "corner_ne": (False, False),
+        "corner_sw": (True, False),
+    },
+    "corner_nw": {
+        "corner_nw": (False, False),
+        "corner_se": (False, True),
+    },
+    "end_n": {
+        "end_n": (False, False),
+        "end_w": (True, False),
+        "end_e": (False, True),
+        "end_s": (True, True),
+    },
+}
+
+
+def grid_to_design(u: float, v: float) -> tuple:
+    """Map grid coordinates (u, v) to design-unit pixel coordinates."""
+    x = DIAMOND_TOP[0] + (DIAMOND_RIGHT[0] - DIAMOND_TOP[0]) * u + (DIAMOND_LEFT[0] - DIAMOND_TOP[0]) * v
+    y = DIAMOND_TOP[1] + (DIAMOND_RIGHT[1] - DIAMOND_TOP[1]) * u + (DIAMOND_LEFT[1] - DIAMOND_TOP[1]) * v
+    return (x, y)
+
+
+def _arc(cu: float, cv: float, radius: float, start: float, end: float) -> list:
+    """Points on a grid-space arc from angle start to end (radians)."""
+    angles = [start + (end - start) * i / ARC_STEPS for i in range(ARC_STEPS + 1)]
+    return [(cu + radius * math.cos(a), cv + radius * math.sin(a)) for a in angles]
+
+
+def _straight_shape(h: float) -> list:
+    """N to S channel of half-width h."""
+    return [[(0.5 - h, 0.0), (0.5 + h, 0.0), (0.5 + h, 1.0), (0.5 - h, 1.0)]]
+
+
+def _corner_ne_shape(h: float) -> list:
+    """N to E channel curving around the right corner (1, 0)."""
+    outer = _arc(1.0, 0.0, 0.5 + h, math.pi / 2, math.pi)
+    inner = _arc(1.0, 0.0, 0.5 - h, math.pi, math.pi / 2)
+    return [outer + inner]
+
+
+def _corner_nw_shape(h: float) -> list:
+    """N to W channel curving around the top corner (0, 0)."""
+    outer = _arc(0.0, 0.0, 0.5 + h, 0.0, math.pi / 2)
+    inner = _arc(0.0, 0.0, 0.5 - h, math.pi / 2, 0.0)
+    return [outer + inner]
+
+
+def _end_n_shape(h: float) -> list:
+    """River entering from S and ending in a pool toward N."""
+    channel = [(0.5 - h, 0.5), (0.5 + h, 0.5), (0.5 + h, 1.0), (0.5 - h, 1.0)]
+    pool = _arc(0.5, 0.45, h + 0.12, 0.0, 2 * math.pi)
+    return [channel, pool]
+
+
+PROTOTYPE_SHAPES = {
+    "straight": _straight_shape,
+    "corner_ne": _corner_ne_shape,
+    "corner_nw": _corner_nw_shape,
+    "end_n": _end_n_shape,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def diamond_mask(scale: float = 1.0) -> np.ndarray:
+    """Boolean mask of the rasterized cell diamond at `scale` (cached)."""
+    mask = Image.new('L', scaled_size(TILE_WIDTH, TILE_HEIGHT, scale), 0)
+    ScaledDraw(mask, scale).polygon([DIAMOND_TOP, DIAMOND_RIGHT, DIAMOND_BOTTOM, DIAMOND_LEFT], fill=255)
+    return np.asarray(mask) > 0
+
+
+def _clip_to_diamond(pixels: np.ndarray, scale: float) -> np.ndarray:
+    """Clear every pixel outside the cell diamond, so tiles share one alpha edge.
+
+    The rasterized diamond is symmetric about diamond_center, so a mirrored
+    tile covers the whole diamond and only needs the overhang trimmed.
+    """
+    return np.where(diamond_mask(scale)[..., None], pixels, 0).astype(np.uint8)
+
+
+@functools.lru_cache(maxsize=None)
+@trace_stage
+def render_prototype(prototype: str, scale: float = 1.0) -> np.ndarray:
+    """Render a canonical river tile as an RGBA array (cached per scale).
+
+    Banks are shaded by distance to the water (light rim, dark bank), not by
+    screen side, so mirrored tiles stay consistently lit. The tile is
+    clipped to the cell diamond, so every tile shares one alpha edge.
+    """
+    shape = PROTOTYPE_SHAPES[prototype]
+    img = create_base_diamond(scale)
+    draw = ScaledDraw(img, scale)
+
+    draw.polygon([DIAMOND_TOP, DIAMOND_RIGHT, DIAMOND_BOTTOM, DIAMOND_LEFT], fill=BANK_DARK)
+    layers = [
+        (RIVER_HALF_WIDTH + RIVER_RIM, BANK_LIGHT),
+        (RIVER_HALF_WIDTH, WATER_MID),
+        (RIVER_HALF_WIDTH * RIVER_DEEP, WATER_DEEP),
+    ]
+    for half_width, color in layers:
+        for polygon in shape(half_width):
+            draw.polygon([grid_to_design(u, v) for u, v in polygon], fill=color)
+
+    return _clip_to_diamond(np.asarray(img), scale)
+
+
+def _mirror(pixels: np.ndarray, axis: int, center: float) -> np.ndarray:
+    """Mirror an array along `axis` about pixel coordinate `center`.
+
+    np.flip reflects about the array midpoint; the roll moves the mirror
+    line onto the diamond centre so derived tiles line up with the grid.
+    """
+    shift = round(2 * center - (pixels.shape[axis] - 1))
+    return np.roll(np.flip(pixels, axis=axis), shift, axis=axis)
+
+
+def diamond_center(pixels: np.ndarray) -> tuple:
+    """Return the (x, y) centre of the rasterized diamond in a prototype.
+
+    Measured from the alpha channel rather than computed from DIAMOND_*,
+    since polygon rasterization rounds fractional vertices at non-1x scales.
+    """
+    opaque = pixels[..., 3] > 0
+    cols = np.flatnonzero(opaque.any(axis=0))
+    rows = np.flatnonzero(opaque.any(axis=1))
+    return ((cols[0] + cols[-1]) / 2, (rows[0] + rows[-1]) / 2)
+
+
+@trace_stage
+def derive_tile(prototype: str, flip_h: bool, flip_v: bool,
+                scale: float = 1.0) -> Image.Image:
+    """Derive a river tile from its prototype with NumPy flips.
+
+    The flipped pixels are clipped to the target's diamond again, so the
+    derived tile's alpha edge is the diamond's even where the mirror line
+    and the rasterized edge disagree by a pixel.
+    """
+    pixels = render_prototype(prototype, scale)
+    center_x, center_y = diamond_center(pixels)
+    if flip_h:
+        pixels = _mirror(pixels, 1, center_x)
+    if flip_v:
+        pixels = _mirror(pixels, 0, center_y)
+    if flip_h or flip_v:
+        pixels = _clip_to_diamond(pixels, scale)
+    return Image.fromarray(np.ascontiguousarray(pixels), 'RGBA')
+
+
+def symmetric_sprites() -> dict:
+    """Map tile name -> callable(scale) deriving it from its prototype."""
+    return {
+        tile: functools.partial(derive_tile, prototype, flip_h, flip_v)
+        for prototype, tiles in RIVER_PROTOTYPES.items()
+        for tile, (flip_h, flip_v) in tiles.items()
+    }
+
+
+def write_prototype_atlas(output_dir: str, scale: float = 1.0) -> str:
+    """Write the unique prototype pixels as a horizontal strip plus manifest.
+
+    The manifest lists, for every tile, the prototype index and the flips to
+    apply. Flips mirror about `mirror_center` (the diamond centre) rather
+    than the sprite centre. Returns the manifest path.
+    """
+    prototypes = list(RIVER_PROTOTYPES)
+    frames = [render_prototype(name, scale) for name in prototypes]
+    tile_height, tile_width = frames[0].shape[:2]
+    atlas = Image.fromarray(np.concatenate(frames, axis=1), 'RGBA')
+
+    suffix = scale_suffix(scale)
+    atlas_name = f"river_atlas{suffix}.png"
+    atlas.save(os.path.join(output_dir, atlas_name), 'PNG')
+
+    manifest = {
+        "atlas": atlas_name,
+        "tile_size": [tile_width, tile_height],
+        "mirror_center": [float(c) for c in diamond_center(frames[0])],
+        "prototypes": prototypes,
+        "tiles": {
+            tile: {"prototype": index, "flip_h": flip_h, "flip_v": flip_v}
+            for index, name in enumerate(prototypes)
+            for tile, (flip_h, flip_v) in RIVER_PROTOTYPES[name].items()
+        },
+    }
+    manifest_path = os.path.join(output_dir, f"river_atlas{suffix}.json")
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+
+@trace_generator
 def main():
+    parser = scale_arg_parser("Generate river tile sprites.")
+    parser.add_argument("--symmetric", action="store_true",
+                        help="derive tiles from canonical prototypes and write a prototype atlas")
+    args = parser.parse_args()
     output_dir = "assets/sprites/terrain/earth/river_tiles"
-    os.makedirs(output_dir, exist_ok=True)
 
     print(f"Generating river tile sprites in {output_dir}/")
 
-    sprites = {
-        "straight_ns": create_straight_ns,
-        "straight_ew": create_straight_ew,
-        "corner_ne": create_corner_ne,
-        "corner_nw": create_corner_nw,
-        "corner_se": create_corner_se,
-        "corner_sw": create_corner_sw,
-        "end_n": create_end_n,
-        "end_s": create_end_s,
-        "end_e": create_end_e,
-        "end_w": create_end_w,
-    }
+    sprites = symmetric_sprites() if args.symmetric else RIVER_SPRITES
+
+    with PipelinedWriter() as writer:
+        written = export_scales(sprites, output_dir, args.scales, args.icon_sizes, writer=writer,
+                                atlas_name="river_tiles_atlas" if args.trim else None, hull=args.hull,
+                                masks=args.masks)
 
-    for name, create_func in sprites.items():
-        img = create_func()
-        output_path = os.path.join(output_dir, f"{name}.png")
-        img.save(output_path, 'PNG')
-        print(f"  Created {output_path} ({img.width}x{img.height})")
+    if args.symmetric:
+        for scale in args.scales:
+            manifest_path = write_prototype_atlas(output_dir, scale)
+            print(f"  Created {manifest_path} ({len(RIVER_PROTOTYPES)} prototypes)")
 
-    print(f"\nGenerated {len(sprites)} river tile sprites")
+    print(f"\nGenerated {len(sprites)} river tile sprites ({written} files)")
 
 
 if __name__ == "__main__":
@@ -6,10 +6,35 @@ Creates 64x64 PNG sprites with hexagonal cutaway appearance:
 - Left wall: medium color
 - Right wall: darker color
 
-Usage: python3 scripts/generate_sprites.py
+Pass --scales for HiDPI variants (name@2x.png); 32px picker icons for the
+block info panel are written to icons/ by default.
+
+Lighting can be baked offline: --prelit multiplies ambient occlusion toward
+the face seams, a directional light term and an edge light into the sprites;
+--lighting-maps writes the same terms as block_lighting.png (shared by all
+block types) for the runtime to apply instead.
+
+--sdf writes block_edges_sdf.png and block_silhouette_sdf.png, distance
+fields of the face edges and outline for zoom-independent outlines and
+selection highlights in a shader (see sprite_sdf).
+
+--impostors renders every block in data/blocks.json from several view
+angles into impostors/ (albedo, normal and depth atlases plus manifest) for
+far-LOD billboards.
+
+Usage: python3 scripts/generate_sprites.py [--scales 1 2 4] [--icon-sizes 32]
+       [--trim [--hull]] [--masks] [--prelit] [--lighting-maps] [--sdf]
+       [--impostors [--azimuths 0 45 ...] [--elevations 30] [--impostor-size 64]]
 """
 
-from PIL import Image, ImageDraw
+from PIL import Image
+from sprite_profile import trace_generator, trace_stage
+from sprite_sdf import outline_sdf
+from sprite_scale import ScaledDraw, export_scales, scale_arg_parser, scale_suffix, scaled_size
+from sprite_writer import PipelinedWriter
+import numpy as np
+import functools
+import json
 import os
 
 # Sprite dimensions
@@ -36,84 +61,441 @@ def hex_to_rgb(hex_color: str) -> tuple:
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 
-def create_isometric_block(floor_color: str, left_color: str, right_color: str) -> Image.Image:
-    """Create a 64x64 isometric block sprite with cutaway view.
+# Hexagon vertices in 64x64 design units (0-indexed from top, clockwise)
+TOP_CENTER = (32, 0)
+TOP_RIGHT = (63, 16)
+BOTTOM_RIGHT = (63, 48)
+BOTTOM_CENTER = (32, 63)
+BOTTOM_LEFT = (0, 48)
+TOP_LEFT = (0, 16)
+
+# Center point where all three faces meet
+CENTER = (32, 32)
+
+# Face polygons, in draw order
+FACES = {
+    "top": [TOP_CENTER, TOP_RIGHT, CENTER, TOP_LEFT],
+    "left": [TOP_LEFT, CENTER, BOTTOM_CENTER, BOTTOM_LEFT],
+    "right": [CENTER, TOP_RIGHT, BOTTOM_RIGHT, BOTTOM_CENTER],
+}
+
+# Outline edges: top diamond, outer hexagon, center vertical
+OUTLINE_EDGES = [
+    (TOP_CENTER, TOP_RIGHT), (TOP_RIGHT, CENTER), (CENTER, TOP_LEFT), (TOP_LEFT, TOP_CENTER),
+    (TOP_RIGHT, BOTTOM_RIGHT), (BOTTOM_RIGHT, BOTTOM_CENTER),
+    (BOTTOM_CENTER, BOTTOM_LEFT), (BOTTOM_LEFT, TOP_LEFT),
+    (CENTER, BOTTOM_CENTER),
+]
+
+OUTLINE_COLOR = (0, 0, 0, 128)  # Semi-transparent black
+
+# Baked lighting (design units where noted). Faces meet at concave seams in
+# the cutaway, so occlusion darkens toward them; outer edges facing the light
+# get a thin highlight.
+SEAMS = [(TOP_RIGHT, CENTER), (CENTER, TOP_LEFT), (CENTER, BOTTOM_CENTER)]
+OUTER_EDGES = [
+    (TOP_CENTER, TOP_RIGHT), (TOP_RIGHT, BOTTOM_RIGHT), (BOTTOM_RIGHT, BOTTOM_CENTER),
+    (BOTTOM_CENTER, BOTTOM_LEFT), (BOTTOM_LEFT, TOP_LEFT), (TOP_LEFT, TOP_CENTER),
+]
+AO_RADIUS = 8.0        # Occlusion falloff distance from a seam
+AO_STRENGTH = 0.35     # Darkening right at a seam
+EDGE_WIDTH = 2.5       # Edge light falloff distance from an outer edge
+EDGE_STRENGTH = 0.3    # Brightening right at a fully lit edge
+AMBIENT = 0.7          # Light level of a face turned away from the light
+
+# World axes: x = right wall normal, y = left wall normal, z = up (floor)
+FACE_NORMALS = {"top": (0.0, 0.0, 1.0), "left": (0.0, 1.0, 0.0), "right": (1.0, 0.0, 0.0)}
+LIGHT_DIR = (0.4, 0.8, 1.0)  # Toward the light: up and to the left on screen
+# Screen directions of the world axes in the isometric projection
+SCREEN_AXES = ((0.866, 0.5), (-0.866, 0.5), (0.0, -1.0))
+
+
+@functools.lru_cache(maxsize=None)
+@trace_stage
+def _block_masks(scale: float) -> tuple:
+    """Rasterize the face and outline masks once per scale.
+
+    Every block type shares the same geometry, so these masks are reused
+    for all colors at a given scale.
+    """
+    size = scaled_size(WIDTH, HEIGHT, scale)
+
+    face_masks = {}
+    for face, points in FACES.items():
+        mask = Image.new('L', size, 0)
+        ScaledDraw(mask, scale).polygon(points, fill=255)
+        face_masks[face] = mask
+
+    outline_mask = Image.new('L', size, 0)
+    outline_draw = ScaledDraw(outline_mask, scale)
+    for edge in OUTLINE_EDGES:
+        outline_draw.line(list(edge), fill=255, width=1)
+
+    return face_masks, outline_mask
+
+
+def _segment_distance(px: np.ndarray, py: np.ndarray, a: tuple, b: tuple) -> np.ndarray:
+    """Distance from every point (px, py) to segment a-b."""
+    ax, ay = a
+    dx, dy = b[0] - ax, b[1] - ay
+    t = np.clip(((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy), 0.0, 1.0)
+    return np.hypot(px - ax - t * dx, py - ay - t * dy)
+
+
+@functools.lru_cache(maxsize=None)
+@trace_stage
+def _block_lighting(scale: float) -> tuple:
+    """Bake (ao, light, edge) float maps for the block geometry at `scale`.
+
+    All three are evaluated for every pixel at once from the face masks and
+    pixel positions in design units:
+    - ao: 1 - AO_STRENGTH near seams, falling off to 1 over AO_RADIUS
+    - light: per-face Lambert term, AMBIENT..1 (brightest face = 1)
+    - edge: 0..EDGE_STRENGTH highlight along outer edges that face the light
+    """
+    face_masks, outline_mask = _block_masks(scale)
+    width, height = outline_mask.size
+    px = (np.arange(width)[None, :] + 0.5) / scale - 0.5
+    py = (np.arange(height)[:, None] + 0.5) / scale - 0.5
+
+    ao = np.ones((height, width))
+    for a, b in SEAMS:
+        falloff = np.clip(1.0 - _segment_distance(px, py, a, b) / AO_RADIUS, 0.0, 1.0)
+        ao *= 1.0 - AO_STRENGTH * falloff ** 2
+
+    light_dir = np.array(LIGHT_DIR) / np.linalg.norm(LIGHT_DIR)
+    lambert = {face: max(0.0, float(np.dot(normal, light_dir))) for face, normal in FACE_NORMALS.items()}
+    brightest = max(lambert.values())
+    light = np.zeros((height, width))
+    for face, mask in face_masks.items():
+        level = AMBIENT + (1.0 - AMBIENT) * lambert[face] / brightest
+        light[np.asarray(mask) > 0] = level
+
+    # Outer edges lit in proportion to how much their outward normal faces
+    # the light as projected on screen
+    screen_light = np.array(SCREEN_AXES).T @ light_dir
+    screen_light /= np.linalg.norm(screen_light)
+    cx, cy = CENTER
+    edge = np.zeros((height, width))
+    for a, b in OUTER_EDGES:
+        normal = np.array([b[1] - a[1], a[0] - b[0]], dtype=np.float64)
+        if np.dot(normal, [(a[0] + b[0]) / 2 - cx, (a[1] + b[1]) / 2 - cy]) < 0:
+            normal = -normal
+        facing = max(0.0, float(np.dot(normal / np.linalg.norm(normal), screen_light)))
+        falloff = np.clip(1.0 - _segment_distance(px, py, a, b) / EDGE_WIDTH, 0.0, 1.0)
+        edge = np.maximum(edge, EDGE_STRENGTH * facing * falloff)
+    # Keep the highlight inside the block so transparent pixels stay black
+    coverage = np.maximum.reduce([np.asarray(mask) for mask in face_masks.values()]) / 255
+    edge *= coverage
+
+    return ao, light, edge
+
+
+def lighting_map(scale: float = 1.0) -> Image.Image:
+    """Encode the baked lighting as RGBA: R = ao, G = light, B = edge / EDGE_STRENGTH.
+
+    Alpha is the block coverage. The runtime reproduces --prelit with
+    color * R * G + B * EDGE_STRENGTH (channels as 0..1).
+    """
+    ao, light, edge = _block_lighting(scale)
+    face_masks, _ = _block_masks(scale)
+    coverage = np.maximum.reduce([np.asarray(mask) for mask in face_masks.values()])
+    channels = [ao, light, edge / EDGE_STRENGTH]
+    pixels = np.dstack([np.round(c * 255) for c in channels] + [coverage])
+    return Image.fromarray(pixels.astype(np.uint8), 'RGBA')
+
+
+def create_isometric_block(floor_color: str, left_color: str, right_color: str,
+                           scale: float = 1.0, prelit: bool = False) -> Image.Image:
+    """Create an isometric block sprite with cutaway view.
 
     The sprite has a hexagonal perimeter:
     - Top: diamond floor face
     - Bottom-left: left wall face
     - Bottom-right: right wall face
 
-    Hexagon vertices (0-indexed from top, clockwise):
-      0: top center (32, 0)
-      1: top-right (64, 16)
-      2: bottom-right (64, 48)
-      3: bottom center (32, 64)
-      4: bottom-left (0, 48)
-      5: top-left (0, 16)
+    Geometry is in 64x64 design units (see FACES); `scale` sets the output
+    size (1.0 = 64x64, 2.0 = 128x128). With `prelit`, the baked occlusion,
+    light and edge terms (see _block_lighting) are applied to the faces.
     """
-    img = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-
-    # Hexagon vertices
-    top_center = (32, 0)
-    top_right = (63, 16)
-    bottom_right = (63, 48)
-    bottom_center = (32, 63)
-    bottom_left = (0, 48)
-    top_left = (0, 16)
-
-    # Center point where all three faces meet
-    center = (32, 32)
-
-    # Draw top face (diamond/floor)
-    top_face = [top_center, top_right, center, top_left]
-    draw.polygon(top_face, fill=hex_to_rgb(floor_color))
-
-    # Draw left wall face
-    left_face = [top_left, center, bottom_center, bottom_left]
-    draw.polygon(left_face, fill=hex_to_rgb(left_color))
-
-    # Draw right wall face
-    right_face = [center, top_right, bottom_right, bottom_center]
-    draw.polygon(right_face, fill=hex_to_rgb(right_color))
-
-    # Draw outline edges for definition
-    outline_color = (0, 0, 0, 128)  # Semi-transparent black
-
-    # Top diamond outline
-    draw.line([top_center, top_right], fill=outline_color, width=1)
-    draw.line([top_right, center], fill=outline_color, width=1)
-    draw.line([center, top_left], fill=outline_color, width=1)
-    draw.line([top_left, top_center], fill=outline_color, width=1)
-
-    # Outer hexagon edges
-    draw.line([top_right, bottom_right], fill=outline_color, width=1)
-    draw.line([bottom_right, bottom_center], fill=outline_color, width=1)
-    draw.line([bottom_center, bottom_left], fill=outline_color, width=1)
-    draw.line([bottom_left, top_left], fill=outline_color, width=1)
-
-    # Center vertical line
-    draw.line([center, bottom_center], fill=outline_color, width=1)
+    face_masks, outline_mask = _block_masks(scale)
+    img = Image.new('RGBA', outline_mask.size, (0, 0, 0, 0))
+
+    face_colors = {"top": floor_color, "left": left_color, "right": right_color}
+    for face, color in face_colors.items():
+        img.paste(hex_to_rgb(color) + (255,), mask=face_masks[face])
+
+    if prelit:
+        ao, light, edge = _block_lighting(scale)
+        pixels = np.asarray(img).astype(np.float64)
+        rgb = pixels[..., :3] * (ao * light)[..., None] + (edge * 255)[..., None]
+        pixels[..., :3] = np.clip(np.round(rgb), 0, 255)
+        img = Image.fromarray(pixels.astype(np.uint8), 'RGBA')
+
+    # Outline edges for definition
+    img.paste(OUTLINE_COLOR, mask=outline_mask)
 
     return img
 
 
+# --- Far-LOD impostors ---------------------------------------------------------
+#
+# LOD3 blocks (see src/game/lod_manager.gd) can be drawn as camera-facing quads
+# instead of meshes. Each block from data/blocks.json is ray cast as a box
+# (footprint from `size`, CELL_SIZE metres per cell, y up) with an
+# orthographic camera from every view angle. Rays for all distinct sizes,
+# angles and pixels are intersected in one array pass; blocks sharing a size
+# reuse the same hits and only differ in colour.
+#
+# Atlas layout: each block is a strip of frames, one per angle. Strips are
+# placed in blocks.json order, down a column and then across, in a roughly
+# square grid. No side may exceed MAX_ATLAS_SIZE (a common GPU texture limit),
+# so blocks that do not fit start another page. The manifest records the
+# block order and each block's page and pixel origin. Channels are written
+# as separate images, with page n > 0 suffixed _n:
+# - impostor_albedo.png - category colour, alpha = coverage (unlit)
+# - impostor_normal.png - world-space normal, n * 0.5 + 0.5
+# - impostor_depth.png  - 16-bit depth along the view ray, 0..65535 over
+#                         [-radius, radius] around the block centre
+
+BLOCKS_CONFIG = "data/blocks.json"
+CELL_SIZE = 6.0               # Metres per grid cell (matches src/game)
+IMPOSTOR_SIZE = 64            # Frame size in pixels
+IMPOSTOR_AZIMUTHS = (0, 45, 90, 135, 180, 225, 270, 315)  # Degrees around y
+IMPOSTOR_ELEVATIONS = (30,)   # Degrees above the horizon
+MAX_ATLAS_SIZE = 8192         # Largest atlas page side in pixels
+
+# Greybox colours per category (mirrors src/game/block_registry.gd)
+CATEGORY_COLORS = {
+    "transit": (0.45, 0.55, 0.7),
+    "residential": (0.45, 0.65, 0.45),
+    "commercial": (0.75, 0.6, 0.35),
+    "industrial": (0.55, 0.5, 0.45),
+    "civic": (0.6, 0.5, 0.65),
+    "infrastructure": (0.5, 0.55, 0.6),
+    "green": (0.35, 0.6, 0.35),
+    "entertainment": (0.7, 0.5, 0.55),
+}
+BLOCK_COLOR_OVERRIDES = {"entrance": (0.85, 0.72, 0.2)}
+FALLBACK_COLOR = (0.6, 0.6, 0.6)  # Blocks with no known category
+
+
+def impostor_cameras(azimuths: tuple, elevations: tuple) -> tuple:
+    """View direction, right and up vectors, each (A, 3), for every angle pair."""
+    az, el = np.meshgrid(np.radians(azimuths), np.radians(elevations), indexing='ij')
+    az, el = az.ravel(), el.ravel()
+    # Direction from the camera toward the block
+    forward = -np.stack([np.cos(el) * np.sin(az), np.sin(el), np.cos(el) * np.cos(az)], axis=1)
+    right = np.stack([np.cos(az), np.zeros_like(az), -np.sin(az)], axis=1)
+    up = np.cross(right, forward)
+    return forward, right, up
+
+
+@trace_stage
+def raycast_boxes(sizes: np.ndarray, cameras: tuple, frame: int) -> tuple:
+    """Cast orthographic rays at centred boxes for every size and camera.
+
+    `sizes` is (S, 3) box extents in metres. Each frame spans the box's
+    bounding sphere. Returns (hit, normal, depth) with shapes
+    (S, A, frame, frame), (..., 3) and (...); depth is in [-1, 1] of the
+    radius, negative toward the camera.
+    """
+    forward, right, up = cameras
+    radius = np.linalg.norm(sizes, axis=1) / 2                  # (S,)
+    half = sizes / 2
+
+    # Pixel offsets on the image plane in units of the radius
+    coords = (np.arange(frame) + 0.5) / frame * 2 - 1
+    u = coords[None, :]                                         # columns
+    v = -coords[:, None]                                        # rows, y up
+    plane = (u[..., None] * right[:, None, None, :] + v[..., None] * up[:, None, None, :])  # (A, H, W, 3)
+
+    # Rays start two radii in front of the centre (box centred at origin)
+    origin = (plane[None] - 2 * forward[None, :, None, None, :]) * radius[:, None, None, None, None]
+    direction = np.where(forward == 0, 1e-12, forward)[None, :, None, None, :]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_low = (-half[:, None, None, None, :] - origin) / direction
+        t_high = (half[:, None, None, None, :] - origin) / direction
+    t_near = np.minimum(t_low, t_high)
+    t_enter = t_near.max(axis=-1)
+    t_exit = np.maximum(t_low, t_high).min(axis=-1)
+    hit = t_exit >= np.maximum(t_enter, 0)
+
+    # Normal of the entry face: the slab entered last, facing the camera
+    axis = t_near.argmax(axis=-1)
+    normal = -np.sign(np.take_along_axis(np.broadcast_to(direction, t_near.shape),
+                                         axis[..., None], axis=-1))
+    normal = (np.arange(3) == axis[..., None]) * normal
+    normal[~hit] = 0
+
+    depth = np.where(hit, t_enter / radius[:, None, None, None] - 2, 1.0)
+    return hit, normal, depth
+
+
+def load_block_definitions(config_path: str = BLOCKS_CONFIG) -> dict:
+    """Map block id -> (size in cells [x, y, z], category) from blocks.json."""
+    with open(config_path) as f:
+        blocks = json.load(f)
+    return {
+        block_id: (tuple(entry.get("size", [1, 1, 1])), entry.get("category", ""))
+        for block_id, entry in blocks.items()
+    }
+
+
+def atlas_grid(block_count: int, strip_width: int, frame: int) -> tuple:
+    """(columns, rows) of block strips per atlas page, within MAX_ATLAS_SIZE."""
+    max_columns, max_rows = MAX_ATLAS_SIZE // strip_width, MAX_ATLAS_SIZE // frame
+    if max_columns < 1 or max_rows < 1:
+        raise ValueError(f"impostor strip {strip_width}x{frame} exceeds {MAX_ATLAS_SIZE}px")
+    # Aim for a square page: columns * strip_width ~ rows * frame
+    columns = round(np.sqrt(block_count * frame / strip_width))
+    columns = min(max(columns, 1), max_columns)
+    rows = min(-(-block_count // columns), max_rows)
+    return columns, rows
+
+
+def create_impostor_atlas(blocks: dict, azimuths: tuple = IMPOSTOR_AZIMUTHS,
+                          elevations: tuple = IMPOSTOR_ELEVATIONS,
+                          frame: int = IMPOSTOR_SIZE) -> tuple:
+    """Render impostor frames for all blocks at all angles.
+
+    Returns lists of (albedo, normal, depth) atlas pages and the manifest dict.
+    """
+    unique_sizes = sorted({size for size, _ in blocks.values()})
+    sizes = np.array(unique_sizes, dtype=np.float64) * CELL_SIZE
+    cameras = impostor_cameras(azimuths, elevations)
+    hit, normal, depth = raycast_boxes(sizes, cameras, frame)
+
+    # Gather each block's frames from its size, then tile rows x angles
+    rows = np.array([unique_sizes.index(size) for size, _ in blocks.values()])
+    colors = np.array([BLOCK_COLOR_OVERRIDES.get(block_id, CATEGORY_COLORS.get(category, FALLBACK_COLOR))
+                       for block_id, (_, category) in blocks.items()])
+
+    # Every block's strip (B, H, A * W, ...), then strips placed on pages
+    def strips(frames: np.ndarray) -> np.ndarray:
+        b, a, h, w = frames.shape[:4]
+        return frames.swapaxes(1, 2).reshape(b, h, a * w, *frames.shape[4:])
+
+    block_hit = hit[rows]
+    albedo = np.concatenate([
+        np.broadcast_to(colors[:, None, None, None, :], block_hit.shape + (3,)) * 255,
+        block_hit[..., None] * 255.0,
+    ], axis=-1)
+    channels = [
+        (strips(np.round(albedo).astype(np.uint8)), 'RGBA'),
+        (strips(np.round((normal[rows] * 0.5 + 0.5) * 255).astype(np.uint8)), 'RGB'),
+        (strips(np.round((np.clip(depth[rows], -1, 1) * 0.5 + 0.5) * 65535).astype(np.int32)), 'I'),
+    ]
+
+    strip_width = len(azimuths) * len(elevations) * frame
+    columns, grid_rows = atlas_grid(len(blocks), strip_width, frame)
+    per_page = columns * grid_rows
+    placements = []  # (page, x, y) per block
+    for index in range(len(blocks)):
+        page, slot = divmod(index, per_page)
+        placements.append((page, slot // grid_rows * strip_width, slot % grid_rows * frame))
+
+    pages = [[] for _ in channels]
+    for first in range(0, len(blocks), per_page):
+        count = min(per_page, len(blocks) - first)
+        width = -(-count // grid_rows) * strip_width
+        height = min(count, grid_rows) * frame
+        for images, (data, mode) in zip(pages, channels):
+            canvas = np.zeros((height, width) + data.shape[3:], dtype=data.dtype)
+            for index in range(first, first + count):
+                _, x, y = placements[index]
+                canvas[y:y + frame, x:x + strip_width] = data[index]
+            img = Image.fromarray(canvas, mode)
+            images.append(img.convert('I;16') if mode == 'I' else img)
+
+    angles = [[az, el] for az in azimuths for el in elevations]
+    radius = np.linalg.norm(sizes, axis=1) / 2
+    manifest = {
+        "frame_size": frame,
+        "cell_size": CELL_SIZE,
+        "angles": angles,
+        "pages": len(pages[0]),
+        "order": list(blocks),
+        "blocks": {
+            block_id: {
+                "page": page,
+                "x": x,
+                "y": y,
+                "size": list(size),
+                "radius": float(radius[rows[index]]),
+                "metres_per_pixel": float(2 * radius[rows[index]] / frame),
+            }
+            for index, ((block_id, (size, _)), (page, x, y)) in enumerate(zip(blocks.items(), placements))
+        },
+    }
+    return (*pages, manifest)
+
+
+def block_sprites(prelit: bool = False) -> dict:
+    """Map block type -> callable(scale) for export_scales."""
+    return {
+        block_type: functools.partial(create_isometric_block, *colors, prelit=prelit)
+        for block_type, colors in BLOCK_COLORS.items()
+    }
+
+
+@trace_generator
 def main():
+    parser = scale_arg_parser("Generate isometric block sprites.", default_icon_sizes=(32,))
+    parser.add_argument("--prelit", action="store_true",
+                        help="bake ambient occlusion, directional and edge light into the sprites")
+    parser.add_argument("--lighting-maps", action="store_true",
+                        help="write block_lighting.png (ao, light, edge) per scale")
+    parser.add_argument("--sdf", action="store_true",
+                        help="write edge and silhouette distance field textures")
+    parser.add_argument("--impostors", action="store_true",
+                        help="render far-LOD impostor atlases for data/blocks.json")
+    parser.add_argument("--azimuths", type=float, nargs="+", default=list(IMPOSTOR_AZIMUTHS),
+                        help="impostor view azimuths in degrees")
+    parser.add_argument("--elevations", type=float, nargs="+", default=list(IMPOSTOR_ELEVATIONS),
+                        help="impostor view elevations in degrees")
+    parser.add_argument("--impostor-size", type=int, default=IMPOSTOR_SIZE,
+                        help="impostor frame size in pixels")
+    args = parser.parse_args()
     output_dir = "assets/sprites/blocks"
-    os.makedirs(output_dir, exist_ok=True)
 
     print(f"Generating block sprites in {output_dir}/")
 
-    for block_type, colors in BLOCK_COLORS.items():
-        floor_color, left_color, right_color = colors
-        img = create_isometric_block(floor_color, left_color, right_color)
-
-        output_path = os.path.join(output_dir, f"{block_type}.png")
-        img.save(output_path, 'PNG')
-        print(f"  Created {output_path}")
+    sprites = block_sprites(args.prelit)
+    with PipelinedWriter() as writer:
+        written = export_scales(sprites, output_dir, args.scales, args.icon_sizes, writer=writer,
+                                atlas_name="blocks_atlas" if args.trim else None, hull=args.hull,
+                                masks=args.masks)
+        if args.lighting_maps:
+            for scale in args.scales:
+                writer.submit(lighting_map(scale),
+                              os.path.join(output_dir, f"block_lighting{scale_suffix(scale)}.png"))
+                written += 1
+        if args.sdf:
+            for kind, img in zip(("edges", "silhouette"), outline_sdf(list(FACES.values()))):
+                writer.submit(img, os.path.join(output_dir, f"block_{kind}_sdf.png"))
+                written += 1
+        if args.impostors:
+            impostor_dir = os.path.join(output_dir, "impostors")
+            os.makedirs(impostor_dir, exist_ok=True)
+            *atlases, manifest = create_impostor_atlas(load_block_definitions(), tuple(args.azimuths),
+                                                       tuple(args.elevations), args.impostor_size)
+            for channel, images in zip(("albedo", "normal", "depth"), atlases):
+                manifest[channel] = []
+                for page, img in enumerate(images):
+                    filename = f"impostor_{channel}{f'_{page}' if page else ''}.png"
+                    writer.submit(img, os.path.join(impostor_dir, filename))
+                    manifest[channel].append(filename)
+                    written += 1
+            manifest_path = os.path.join(impostor_dir, "impostors.json")
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+            print(f"  Created {manifest_path} ({len(manifest['blocks'])} blocks, "
+                  f"{len(manifest['angles'])} angles, {manifest['pages']} pages)")
+            written += 1
 
-    print(f"\nGenerated {len(BLOCK_COLORS)} sprites")
+    print(f"\nGenerated {len(BLOCK_COLORS)} sprites ({written} files)")
 
 
 if __name__ == "__main__":
@@ -9,11 +9,21 @@ Creates Earth theme decoration sprites:
 - bush.png (64x64) - shrub/bush
 - flowers.png (64x64) - flower patch
 
-Usage: python3 scripts/generate_terrain_sprites.py
+Sizes above are at 1x; coordinates are design units scaled by `scale`.
+
+With --spec, sprites come from a declarative spec file instead (see
+sprite_spec); scripts/specs/decorations.json reproduces the sprites above
+pixel for pixel, and new decorations can be added there without code.
+
+Usage: python3 scripts/generate_terrain_sprites.py [--scales 1 2 4] [--trim [--hull]] [--masks]
+       [--spec scripts/specs/decorations.json]
 """
 
-from PIL import Image, ImageDraw
-import os
+from PIL import Image
+from sprite_profile import trace_generator
+from sprite_scale import ScaledDraw, export_scales, scale_arg_parser, scaled_size
+from sprite_spec import spec_sprites
+from sprite_writer import PipelinedWriter
 
 # Standard sprite dimensions
 TILE_WIDTH = 64
@@ -30,13 +40,13 @@ def hex_to_rgb(hex_color: str) -> tuple:
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 
-def create_tree_oak() -> Image.Image:
+def create_tree_oak(scale: float = 1.0) -> Image.Image:
     """Create a deciduous (oak) tree sprite.
 
     Isometric tree with round foliage canopy on trunk.
     """
-    img = Image.new('RGBA', (TILE_WIDTH, TILE_HEIGHT), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    img = Image.new('RGBA', scaled_size(TILE_WIDTH, TILE_HEIGHT, scale), (0, 0, 0, 0))
+    draw = ScaledDraw(img, scale)
 
     # Colors
     trunk_dark = hex_to_rgb("#5c4033")  # Dark brown
@@ -71,13 +81,13 @@ def create_tree_oak() -> Image.Image:
     return img
 
 
-def create_tree_pine() -> Image.Image:
+def create_tree_pine(scale: float = 1.0) -> Image.Image:
     """Create a conifer (pine) tree sprite.
 
     Isometric pine tree with triangular layers.
     """
-    img = Image.new('RGBA', (TILE_WIDTH, TILE_HEIGHT), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    img = Image.new('RGBA', scaled_size(TILE_WIDTH, TILE_HEIGHT, scale), (0, 0, 0, 0))
+    draw = ScaledDraw(img, scale)
 
     # Colors
     trunk_dark = hex_to_rgb("#5c4033")
@@ -121,13 +131,13 @@ def create_tree_pine() -> Image.Image:
     return img
 
 
-def create_rock_small() -> Image.Image:
+def create_rock_small(scale: float = 1.0) -> Image.Image:
     """Create a small boulder sprite.
 
     Irregular polygonal rock shape.
     """
-    img = Image.new('RGBA', (TILE_WIDTH, TILE_HEIGHT), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    img = Image.new('RGBA', scaled_size(TILE_WIDTH, TILE_HEIGHT, scale), (0, 0, 0, 0))
+    draw = ScaledDraw(img, scale)
 
     # Colors
     rock_dark = hex_to_rgb("#4a4a4a")  # Dark gray
@@ -174,14 +184,14 @@ def create_rock_small() -> Image.Image:
     return img
 
 
-def create_rock_large() -> Image.Image:
+def create_rock_large(scale: float = 1.0) -> Image.Image:
     """Create a large 2x2 boulder sprite.
 
     Large irregular rock formation spanning 2x2 grid cells.
     Dimensions: 128x96 pixels
     """
-    img = Image.new('RGBA', (LARGE_WIDTH, LARGE_HEIGHT), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    img = Image.new('RGBA', scaled_size(LARGE_WIDTH, LARGE_HEIGHT, scale), (0, 0, 0, 0))
+    draw = ScaledDraw(img, scale)
 
     # Colors
     rock_dark = hex_to_rgb("#3d3d3d")  # Darker gray
@@ -243,13 +253,13 @@ def create_rock_large() -> Image.Image:
     return img
 
 
-def create_bush() -> Image.Image:
+def create_bush(scale: float = 1.0) -> Image.Image:
     """Create a bush/shrub sprite.
 
     Low, rounded foliage.
     """
-    img = Image.new('RGBA', (TILE_WIDTH, TILE_HEIGHT), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    img = Image.new('RGBA', scaled_size(TILE_WIDTH, TILE_HEIGHT, scale), (0, 0, 0, 0))
+    draw = ScaledDraw(img, scale)
 
     # Colors
     foliage_dark = hex_to_rgb("#2d5016")   # Dark green
@@ -278,13 +288,13 @@ def create_bush() -> Image.Image:
     return img
 
 
-def create_flowers() -> Image.Image:
+def create_flowers(scale: float = 1.0) -> Image.Image:
     """Create a flower patch sprite.
 
     Scattered small flowers on grass.
     """
-    img = Image.new('RGBA', (TILE_WIDTH, TILE_HEIGHT), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    img = Image.new('RGBA', scaled_size(TILE_WIDTH, TILE_HEIGHT, scale), (0, 0, 0, 0))
+    draw = ScaledDraw(img, scale)
 
     # Colors
     grass_dark = hex_to_rgb("#3d6b2a")
@@ -330,28 +340,33 @@ def create_flowers() -> Image.Image:
     return img
 
 
+# Decoration type (terrain.json `decorations[].type`) -> generator
+DECORATION_SPRITES = {
+    "tree_oak": create_tree_oak,
+    "tree_pine": create_tree_pine,
+    "rock_small": create_rock_small,
+    "rock_large": create_rock_large,
+    "bush": create_bush,
+    "flowers": create_flowers,
+}
+
+
+@trace_generator
 def main():
+    parser = scale_arg_parser("Generate terrain decoration sprites.")
+    parser.add_argument("--spec", help="render the sprites of a declarative spec file instead")
+    args = parser.parse_args()
     output_dir = "assets/sprites/terrain/earth"
-    os.makedirs(output_dir, exist_ok=True)
 
     print(f"Generating terrain decoration sprites in {output_dir}/")
 
-    sprites = {
-        "tree_oak": create_tree_oak,
-        "tree_pine": create_tree_pine,
-        "rock_small": create_rock_small,
-        "rock_large": create_rock_large,
-        "bush": create_bush,
-        "flowers": create_flowers,
-    }
-
-    for name, create_func in sprites.items():
-        img = create_func()
-        output_path = os.path.join(output_dir, f"{name}.png")
-        img.save(output_path, 'PNG')
-        print(f"  Created {output_path} ({img.width}x{img.height})")
-
-    print(f"\nGenerated {len(sprites)} decoration sprites")
+    sprites = spec_sprites(args.spec) if args.spec else DECORATION_SPRITES
+    with PipelinedWriter() as writer:
+        written = export_scales(sprites, output_dir, args.scales, args.icon_sizes, writer=writer,
+                                atlas_name="decorations_atlas" if args.trim else None, hull=args.hull,
+                                masks=args.masks)
+
+    print(f"\nGenerated {len(sprites)} decoration sprites ({written} files)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Bake per-theme time-of-day colour LUTs for day/night tinting.
+
+The sky and tile generators bake one fixed-lighting palette. These LUTs let
+a shader apply the time of day with a single texture fetch instead of
+evaluating lighting or swapping backgrounds at runtime. Per theme in
+data/terrain.json:
+- <theme>/time_of_day_sky.png  - TIME_STEPS x SKY_ROWS. Column = hour,
+  row = view elevation (top row = zenith, bottom row = horizon). Sky colour
+  (sRGB), matching the theme's background gradient at REFERENCE_HOUR.
+- <theme>/time_of_day_tint.png - TIME_STEPS x 3. Column = hour. Row 0 is
+  the light tint, a linear multiplier stored as value / TINT_RANGE. Rows 1
+  and 2 are the theme's base_color and background_color lit by that tint
+  (sRGB).
+- <theme>/time_of_day.json     - layout, the scenario's lighting fields and
+  `default_u`, the texture u of default_time_of_day
+
+Column i covers hour (i + 0.5) * 24 / TIME_STEPS, so u = hour / 24 with
+repeat wrapping. A scenario with day_length_minutes > 0 advances
+u by 1 / (day_length_minutes * 60) per second.
+
+The sun/sky model is single scattering in a plane-parallel atmosphere:
+- sun elevation from latitude and hour angle (equinox declination)
+- sunlight at the ground is attenuated by exp(-tau * airmass), with the
+  Kasten-Young airmass, so low sun reddens
+- sky radiance along a view is sunlight * scattering albedo *
+  (1 - exp(-tau * view airmass)); Earth scatters like Rayleigh (blue),
+  Mars like dust that absorbs blue
+- twilight fades sunlight out over TWILIGHT_DEPTH degrees below the horizon,
+  down to a night sky floor
+- the light tint is sun_energy * sunlight * sin(sun elevation) plus
+  ambient_energy * mean sky radiance (floored at a night ambient level),
+  divided by its value at REFERENCE_HOUR so that hour reproduces the
+  baked palettes
+
+Sky colours are the theme's gradient times the sky radiance relative to
+REFERENCE_HOUR, in linear light. Themes without an atmosphere (space) keep
+their sky and use a fixed sun elevation, so their LUTs are constant.
+
+Usage: python3 scripts/generate_time_of_day_luts.py [data/scenarios/earth_standard.json]
+       [--themes earth mars]
+"""
+
+from PIL import Image
+from generate_background_sprites import (
+    BG_HEIGHT, EARTH_HORIZON_Y, EARTH_SKY_STOPS, MARS_HORIZON_Y, MARS_SKY_STOPS,
+    SKY_PX_ANGLE, hex_to_rgb,
+)
+from sprite_profile import trace_generator, trace_stage
+import numpy as np
+import argparse
+import json
+import os
+
+TERRAIN_CONFIG = "data/terrain.json"
+DEFAULT_SCENARIO = "data/scenarios/earth_standard.json"
+
+TIME_STEPS = 96        # 15 game minutes per column
+SKY_ROWS = 64          # Zenith (row 0) to horizon
+REFERENCE_HOUR = 12.0  # Hour the existing fixed-lighting palettes correspond to
+TINT_RANGE = 2.0       # Tint row stores multiplier / TINT_RANGE
+TWILIGHT_DEPTH = 12.0  # Degrees below the horizon over which sunlight fades out
+
+# Scenario lighting used when the scenario file leaves a field out
+# (the StructuralScenarioConfig defaults)
+SCENARIO_DEFAULTS = {"default_time_of_day": 8.0, "day_length_minutes": 0.0,
+                     "sun_energy": 1.0, "ambient_energy": 0.3}
+
+# Atmospheres, per terrain theme. tau is the zenith optical depth per RGB
+# channel (~680, 550, 440 nm), albedo the fraction of extinction that is
+# scattered, night the sky radiance floor relative to the noon zenith and
+# night_ambient the ambient light floor (moon and starlight) relative to noon.
+THEME_ATMOSPHERES = {
+    "earth": {
+        "latitude": 40.0,
+        # Rayleigh (0.044, 0.097, 0.236) plus grey aerosol 0.1
+        "tau": (0.144, 0.197, 0.336),
+        "albedo": (0.97, 0.97, 0.98),
+        "night": (0.004, 0.006, 0.014),
+        "night_ambient": (0.10, 0.12, 0.18),
+    },
+    "mars": {
+        "latitude": 20.0,
+        # Suspended dust: strong extinction, blue absorbed more than red
+        "tau": (0.45, 0.55, 0.70),
+        "albedo": (0.92, 0.74, 0.55),
+        "night": (0.003, 0.002, 0.002),
+        "night_ambient": (0.06, 0.05, 0.05),
+    },
+    "space": {"fixed_sun_elevation": 45.0},  # No atmosphere or day cycle
+}
+
+# terrain.json background -> (gradient stops, horizon row) of the flat image
+SKY_GRADIENTS = {
+    "earth_sky.png": (EARTH_SKY_STOPS, EARTH_HORIZON_Y),
+    "mars_sky.png": (MARS_SKY_STOPS, MARS_HORIZON_Y),
+}
+
+
+def load_json(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def srgb_to_linear(c: np.ndarray) -> np.ndarray:
+    c = np.asarray(c, dtype=np.float64) / 255
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(c: np.ndarray) -> np.ndarray:
+    c = np.clip(c, 0, 1)
+    srgb = np.where(c <= 0.0031308, c * 12.92, 1.055 * c ** (1 / 2.4) - 0.055)
+    return np.round(srgb * 255).astype(np.uint8)
+
+
+def airmass(elevation: np.ndarray) -> np.ndarray:
+    """Kasten-Young relative airmass for elevation in radians (clamped at the horizon)."""
+    degrees = np.degrees(np.maximum(elevation, 0.0))
+    return 1 / (np.sin(np.radians(degrees)) + 0.50572 * (degrees + 6.07995) ** -1.6364)
+
+
+def hours() -> np.ndarray:
+    return (np.arange(TIME_STEPS) + 0.5) * 24 / TIME_STEPS
+
+
+def sun_elevation(hour: np.ndarray, atmosphere: dict) -> np.ndarray:
+    """Sun elevation in radians at each hour (equinox, solar noon at 12:00)."""
+    if "fixed_sun_elevation" in atmosphere:
+        return np.full(np.shape(hour), np.radians(atmosphere["fixed_sun_elevation"]))
+    latitude = np.radians(atmosphere["latitude"])
+    hour_angle = (np.asarray(hour) - 12) / 24 * 2 * np.pi
+    return np.arcsin(np.cos(latitude) * np.cos(hour_angle))
+
+
+def sunlight(elevation: np.ndarray, atmosphere: dict) -> np.ndarray:
+    """(..., 3) linear sunlight reaching the ground, 1 = unattenuated."""
+    if "tau" not in atmosphere:
+        return np.ones(np.shape(elevation) + (3,))
+    # Fades from the horizon down to TWILIGHT_DEPTH below it
+    fade = np.clip(1 + np.degrees(elevation) / TWILIGHT_DEPTH, 0, 1)[..., None]
+    tau = np.array(atmosphere["tau"])
+    return fade * np.exp(-tau * airmass(elevation)[..., None])
+
+
+@trace_stage
+def sky_radiance(sun_elev: np.ndarray, view_elev: np.ndarray, atmosphere: dict) -> np.ndarray:
+    """(len(sun_elev), len(view_elev), 3) single-scattered sky radiance."""
+    tau, albedo = np.array(atmosphere["tau"]), np.array(atmosphere["albedo"])
+    light = sunlight(sun_elev, atmosphere)[:, None, :]
+    scattered = albedo * (1 - np.exp(-tau * airmass(view_elev)[:, None]))
+    return light * scattered[None, :, :] + np.array(atmosphere["night"])
+
+
+def sky_gradient(view_elev: np.ndarray, background: str, base_color: tuple) -> np.ndarray:
+    """(len(view_elev), 3) sRGB colour of the theme's flat sky at each elevation."""
+    if background not in SKY_GRADIENTS:
+        return np.tile(np.array(base_color, dtype=np.float64), (len(view_elev), 1))
+    stops, horizon_y = SKY_GRADIENTS[background]
+    # Row the elevation would occupy in the flat image (see generate_background_sprites)
+    rows = np.clip(horizon_y - view_elev / SKY_PX_ANGLE, 0, BG_HEIGHT)
+    stop_y = [y for y, _ in stops]
+    return np.stack([np.interp(rows, stop_y, [c[i] for _, c in stops]) for i in range(3)], axis=1)
+
+
+@trace_stage
+def bake_theme(theme: dict, atmosphere: dict, lighting: dict) -> tuple:
+    """Return (sky LUT, tint LUT) as uint8 RGB arrays."""
+    hour = hours()
+    sun_elev = sun_elevation(hour, atmosphere)
+    sun_ref = sun_elevation(np.array([REFERENCE_HOUR]), atmosphere)
+    view_elev = np.linspace(np.pi / 2, 0, SKY_ROWS)
+    sky_color = srgb_to_linear(sky_gradient(view_elev, theme.get("background"),
+                                            hex_to_rgb(theme.get("background_color", "#000000"))))
+
+    if "tau" in atmosphere:
+        radiance = sky_radiance(sun_elev, view_elev, atmosphere)
+        reference = sky_radiance(sun_ref, view_elev, atmosphere)
+        sky = sky_color[None] * radiance / reference
+        # Ambient follows the mean sky radiance, down to the night floor
+        ambient = np.maximum(radiance.mean(axis=1) / reference.mean(axis=1),
+                             np.array(atmosphere["night_ambient"]))
+    else:
+        sky = np.repeat(sky_color[None], TIME_STEPS, axis=0)
+        ambient = np.ones((TIME_STEPS, 3))
+
+    def light(elev: np.ndarray, ambient: np.ndarray) -> np.ndarray:
+        direct = sunlight(elev, atmosphere) * np.maximum(np.sin(elev), 0)[:, None]
+        return lighting["sun_energy"] * direct + lighting["ambient_energy"] * ambient
+
+    tint = light(sun_elev, ambient) / light(sun_ref, np.ones((1, 3)))
+
+    rows = [np.round(np.clip(tint / TINT_RANGE, 0, 1) * 255).astype(np.uint8)]
+    for key in ("base_color", "background_color"):
+        base = srgb_to_linear(hex_to_rgb(theme.get(key) or theme.get("background_color", "#000000")))
+        rows.append(linear_to_srgb(base * tint))
+
+    # Sky LUT is (rows = elevation, columns = hour)
+    return linear_to_srgb(sky).transpose(1, 0, 2), np.stack(rows)
+
+
+def scenario_lighting(scenario: dict) -> dict:
+    return {key: float(scenario.get(key, default)) for key, default in SCENARIO_DEFAULTS.items()}
+
+
+@trace_generator
+def main():
+    parser = argparse.ArgumentParser(description="Bake per-theme time-of-day colour LUTs.")
+    parser.add_argument("scenario", nargs="?", default=DEFAULT_SCENARIO,
+                        help="scenario whose lighting fields drive the bake")
+    parser.add_argument("--themes", nargs="+", help="terrain themes to bake (default: all)")
+    args = parser.parse_args()
+
+    lighting = scenario_lighting(load_json(args.scenario))
+    themes = load_json(TERRAIN_CONFIG)["themes"]
+    names = args.themes or list(themes)
+    unknown = [name for name in names if name not in themes or name not in THEME_ATMOSPHERES]
+    if unknown:
+        parser.error(f"no terrain theme or atmosphere for: {', '.join(unknown)}")
+
+    print(f"Baking time-of-day LUTs for {args.scenario} "
+          f"(sun {lighting['sun_energy']:g}, ambient {lighting['ambient_energy']:g})")
+    for name in names:
+        output_dir = os.path.join("assets/sprites/terrain", name)
+        os.makedirs(output_dir, exist_ok=True)
+        sky, tint = bake_theme(themes[name], THEME_ATMOSPHERES[name], lighting)
+
+        for suffix, pixels in (("sky", sky), ("tint", tint)):
+            path = os.path.join(output_dir, f"time_of_day_{suffix}.png")
+            Image.fromarray(pixels, 'RGB').save(path, 'PNG')
+            print(f"  Created {path} ({pixels.shape[1]}x{pixels.shape[0]})")
+
+        manifest = {
+            "time_steps": TIME_STEPS,
+            "sky_rows": SKY_ROWS,
+            "tint_rows": ["tint", "base_color", "background_color"],
+            "tint_range": TINT_RANGE,
+            "reference_hour": REFERENCE_HOUR,
+            "default_u": lighting["default_time_of_day"] / 24 % 1.0,
+            **lighting,
+        }
+        path = os.path.join(output_dir, "time_of_day.json")
+        with open(path, "w") as f:
+            json.dump(manifest, f, indent=2)
+            f.write("\n")
+        print(f"  Created {path}")
+
+    print(f"\nBaked time-of-day LUTs for {len(names)} themes")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,21 @@ Creates underground layer sprites for Earth and Mars themes:
 Each sprite is an isometric block (top diamond + 2 walls) representing
 solid terrain that must be excavated.
 
-Usage: python3 scripts/generate_underground_sprites.py
+--sdf also writes underground_edges_sdf.png and underground_silhouette_sdf.png
+per theme: distance fields of the block outline (see sprite_sdf).
+
+--masks writes a 1-bit picking mask (name.mask) next to each sprite, as the
+block, decoration and river generators do (see sprite_mask).
+
+Usage: python3 scripts/generate_underground_sprites.py [--sdf] [--masks]
 """
 
 from PIL import Image, ImageDraw
+from sprite_mask import write_mask
+from sprite_profile import trace_generator, trace_sprite, trace_stage
+from sprite_sdf import outline_sdf
+from sprite_writer import PipelinedWriter
+import argparse
 import os
 
 # Standard sprite dimensions (same as blocks)
@@ -23,6 +34,30 @@ TILE_HEIGHT = 64
 DIAMOND_HEIGHT = 32  # Top face diamond height
 WALL_HEIGHT = 32     # Height of side walls
 
+# Top diamond
+TOP_POINTS = [
+    (32, 0),      # Top
+    (64, 16),     # Right
+    (32, 32),     # Bottom
+    (0, 16),      # Left
+]
+
+# Left wall (parallelogram)
+LEFT_POINTS = [
+    (0, 16),      # Top left
+    (32, 32),     # Top right
+    (32, 64),     # Bottom right
+    (0, 48),      # Bottom left
+]
+
+# Right wall (parallelogram)
+RIGHT_POINTS = [
+    (32, 32),     # Top left
+    (64, 16),     # Top right
+    (64, 48),     # Bottom right
+    (32, 64),     # Bottom left
+]
+
 
 def hex_to_rgb(hex_color: str) -> tuple:
     """Convert hex color to RGB tuple."""
@@ -40,11 +75,13 @@ def lighten(color: tuple, factor: float = 1.3) -> tuple:
     return tuple(min(255, int(c * factor)) for c in color)
 
 
+@trace_stage
 def create_isometric_block(
     top_color: tuple,
     left_color: tuple,
     right_color: tuple,
-    texture_noise: bool = True
+    texture_noise: bool = True,
+    variant: int = 0
 ) -> Image.Image:
     """Create an isometric block sprite (solid underground terrain).
 
@@ -52,58 +89,37 @@ def create_isometric_block(
     - A diamond-shaped top face
     - A left wall (darker)
     - A right wall (lighter than left, darker than top)
+
+    Variants reseed the texture noise; variant 0 is the shipped sprite.
     """
     img = Image.new('RGBA', (TILE_WIDTH, TILE_HEIGHT), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
 
-    # Define points for isometric block
-    # Top diamond
-    top_points = [
-        (32, 0),      # Top
-        (64, 16),     # Right
-        (32, 32),     # Bottom
-        (0, 16),      # Left
-    ]
-
-    # Left wall (parallelogram)
-    left_points = [
-        (0, 16),      # Top left
-        (32, 32),     # Top right
-        (32, 64),     # Bottom right
-        (0, 48),      # Bottom left
-    ]
-
-    # Right wall (parallelogram)
-    right_points = [
-        (32, 32),     # Top left
-        (64, 16),     # Top right
-        (64, 48),     # Bottom right
-        (32, 64),     # Bottom left
-    ]
-
     # Draw walls first (behind top)
-    draw.polygon(left_points, fill=left_color)
-    draw.polygon(right_points, fill=right_color)
+    draw.polygon(LEFT_POINTS, fill=left_color)
+    draw.polygon(RIGHT_POINTS, fill=right_color)
 
     # Draw top face
-    draw.polygon(top_points, fill=top_color)
+    draw.polygon(TOP_POINTS, fill=top_color)
 
     # Add subtle texture/noise if enabled
     if texture_noise:
-        _add_texture(img, top_points, top_color, 0.1)
-        _add_texture(img, left_points, left_color, 0.08)
-        _add_texture(img, right_points, right_color, 0.08)
+        _add_texture(img, TOP_POINTS, top_color, 0.1, variant)
+        _add_texture(img, LEFT_POINTS, left_color, 0.08, variant)
+        _add_texture(img, RIGHT_POINTS, right_color, 0.08, variant)
 
     # Outline for definition
     outline = (0, 0, 0, 60)
-    draw.polygon(top_points, outline=outline, width=1)
-    draw.polygon(left_points, outline=outline, width=1)
-    draw.polygon(right_points, outline=outline, width=1)
+    draw.polygon(TOP_POINTS, outline=outline, width=1)
+    draw.polygon(LEFT_POINTS, outline=outline, width=1)
+    draw.polygon(RIGHT_POINTS, outline=outline, width=1)
 
     return img
 
 
-def _add_texture(img: Image.Image, region_points: list, base_color: tuple, intensity: float):
+@trace_stage
+def _add_texture(img: Image.Image, region_points: list, base_color: tuple, intensity: float,
+                 variant: int = 0):
     """Add subtle random texture noise within a region."""
     import random
 
@@ -119,7 +135,7 @@ def _add_texture(img: Image.Image, region_points: list, base_color: tuple, inten
     mask_draw.polygon(region_points, fill=255)
 
     # Add random noise pixels
-    random.seed(42)  # Deterministic for consistency
+    random.seed(42 + variant)  # Deterministic for consistency
     pixels = img.load()
     mask_pixels = mask.load()
 
@@ -134,7 +150,7 @@ def _add_texture(img: Image.Image, region_points: list, base_color: tuple, inten
                 pixels[x, y] = (r, g, b, 255)
 
 
-def create_earth_soil() -> Image.Image:
+def create_earth_soil(variant: int = 0) -> Image.Image:
     """Create brown topsoil for Z=-1 (Earth theme).
 
     Rich brown soil with organic texture.
@@ -142,10 +158,10 @@ def create_earth_soil() -> Image.Image:
     top = hex_to_rgb("#8B5A2B")     # Sienna brown (top)
     left = hex_to_rgb("#6B4423")    # Dark brown (left shadow)
     right = hex_to_rgb("#7A5128")   # Medium brown (right)
-    return create_isometric_block(top, left, right)
+    return create_isometric_block(top, left, right, variant=variant)
 
 
-def create_earth_rock() -> Image.Image:
+def create_earth_rock(variant: int = 0) -> Image.Image:
     """Create clay/rock mix for Z=-2 (Earth theme).
 
     Grayish-brown rocky clay layer.
@@ -153,10 +169,10 @@ def create_earth_rock() -> Image.Image:
     top = hex_to_rgb("#8B7355")     # Tan/clay (top)
     left = hex_to_rgb("#5C4A3D")    # Dark clay (left shadow)
     right = hex_to_rgb("#6B5B4F")   # Medium clay (right)
-    return create_isometric_block(top, left, right)
+    return create_isometric_block(top, left, right, variant=variant)
 
 
-def create_earth_bedrock() -> Image.Image:
+def create_earth_bedrock(variant: int = 0) -> Image.Image:
     """Create gray bedrock for Z=-3+ (Earth theme).
 
     Hard gray stone layer.
@@ -164,10 +180,10 @@ def create_earth_bedrock() -> Image.Image:
     top = hex_to_rgb("#696969")     # Dim gray (top)
     left = hex_to_rgb("#3D3D3D")    # Dark gray (left shadow)
     right = hex_to_rgb("#505050")   # Medium gray (right)
-    return create_isometric_block(top, left, right)
+    return create_isometric_block(top, left, right, variant=variant)
 
 
-def create_mars_regolith() -> Image.Image:
+def create_mars_regolith(variant: int = 0) -> Image.Image:
     """Create red regolith for Z=-1 (Mars theme).
 
     Rusty Martian surface soil.
@@ -175,10 +191,10 @@ def create_mars_regolith() -> Image.Image:
     top = hex_to_rgb("#B5451C")     # Rusty red (top)
     left = hex_to_rgb("#8B3014")    # Dark rust (left shadow)
     right = hex_to_rgb("#9C3D18")   # Medium rust (right)
-    return create_isometric_block(top, left, right)
+    return create_isometric_block(top, left, right, variant=variant)
 
 
-def create_mars_rock() -> Image.Image:
+def create_mars_rock(variant: int = 0) -> Image.Image:
     """Create orange rock for Z=-2 (Mars theme).
 
     Martian subsurface rock.
@@ -186,10 +202,10 @@ def create_mars_rock() -> Image.Image:
     top = hex_to_rgb("#CD6839")     # Orange-brown (top)
     left = hex_to_rgb("#8B4726")    # Dark orange (left shadow)
     right = hex_to_rgb("#A85530")   # Medium orange (right)
-    return create_isometric_block(top, left, right)
+    return create_isometric_block(top, left, right, variant=variant)
 
 
-def create_mars_basalt() -> Image.Image:
+def create_mars_basalt(variant: int = 0) -> Image.Image:
     """Create dark basalt for Z=-3+ (Mars theme).
 
     Martian basaltic bedrock.
@@ -197,27 +213,51 @@ def create_mars_basalt() -> Image.Image:
     top = hex_to_rgb("#4A4A4A")     # Dark gray (top)
     left = hex_to_rgb("#2D2D2D")    # Very dark (left shadow)
     right = hex_to_rgb("#3A3A3A")   # Medium dark (right)
-    return create_isometric_block(top, left, right)
+    return create_isometric_block(top, left, right, variant=variant)
 
 
+# Theme -> layer name -> generator
+UNDERGROUND_SPRITES = {
+    "earth": {
+        "soil": create_earth_soil,
+        "rock": create_earth_rock,
+        "bedrock": create_earth_bedrock,
+    },
+    "mars": {
+        "regolith": create_mars_regolith,
+        "rock": create_mars_rock,
+        "basalt": create_mars_basalt,
+    },
+}
+
+
+@trace_generator
 def main():
+    parser = argparse.ArgumentParser(description="Generate underground terrain sprites.")
+    parser.add_argument("--sdf", action="store_true",
+                        help="write edge and silhouette distance field textures per theme")
+    parser.add_argument("--masks", action="store_true",
+                        help="write a 1-bit picking mask per sprite")
+    args = parser.parse_args()
+    sdf_images = outline_sdf([TOP_POINTS, LEFT_POINTS, RIGHT_POINTS]) if args.sdf else ()
+
     # Earth underground sprites
     earth_dir = "assets/sprites/terrain/earth/underground"
     os.makedirs(earth_dir, exist_ok=True)
 
     print(f"Generating Earth underground sprites in {earth_dir}/")
 
-    earth_sprites = {
-        "soil": create_earth_soil,
-        "rock": create_earth_rock,
-        "bedrock": create_earth_bedrock,
-    }
+    earth_sprites = UNDERGROUND_SPRITES["earth"]
 
-    for name, create_func in earth_sprites.items():
-        img = create_func()
-        output_path = os.path.join(earth_dir, f"{name}.png")
-        img.save(output_path, 'PNG')
-        print(f"  Created {output_path} ({img.width}x{img.height})")
+    with PipelinedWriter() as writer:
+        for name, create_func in earth_sprites.items():
+            with trace_sprite(f"earth_{name}"):
+                img = create_func()
+            writer.submit(img, os.path.join(earth_dir, f"{name}.png"))
+            if args.masks:
+                write_mask(img, os.path.join(earth_dir, f"{name}.mask"))
+        for kind, img in zip(("edges", "silhouette"), sdf_images):
+            writer.submit(img, os.path.join(earth_dir, f"underground_{kind}_sdf.png"))
 
     # Mars underground sprites
     mars_dir = "assets/sprites/terrain/mars/underground"
@@ -225,17 +265,17 @@ def main():
 
     print(f"\nGenerating Mars underground sprites in {mars_dir}/")
 
-    mars_sprites = {
-        "regolith": create_mars_regolith,
-        "rock": create_mars_rock,
-        "basalt": create_mars_basalt,
-    }
-
-    for name, create_func in mars_sprites.items():
-        img = create_func()
-        output_path = os.path.join(mars_dir, f"{name}.png")
-        img.save(output_path, 'PNG')
-        print(f"  Created {output_path} ({img.width}x{img.height})")
+    mars_sprites = UNDERGROUND_SPRITES["mars"]
+
+    with PipelinedWriter() as writer:
+        for name, create_func in mars_sprites.items():
+            with trace_sprite(f"mars_{name}"):
+                img = create_func()
+            writer.submit(img, os.path.join(mars_dir, f"{name}.png"))
+            if args.masks:
+                write_mask(img, os.path.join(mars_dir, f"{name}.mask"))
+        for kind, img in zip(("edges", "silhouette"), sdf_images):
+            writer.submit(img, os.path.join(mars_dir, f"underground_{kind}_sdf.png"))
 
     print(f"\nGenerated {len(earth_sprites) + len(mars_sprites)} underground sprites")
 
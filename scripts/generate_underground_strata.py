@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Generate underground strata texture arrays for Arcology.
+
+generate_underground_sprites.py draws three fixed layers per theme, and
+terrain.json reuses the last one for every deeper Z. This generator instead
+produces a configurable number of depth layers per theme. Colors are
+interpolated between key strata, and each layer gets several noise variants.
+Everything is packed into one texture-array-layout image:
+- <theme>/underground/strata.png  - rows = depth layers (Z=-1 first),
+                                    columns = noise variants, 64x64 slices
+- <theme>/underground/strata.json - layer index manifest
+
+Slice index for a cell is layer * variants + variant, so one material with
+a Texture2DArray (import with the manifest's columns/rows as slices) can
+draw every underground cell.
+
+Usage: python3 scripts/generate_underground_strata.py [--layers 16] [--variants 4]
+"""
+
+from PIL import Image, ImageDraw
+from generate_underground_sprites import (LEFT_POINTS, RIGHT_POINTS, TILE_HEIGHT, TILE_WIDTH,
+                                          TOP_POINTS, hex_to_rgb)
+from sprite_profile import trace_generator, trace_sprite, trace_stage
+from sprite_writer import PipelinedWriter
+import numpy as np
+import argparse
+import json
+import os
+import zlib
+
+TERRAIN_CONFIG = "data/terrain.json"
+
+# Key strata per theme: (depth below ground, top, left, right). Depths 1-3
+# match the hand-tuned sprites; deeper keys darken toward the basement.
+# Layers between keys are interpolated; layers below the last key reuse it.
+STRATA_KEYS = {
+    "earth": [
+        (1, "#8B5A2B", "#6B4423", "#7A5128"),   # Topsoil
+        (2, "#8B7355", "#5C4A3D", "#6B5B4F"),   # Clay/rock
+        (3, "#696969", "#3D3D3D", "#505050"),   # Bedrock
+        (8, "#5A5652", "#353230", "#45413E"),   # Deep bedrock
+        (16, "#3E3A3A", "#242121", "#302C2C"),  # Basement rock
+    ],
+    "mars": [
+        (1, "#B5451C", "#8B3014", "#9C3D18"),   # Regolith
+        (2, "#CD6839", "#8B4726", "#A85530"),   # Rock
+        (3, "#4A4A4A", "#2D2D2D", "#3A3A3A"),   # Basalt
+        (8, "#3F3733", "#262120", "#322B28"),   # Deep basalt
+        (16, "#2E2626", "#1A1515", "#241D1D"),  # Mantle-dark basalt
+    ],
+}
+
+DEFAULT_LAYERS = 16
+DEFAULT_VARIANTS = 4
+STRATA_SEED = 40
+
+# Same speckle as generate_underground_sprites._add_texture
+NOISE_DENSITY = 0.15
+FACE_NOISE = {"top": 0.1, "left": 0.08, "right": 0.08}
+OUTLINE = (0, 0, 0, 60)
+
+
+def _face_masks() -> tuple:
+    """Boolean face masks (top, left, right) and the outline mask."""
+    faces = {"left": LEFT_POINTS, "right": RIGHT_POINTS, "top": TOP_POINTS}
+    masks = {}
+    # Later faces overdraw earlier ones, as in create_isometric_block
+    for face, points in faces.items():
+        mask = Image.new('L', (TILE_WIDTH, TILE_HEIGHT), 0)
+        ImageDraw.Draw(mask).polygon(points, fill=255)
+        drawn = np.asarray(mask) > 0
+        for other in masks:
+            masks[other] &= ~drawn
+        masks[face] = drawn
+
+    outline = Image.new('L', (TILE_WIDTH, TILE_HEIGHT), 0)
+    outline_draw = ImageDraw.Draw(outline)
+    for points in faces.values():
+        outline_draw.polygon(points, outline=255)
+    return masks, np.asarray(outline) > 0
+
+
+def strata_colors(theme: str, layers: int) -> np.ndarray:
+    """Interpolate key strata to (layers, 3 faces, RGB) floats, Z=-1 first."""
+    keys = STRATA_KEYS[theme]
+    key_depths = [depth for depth, *_ in keys]
+    key_colors = np.array([[hex_to_rgb(c) for c in colors] for _, *colors in keys], dtype=np.float64)
+    depths = np.arange(1, layers + 1)
+    colors = np.empty((layers, 3, 3))
+    for face in range(3):
+        for channel in range(3):
+            colors[:, face, channel] = np.interp(depths, key_depths, key_colors[:, face, channel])
+    return colors
+
+
+@trace_stage
+def render_strata(theme: str, layers: int, variants: int) -> np.ndarray:
+    """Render all layers and variants at once as (layers, variants, H, W, 4)."""
+    masks, outline = _face_masks()
+    colors = strata_colors(theme, layers)
+    rng = np.random.default_rng([STRATA_SEED, zlib.crc32(theme.encode()), layers, variants])
+    shape = (layers, variants, TILE_HEIGHT, TILE_WIDTH)
+
+    pixels = np.zeros(shape + (4,), dtype=np.float64)
+    for index, face in enumerate(("top", "left", "right")):
+        # Speckle: a fraction of pixels shifted by up to +/- intensity
+        speckled = rng.random(shape) < NOISE_DENSITY
+        variation = np.trunc(255 * FACE_NOISE[face] * (rng.random(shape) - 0.5) * 2)
+        shade = colors[:, index][:, None, None, None, :] + (variation * speckled)[..., None]
+        mask = masks[face]
+        pixels[:, :, mask, :3] = np.clip(shade[:, :, mask], 0, 255)
+        pixels[:, :, mask, 3] = 255
+
+    pixels[:, :, outline] = OUTLINE
+    return pixels.astype(np.uint8)
+
+
+def pack_array(slices: np.ndarray) -> Image.Image:
+    """Tile (rows, cols, H, W, 4) slices into one rows x cols grid image."""
+    rows, cols, h, w = slices.shape[:4]
+    return Image.fromarray(slices.swapaxes(1, 2).reshape(rows * h, cols * w, 4), 'RGBA')
+
+
+def strata_manifest(theme: str, layers: int, variants: int) -> dict:
+    colors = strata_colors(theme, layers).round().astype(int)
+    return {
+        "image": "strata.png",
+        "slice_size": [TILE_WIDTH, TILE_HEIGHT],
+        "columns": variants,
+        "rows": layers,
+        "default_layer": layers - 1,
+        "layers": [
+            {
+                "z": -(layer + 1),
+                "first_slice": layer * variants,
+                "variants": variants,
+                "colors": {face: "#%02X%02X%02X" % tuple(colors[layer, i])
+                           for i, face in enumerate(("top", "left", "right"))},
+            }
+            for layer in range(layers)
+        ],
+    }
+
+
+def load_underground_themes(config_path: str = TERRAIN_CONFIG) -> dict:
+    """Map theme name -> underground sprite directory for themes with strata."""
+    with open(config_path) as f:
+        themes = json.load(f)["themes"]
+    return {
+        theme: data["underground"]["sprite_path"].replace("res://", "")
+        for theme, data in themes.items()
+        if data.get("underground")
+    }
+
+
+@trace_generator
+def main():
+    parser = argparse.ArgumentParser(description="Generate underground strata texture arrays.")
+    parser.add_argument("--layers", type=int, default=DEFAULT_LAYERS, help="depth layers per theme")
+    parser.add_argument("--variants", type=int, default=DEFAULT_VARIANTS, help="noise variants per layer")
+    args = parser.parse_args()
+
+    print("Generating underground strata")
+
+    generated = 0
+    with PipelinedWriter() as writer:
+        for theme, output_dir in load_underground_themes().items():
+            if theme not in STRATA_KEYS:
+                print(f"  Skipped {theme}: no strata keys")
+                continue
+            os.makedirs(output_dir, exist_ok=True)
+
+            with trace_sprite(f"{theme}_strata", layers=args.layers, variants=args.variants):
+                img = pack_array(render_strata(theme, args.layers, args.variants))
+            writer.submit(img, os.path.join(output_dir, "strata.png"))
+
+            manifest_path = os.path.join(output_dir, "strata.json")
+            with open(manifest_path, "w") as f:
+                json.dump(strata_manifest(theme, args.layers, args.variants), f, indent=2)
+            print(f"  Created {manifest_path} ({args.layers} layers x {args.variants} variants)")
+            generated += 1
+
+    print(f"\nGenerated {generated} strata arrays")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Catalog of the sprites the generators can render, keyed by (asset, theme).
+
+Each generator exposes its sprite table at module level (BLOCK_COLORS via
+block_sprites(), DECORATION_SPRITES, RIVER_SPRITES, UNDERGROUND_SPRITES,
+BACKGROUND_SPRITES, BASE_TEXTURES). This module collects them under one key
+scheme, so tools can render any sprite without running a generator's main():
+- asset  - the output file stem, e.g. "rock", "corner_ne", "earth_sky"
+- theme  - the terrain.json theme it belongs to ("" for block sprites)
+
+Scalable sprites render natively at any scale. Fixed-size sprites are
+resampled: nearest-neighbour for whole-number scales, Lanczos otherwise.
+Variants reseed the noise of generators that take `variant`. Variant 0 is
+always the sprite the generator writes.
+
+Entries may also carry a faster `preview` renderer, used by render_sprite()
+when asked for a preview. Backgrounds preview through the layered path
+(generate_background_sprites.create_layered, composited in memory), which
+takes seconds instead of the serial renderers' minute. Its haze and star
+streams differ from the serial ones, so previews of mars_sky and
+space_stars are close to, but not exactly, the generator's output. Files
+are only ever written from `create`.
+
+Not run directly; imported by watch_sprites and sprite_preview.
+"""
+
+from PIL import Image
+import functools
+import importlib
+import json
+import os
+
+TERRAIN_CONFIG = "data/terrain.json"
+
+CATALOG_MODULES = (
+    "generate_sprites",
+    "generate_terrain_sprites",
+    "generate_river_sprites",
+    "generate_underground_sprites",
+    "generate_background_sprites",
+    "generate_ground_textures",
+)
+
+
+def load_modules() -> dict:
+    return {name: importlib.import_module(name) for name in CATALOG_MODULES}
+
+
+def _entry(create, path: str, scalable: bool = False, variants: bool = False,
+           shared_rng: bool = False, preview=None) -> dict:
+    return {"create": create, "path": path, "scalable": scalable, "variants": variants,
+            "shared_rng": shared_rng, "preview": preview}
+
+
+def sprite_catalog(modules: dict = None, config_path: str = TERRAIN_CONFIG) -> dict:
+    """Map (asset, theme) -> entry for every generator sprite.
+
+    An entry is a dict with:
+    - create   - callable returning the sprite Image
+    - path     - 1x output path, as written by the generator
+    - scalable - create takes scale= and renders natively at any scale
+    - variants - create takes variant=
+    - shared_rng - the preview renderer reseeds the global `random`
+                   module, so two renders must not run at the same time
+    - preview  - faster stand-in for create in previews, or None
+    """
+    modules = modules or load_modules()
+    with open(config_path) as f:
+        themes = json.load(f)["themes"]
+    catalog = {}
+
+    for name, create in modules["generate_sprites"].block_sprites().items():
+        catalog[name, ""] = _entry(create, f"assets/sprites/blocks/{name}.png", scalable=True)
+    for name, create in modules["generate_terrain_sprites"].DECORATION_SPRITES.items():
+        catalog[name, "earth"] = _entry(create, f"assets/sprites/terrain/earth/{name}.png", scalable=True)
+    for name, create in modules["generate_river_sprites"].RIVER_SPRITES.items():
+        catalog[name, "earth"] = _entry(create, f"assets/sprites/terrain/earth/river_tiles/{name}.png",
+                                        scalable=True)
+
+    for theme, table in modules["generate_underground_sprites"].UNDERGROUND_SPRITES.items():
+        for name, create in table.items():
+            catalog[name, theme] = _entry(create, f"assets/sprites/terrain/{theme}/underground/{name}.png",
+                                          variants=True, shared_rng=True)
+
+    background_themes = {data.get("background"): theme for theme, data in themes.items()}
+    background = modules["generate_background_sprites"]
+    for name, create in background.BACKGROUND_SPRITES.items():
+        theme = background_themes.get(f"{name}.png", "")
+        catalog[name, theme] = _entry(create, f"assets/sprites/terrain/backgrounds/{name}.png",
+                                      preview=functools.partial(background.create_layered, name))
+
+    ground = modules["generate_ground_textures"]
+    for theme, data in themes.items():
+        texture_name = data.get("base_texture")
+        if texture_name in ground.BASE_TEXTURES:
+            catalog[texture_name, theme] = _entry(functools.partial(ground.create_base_texture, texture_name),
+                                                  f"assets/sprites/terrain/{theme}/{texture_name}.png",
+                                                  variants=True)
+    return catalog
+
+
+def sprite_call(entry: dict, variant: int = 0, scale: float = 1.0,
+                preview: bool = False) -> functools.partial:
+    """Bind an entry's create function for one variant (and native scale).
+
+    Variant 0 and scale 1 of a fixed-size sprite bind nothing, so the call
+    is the same one the generator makes. With preview=True the entry's
+    preview renderer is bound instead, if it has one.
+    """
+    kwargs = {}
+    if variant:
+        if not entry["variants"]:
+            raise ValueError(f"{entry['path']} has no variants")
+        kwargs["variant"] = variant
+    if entry["scalable"]:
+        kwargs["scale"] = scale
+    create = entry["preview"] if preview and entry["preview"] else entry["create"]
+    return functools.partial(create, **kwargs)
+
+
+def output_path(entry: dict, scale: float = 1.0) -> str:
+    """Generator output path of an entry at `scale` (name@2x.png etc.)."""
+    if scale == 1:
+        return entry["path"]
+    stem, ext = os.path.splitext(entry["path"])
+    return f"{stem}@{scale:g}x{ext}"
+
+
+def render_sprite(entry: dict, variant: int = 0, scale: float = 1.0,
+                  preview: bool = False) -> Image.Image:
+    """Render one catalog entry at any variant and scale."""
+    if scale <= 0:
+        raise ValueError(f"scale must be positive, got {scale:g}")
+    img = sprite_call(entry, variant, scale, preview)()
+    if entry["scalable"] or scale == 1:
+        return img
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    resample = Image.NEAREST if float(scale).is_integer() else Image.LANCZOS
+    return img.resize(size, resample)
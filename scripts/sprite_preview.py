@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""In-memory sprite render API and localhost preview server.
+
+Level-design tools can ask for any catalog sprite (see sprite_catalog) as
+PNG bytes or as an RGBA array, keyed by (asset, theme, variant, scale),
+without going through a generator's main() or touching the filesystem:
+
+    from sprite_preview import SpriteRenderer
+    renderer = SpriteRenderer()
+    png = renderer.png("rock", "mars", variant=17, scale=2)
+    pixels = renderer.array("corner_ne", "earth", scale=4)
+
+Catalog entries with a faster preview renderer (the backgrounds) render
+through it, in memory; nothing is written to disk. Renders larger than
+MAX_RENDER_PIXELS are refused with ValueError.
+
+Results are memoized in a least-recently-used cache bounded by total bytes
+(CACHE_BYTES by default). Arrays are returned read-only because they are
+shared between callers. Concurrent requests for the same key wait for one
+render; different keys render in parallel, except sprites whose generator
+reseeds the global `random` module (catalog entries with shared_rng), which
+take turns.
+
+Run directly, it serves the same API over HTTP on 127.0.0.1:
+- /                                   - index page with every catalog sprite
+- /catalog.json                       - [{asset, theme, scalable, variants}]
+- /sprite/<theme>/<asset>.png?variant=17&scale=2
+                                      - PNG bytes (theme "-" for blocks,
+                                        0 < scale <= MAX_SCALE, at most
+                                        MAX_RENDER_PIXELS)
+- /stats.json                         - cache hits, misses, entries, bytes
+
+Usage: python3 scripts/sprite_preview.py [--port 8765] [--cache-mb 64]
+"""
+
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PIL import Image
+from sprite_catalog import render_sprite, sprite_catalog
+from sprite_profile import trace_span
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+import argparse
+import contextlib
+import html
+import io
+import json
+import math
+import threading
+
+CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_PORT = 8765
+NO_THEME = "-"  # URL segment for sprites without a theme
+MAX_SCALE = 8   # Largest ?scale= the server renders
+MAX_RENDER_PIXELS = 4096 * 4096  # Largest render, so one request cannot exhaust memory
+
+
+class LRUCache:
+    """Thread-safe LRU mapping bounded by the summed size of its values."""
+
+    def __init__(self, max_bytes: int = CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = 0
+        self._items = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, size: int) -> None:
+        with self._lock:
+            if key in self._items:
+                self.bytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return  # Larger than the whole cache: serve but do not keep
+            self._items[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.bytes -= evicted
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self._items), "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+
+class SpriteRenderer:
+    """Renders catalog sprites to PNG bytes or arrays through an LRU cache."""
+
+    def __init__(self, cache_bytes: int = CACHE_BYTES, catalog: dict = None,
+                 max_pixels: int = MAX_RENDER_PIXELS):
+        self.catalog = catalog if catalog is not None else sprite_catalog()
+        self.max_pixels = max_pixels
+        self.cache = LRUCache(cache_bytes)
+        self._rng_lock = threading.Lock()  # Held while rendering shared_rng entries
+        self._key_locks = {}  # key -> (lock, waiting renders)
+        self._key_locks_lock = threading.Lock()
+
+    def _entry(self, asset: str, theme: str) -> dict:
+        try:
+            return self.catalog[asset, theme]
+        except KeyError:
+            raise KeyError(f"no sprite {asset!r} in theme {theme!r}") from None
+
+    @contextlib.contextmanager
+    def _locked(self, key: tuple):
+        """Hold the lock for one cache key; the lock is dropped once unused."""
+        with self._key_locks_lock:
+            lock, users = self._key_locks.get(key, (None, 0))
+            lock = lock or threading.Lock()
+            self._key_locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._key_locks_lock:
+                lock, users = self._key_locks[key]
+                if users == 1:
+                    del self._key_locks[key]
+                else:
+                    self._key_locks[key] = (lock, users - 1)
+
+    def array(self, asset: str, theme: str = "", variant: int = 0, scale: float = 1.0) -> np.ndarray:
+        """RGBA uint8 array (height, width, 4) of one sprite."""
+        key = ("array", asset, theme, variant, float(scale))
+        pixels = self.cache.get(key)
+        if pixels is not None:
+            return pixels
+        entry = self._entry(asset, theme)
+        if scale != 1:
+            # The 1x render (cached) gives the output size before committing to it
+            base = self.array(asset, theme, variant)
+            size = (max(1, round(base.shape[1] * scale)), max(1, round(base.shape[0] * scale)))
+            if size[0] * size[1] > self.max_pixels:
+                raise ValueError(f"{asset} at scale {scale:g} would be {size[0]}x{size[1]}, "
+                                 f"over {self.max_pixels} pixels")
+        with self._locked(key):
+            # Another request for the same key may have rendered it meanwhile
+            pixels = self.cache.get(key)
+            if pixels is None:
+                rng_lock = self._rng_lock if entry["shared_rng"] else contextlib.nullcontext()
+                with rng_lock, trace_span("preview_render", asset=asset, theme=theme,
+                                          variant=variant, scale=scale):
+                    img = render_sprite(entry, variant, scale, preview=True)
+                pixels = np.asarray(img.convert('RGBA'))
+                pixels.flags.writeable = False
+                self.cache.put(key, pixels, pixels.nbytes)
+        return pixels
+
+    def png(self, asset: str, theme: str = "", variant: int = 0, scale: float = 1.0) -> bytes:
+        """PNG-encoded bytes of one sprite."""
+        key = ("png", asset, theme, variant, float(scale))
+        data = self.cache.get(key)
+        if data is None:
+            buffer = io.BytesIO()
+            Image.fromarray(self.array(asset, theme, variant, scale), 'RGBA').save(buffer, 'PNG')
+            data = buffer.getvalue()
+            self.cache.put(key, data, len(data))
+        return data
+
+    def listing(self) -> list:
+        return [{"asset": asset, "theme": theme, "scalable": entry["scalable"], "variants": entry["variants"]}
+                for (asset, theme), entry in sorted(self.catalog.items(), key=lambda item: item[0][::-1])]
+
+
+def _index_page(renderer: SpriteRenderer) -> bytes:
+    cells = []
+    for item in renderer.listing():
+        theme = item["theme"] or NO_THEME
+        src = html.escape(f"/sprite/{theme}/{item['asset']}.png?scale=1")
+        label = html.escape(f"{item['theme'] or 'blocks'} / {item['asset']}")
+        cells.append(f'<figure><img src="{src}" loading="lazy" style="max-width:256px">'
+                     f'<figcaption>{label}</figcaption></figure>')
+    return ("<!doctype html><title>Sprite preview</title>"
+            "<style>body{font-family:sans-serif;background:#333;color:#eee;display:flex;flex-wrap:wrap}"
+            "figure{margin:8px;text-align:center}</style>" + "".join(cells)).encode()
+
+
+def make_handler(renderer: SpriteRenderer) -> type:
+    class PreviewHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, message: str) -> None:
+            self._send(status, message.encode() + b"\n", "text/plain; charset=utf-8")
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            if not parts:
+                self._send(200, _index_page(renderer), "text/html; charset=utf-8")
+            elif parts == ["catalog.json"]:
+                self._send(200, json.dumps(renderer.listing()).encode(), "application/json")
+            elif parts == ["stats.json"]:
+                self._send(200, json.dumps(renderer.cache.stats()).encode(), "application/json")
+            elif len(parts) == 3 and parts[0] == "sprite" and parts[2].endswith(".png"):
+                theme = "" if parts[1] == NO_THEME else parts[1]
+                query = parse_qs(url.query)
+                try:
+                    variant = int(query.get("variant", ["0"])[0])
+                    scale = float(query.get("scale", ["1"])[0])
+                    if not (math.isfinite(scale) and 0 < scale <= MAX_SCALE):
+                        raise ValueError(f"scale must be in (0, {MAX_SCALE}], got {scale:g}")
+                    body = renderer.png(parts[2][:-4], theme, variant, scale)
+                except KeyError as e:
+                    self._error(404, e.args[0])
+                except (ValueError, OverflowError) as e:
+                    self._error(400, str(e))
+                else:
+                    self._send(200, body, "image/png")
+            else:
+                self._error(404, f"unknown path {url.path}")
+
+        def log_message(self, format, *args):
+            print(f"  {self.address_string()} {format % args}")
+
+    return PreviewHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve in-memory sprite renders on localhost.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-mb", type=float, default=CACHE_BYTES / (1024 * 1024),
+                        help="render cache size in MiB")
+    args = parser.parse_args()
+
+    renderer = SpriteRenderer(int(args.cache_mb * 1024 * 1024))
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(renderer))
+    print(f"Serving {len(renderer.catalog)} sprites on http://127.0.0.1:{args.port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
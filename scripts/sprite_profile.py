@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Per-stage profiling hooks for sprite generators.
+
+Records named spans at three levels - generator (one script run), sprite
+(one rendered image) and stage (a drawing or encoding step inside it) -
+with wall and thread CPU time, and writes them as Chrome trace-event JSON
+(open in chrome://tracing or https://ui.perfetto.dev).
+
+Tracing is switched on by environment variables, read once at import:
+- SPRITE_PROFILE=build/trace.json - write spans to this file. Runs append
+  to an existing trace, one process row per generator run.
+- SPRITE_PROFILE_CPROFILE=build/prof - also dump a cProfile .prof file per
+  sprite into <dir>/<generator>/<sprite>.prof.
+
+When tracing is off the decorators return the function unchanged and the
+context managers are a shared no-op, so instrumented code runs as before.
+Tiny functions called per pixel (lerp_color, ScaledDraw calls) use
+trace_stage(aggregate=True): their call count and wall time are summed per
+sprite and attached to the sprite span instead of emitting one event each.
+Spans inside process-pool workers are not collected; the parent records
+the pool as a single stage.
+
+Example:
+    SPRITE_PROFILE=trace.json python3 scripts/generate_background_sprites.py
+
+Not run directly; imported by the generate_*.py scripts.
+"""
+
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+PROFILE_ENV = "SPRITE_PROFILE"
+CPROFILE_ENV = "SPRITE_PROFILE_CPROFILE"
+
+TRACE_PATH = os.environ.get(PROFILE_ENV)
+CPROFILE_DIR = os.environ.get(CPROFILE_ENV)
+ENABLED = bool(TRACE_PATH or CPROFILE_DIR)
+
+# Shared no-op returned by the context managers when tracing is off
+_NULL = contextlib.nullcontext()
+
+# Wall clock anchor so traces from separate runs line up on one timeline
+_EPOCH_NS = time.time_ns() - time.perf_counter_ns()
+
+_events = []
+_generator = {"name": None}
+# Aggregated stages for the sprite being rendered: name -> [calls, wall_ns]
+_aggregates = {}
+
+
+def _now_us() -> float:
+    return (_EPOCH_NS + time.perf_counter_ns()) / 1000
+
+
+@contextlib.contextmanager
+def _span(name: str, cat: str, args: dict):
+    start = _now_us()
+    cpu_start = time.thread_time_ns()
+    try:
+        yield args
+    finally:
+        _events.append({
+            "name": name, "cat": cat, "ph": "X",
+            "pid": os.getpid(), "tid": threading.get_ident(),
+            "ts": start, "dur": _now_us() - start,
+            "tts": cpu_start / 1000, "tdur": (time.thread_time_ns() - cpu_start) / 1000,
+            "args": args,
+        })
+
+
+def trace_span(name: str, cat: str = "stage", **args):
+    """Context manager recording one span (no-op when tracing is off)."""
+    if not ENABLED:
+        return _NULL
+    return _span(name, cat, args)
+
+
+@contextlib.contextmanager
+def _sprite_span(name: str, args: dict):
+    _aggregates.clear()
+    profiler = cProfile.Profile() if CPROFILE_DIR else None
+    with _span(name, "sprite", args):
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            for stage, (calls, wall_ns) in sorted(_aggregates.items()):
+                args[stage] = {"calls": calls, "wall_ms": round(wall_ns / 1e6, 3)}
+
+    if profiler:
+        prof_dir = os.path.join(CPROFILE_DIR, _generator["name"] or "generator")
+        os.makedirs(prof_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(prof_dir, f"{name}.prof"))
+
+
+def trace_sprite(name: str, **args):
+    """Context manager around rendering one sprite.
+
+    Collects aggregated stage totals into the span args and, with
+    SPRITE_PROFILE_CPROFILE set, dumps a cProfile file for the sprite.
+    """
+    if not ENABLED:
+        return _NULL
+    return _sprite_span(name, args)
+
+
+def trace_stage(func=None, *, name: str = None, aggregate: bool = False):
+    """Decorator recording each call of `func` as a stage span.
+
+    With aggregate=True calls are only counted and timed (see module docs).
+    Usable bare (@trace_stage) or with options (@trace_stage(aggregate=True)).
+    """
+    if func is None:
+        return functools.partial(trace_stage, name=name, aggregate=aggregate)
+    if not ENABLED:
+        return func
+
+    stage_name = name or func.__qualname__
+
+    if aggregate:
+        @functools.wraps(func)
+        def counted(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                totals = _aggregates.setdefault(stage_name, [0, 0])
+                totals[0] += 1
+                totals[1] += time.perf_counter_ns() - start
+        return counted
+
+    @functools.wraps(func)
+    def traced(*args, **kwargs):
+        with _span(stage_name, "stage", {}):
+            return func(*args, **kwargs)
+    return traced
+
+
+def write_trace(path: str) -> int:
+    """Append collected events to a Chrome trace file. Returns events written."""
+    events = []
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        except (ValueError, KeyError):
+            events = []  # Unreadable trace: start a fresh one
+
+    events.append({"name": "process_name", "ph": "M", "pid": os.getpid(),
+                   "args": {"name": _generator["name"]}})
+    events.extend(_events)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(_events)
+
+
+def trace_generator(func):
+    """Decorator for a generator's main(): traces the run and writes the trace."""
+    if not ENABLED:
+        return func
+
+    @functools.wraps(func)
+    def traced(*args, **kwargs):
+        script = sys.modules[func.__module__].__file__
+        _generator["name"] = os.path.splitext(os.path.basename(script))[0]
+        try:
+            with _span(_generator["name"], "generator", {}):
+                return func(*args, **kwargs)
+        finally:
+            if TRACE_PATH:
+                count = write_trace(TRACE_PATH)
+                print(f"  Profile: {count} spans appended to {TRACE_PATH}")
+    return traced
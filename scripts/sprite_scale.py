@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Resolution-independent drawing and multi-scale export for sprite generators.
+
+Sprite geometry is authored in 64x64 "design units" (the 1x tile). ScaledDraw
+maps those coordinates to any output scale, so one generator function can
+render 1x, 2x and 4x sprites from the same polygon literals. export_scales()
+renders every requested scale in one pass and derives small UI icons from the
+largest render instead of drawing them again.
+
+Output naming:
+- name.png        - 1x (unchanged from the single-scale generators)
+- name@2x.png     - other scales
+- icons/name_32.png - UI icons (longest side = 32px)
+- <atlas>.png/.json - with --trim, all sprites of one scale trimmed to their
+  alpha bounds and packed with pivot offsets (see sprite_trim)
+- name.mask / <atlas>.mask - with --masks, 1-bit picking masks per sprite,
+  or per atlas page with --trim (see sprite_mask)
+
+Not run directly; imported by the generate_*.py scripts.
+"""
+
+from PIL import Image
+from sprite_mask import write_mask
+from sprite_profile import trace_span, trace_sprite, trace_stage
+from sprite_raster import raster_backend
+from sprite_trim import write_trimmed_atlas
+import argparse
+import os
+
+
+def scale_coord(value: float, scale: float) -> float:
+    """Map a design-unit pixel coordinate to output pixels.
+
+    Pixel centres are kept aligned, so scale=1 is the identity and a 1px
+    feature at design resolution covers `scale` pixels at output resolution.
+    """
+    return (value + 0.5) * scale - 0.5
+
+
+def scaled_size(width: int, height: int, scale: float) -> tuple:
+    """Return the output pixel size of a width x height design canvas."""
+    return (max(1, round(width * scale)), max(1, round(height * scale)))
+
+
+class ScaledDraw:
+    """ImageDraw wrapper that accepts design-unit coordinates.
+
+    Supports the subset of ImageDraw used by the generators: polygon,
+    ellipse, line, point and rectangle. Stroke widths scale too. Drawing goes
+    through a sprite_raster backend (`backend` name, or the process default).
+    """
+
+    def __init__(self, img: Image.Image, scale: float = 1.0, backend: str = None):
+        self.draw = raster_backend(img, backend)
+        self.scale = scale
+
+    def _points(self, points: list) -> list:
+        return [(scale_coord(x, self.scale), scale_coord(y, self.scale)) for x, y in points]
+
+    def _box(self, box: list) -> list:
+        return [scale_coord(v, self.scale) for v in box]
+
+    def _width(self, width: int) -> int:
+        return max(1, round(width * self.scale))
+
+    @trace_stage(aggregate=True)
+    def polygon(self, points: list, fill=None, outline=None, width: int = 1) -> None:
+        self.draw.polygon(self._points(points), fill=fill, outline=outline,
+                          width=self._width(width))
+
+    @trace_stage(aggregate=True)
+    def ellipse(self, box: list, fill=None, outline=None, width: int = 1) -> None:
+        self.draw.ellipse(self._box(box), fill=fill, outline=outline,
+                          width=self._width(width))
+
+    @trace_stage(aggregate=True)
+    def rectangle(self, box: list, fill=None, outline=None, width: int = 1) -> None:
+        self.draw.rectangle(self._box(box), fill=fill, outline=outline,
+                            width=self._width(width))
+
+    @trace_stage(aggregate=True)
+    def line(self, points: list, fill=None, width: int = 1) -> None:
+        self.draw.line(self._points(points), fill=fill, width=self._width(width))
+
+    @trace_stage(aggregate=True)
+    def point(self, xy: tuple, fill=None) -> None:
+        # A design-unit point becomes a scale x scale square
+        x, y = xy
+        half = (self.scale - 1) / 2
+        cx, cy = scale_coord(x, self.scale), scale_coord(y, self.scale)
+        self.draw.rectangle([cx - half, cy - half, cx + half, cy + half], fill=fill)
+
+
+def scale_suffix(scale: float) -> str:
+    """Return the filename suffix for a scale ('' for 1x, '@2x' otherwise)."""
+    if scale == 1:
+        return ""
+    return f"@{scale:g}x"
+
+
+def scale_arg_parser(description: str, default_icon_sizes: tuple = ()) -> argparse.ArgumentParser:
+    """Build a parser with the shared --scales / --icon-sizes / --trim options.
+
+    Generators with extra options add them to the returned parser.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0],
+                        help="output scales to emit, e.g. --scales 1 2 4")
+    parser.add_argument("--icon-sizes", type=int, nargs="*", default=list(default_icon_sizes),
+                        help="UI icon sizes in pixels (longest side), e.g. --icon-sizes 32")
+    parser.add_argument("--trim", action="store_true",
+                        help="also write a trimmed atlas with pivot offsets per scale")
+    parser.add_argument("--hull", action="store_true",
+                        help="with --trim, store a convex hull polygon per sprite")
+    parser.add_argument("--masks", action="store_true",
+                        help="write 1-bit picking masks per sprite (per atlas page with --trim)")
+    return parser
+
+
+def parse_scale_args(description: str, default_icon_sizes: tuple = ()) -> argparse.Namespace:
+    """Parse the shared --scales / --icon-sizes / --trim command line options."""
+    return scale_arg_parser(description, default_icon_sizes).parse_args()
+
+
+@trace_stage
+def make_icon(img: Image.Image, size: int) -> Image.Image:
+    """Downsample a rendered sprite so its longest side is `size` pixels."""
+    ratio = size / max(img.width, img.height)
+    icon_size = (max(1, round(img.width * ratio)), max(1, round(img.height * ratio)))
+    return img.resize(icon_size, Image.LANCZOS)
+
+
+def export_scales(sprites: dict, output_dir: str, scales: list,
+                  icon_sizes: list = (), writer=None, atlas_name: str = None,
+                  hull: bool = False, masks: bool = False) -> int:
+    """Render every sprite at every scale and write PNGs.
+
+    `sprites` maps name -> callable(scale) returning a PIL Image. Icons are
+    downsampled from the largest scale already rendered for that sprite.
+    With a sprite_writer.PipelinedWriter, encoding overlaps with rendering.
+    With `atlas_name`, each scale is also packed into a trimmed atlas
+    (<atlas_name>@2x.png/.json etc.).
+    With `masks`, a picking mask is written per atlas page, or per sprite
+    when there is no atlas.
+    Returns the number of files written.
+    """
+    def save(img: Image.Image, output_path: str) -> None:
+        if writer is not None:
+            writer.submit(img, output_path)
+            return
+        with trace_span("png_encode", path=output_path):
+            img.save(output_path, 'PNG')
+        print(f"  Created {output_path} ({img.width}x{img.height})")
+
+    os.makedirs(output_dir, exist_ok=True)
+    icon_dir = os.path.join(output_dir, "icons")
+    if icon_sizes:
+        os.makedirs(icon_dir, exist_ok=True)
+
+    written = 0
+    rendered = {scale: {} for scale in scales}
+    for name, create_func in sprites.items():
+        largest = None
+        for scale in sorted(scales):
+            with trace_sprite(f"{name}{scale_suffix(scale)}", scale=scale):
+                img = create_func(scale)
+            save(img, os.path.join(output_dir, f"{name}{scale_suffix(scale)}.png"))
+            written += 1
+            if masks and not atlas_name:
+                write_mask(img, os.path.join(output_dir, f"{name}{scale_suffix(scale)}.mask"))
+                written += 1
+            largest = img
+            if atlas_name:
+                rendered[scale][name] = img
+
+        for size in icon_sizes:
+            save(make_icon(largest, size), os.path.join(icon_dir, f"{name}_{size}.png"))
+            written += 1
+
+    if atlas_name:
+        for scale, images in rendered.items():
+            manifest_path = write_trimmed_atlas(images, output_dir, f"{atlas_name}{scale_suffix(scale)}",
+                                                hull, writer, masks)
+            print(f"  Created {manifest_path} ({len(images)} trimmed frames)")
+            written += 3 if masks else 2
+
+    return written
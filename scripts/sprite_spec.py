@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Declarative sprite specs compiled to cached draw programs.
+
+A spec file describes sprites as layered shapes instead of Python code:
+
+    {
+      "palette": {"rock_dark": "#4a4a4a", "outline": [0, 0, 0, 120]},
+      "sprites": {
+        "rock_small": {
+          "size": [64, 64],
+          "palette": {"rock_mid": "#6b6b6b"},
+          "layers": [
+            {"polygon": [[16, 48], [8, 38], [28, 22]], "fill": "rock_dark"},
+            {"ellipse": [8, 4, 56, 44], "outline": "outline", "width": 1},
+            {"line": [[0, 0], [8, 8]], "fill": "#ffffff", "width": 2}
+          ]
+        }
+      }
+    }
+
+Coordinates are design units (see sprite_scale). Colours are palette names
+(sprite palette first, then the file palette) or literal "#rrggbb",
+"#rrggbbaa" or [r, g, b(, a)]. Layers draw in order and, like ImageDraw on
+RGBA, each shape replaces the pixels it covers; a shape with fill and
+outline draws the fill first.
+
+Compilation happens in two cached steps:
+1. spec -> SpriteProgram: a flat OP_DTYPE array, one op per fill or
+   outline pass, with all points in one float array. Every colour is
+   resolved to a palette slot. Programs are memoized by a digest of the
+   spec, so identical specs compile once.
+2. program + scale -> index map: each op is rasterized once into a mask.
+   The map stores, for every pixel, the palette slot of the last op
+   covering it.
+
+Rendering is then a single gather from the palette through the index map.
+render_batch() renders any number of palette variants of one sprite in
+one array operation, with no per-shape Python work.
+
+Not run directly; imported by the generate_*.py scripts.
+"""
+
+from PIL import Image
+from sprite_profile import trace_stage
+from sprite_raster import default_backend
+from sprite_scale import ScaledDraw, scaled_size
+import numpy as np
+import functools
+import hashlib
+import json
+
+OP_POLYGON, OP_POLYGON_OUTLINE, OP_ELLIPSE, OP_ELLIPSE_OUTLINE, OP_LINE = range(5)
+OP_DTYPE = np.dtype([
+    ("kind", "u1"),
+    ("color", "<u2"),  # Palette slot
+    ("width", "u1"),
+    ("start", "<u4"),  # First value in SpriteProgram.coords
+    ("count", "<u4"),  # Number of values (2 per point, 4 for an ellipse box)
+])
+
+_programs = {}  # spec digest -> SpriteProgram
+
+
+def parse_color(value) -> tuple:
+    """Literal colour ("#rrggbb", "#rrggbbaa" or a list) -> RGBA tuple."""
+    if isinstance(value, str):
+        digits = value.lstrip('#')
+        if len(digits) not in (6, 8):
+            raise ValueError(f"bad colour {value!r}")
+        rgba = tuple(int(digits[i:i + 2], 16) for i in range(0, len(digits), 2))
+    else:
+        rgba = tuple(int(v) for v in value)
+    if len(rgba) not in (3, 4) or not all(0 <= v <= 255 for v in rgba):
+        raise ValueError(f"bad colour {value!r}")
+    return rgba + (255,) * (4 - len(rgba))
+
+
+class SpriteProgram:
+    """A compiled sprite: flat op list, packed coordinates and palette."""
+
+    def __init__(self, name: str, size: tuple, ops: np.ndarray, coords: np.ndarray,
+                 palette_names: list, palette: np.ndarray):
+        self.name = name
+        self.size = size
+        self.ops = ops
+        self.coords = coords
+        self.palette_names = palette_names
+        self.palette = palette  # (slots, 4) uint8; unnamed literal colours have name None
+        self._index_maps = {}  # (scale, raster backend) -> index map
+
+    def index_map(self, scale: float = 1.0) -> np.ndarray:
+        """(H, W) palette slot per pixel at `scale`; len(palette) = transparent."""
+        key = (scale, default_backend())
+        if key not in self._index_maps:
+            self._index_maps[key] = self._rasterize(scale)
+        return self._index_maps[key]
+
+    @trace_stage
+    def _rasterize(self, scale: float) -> np.ndarray:
+        size = scaled_size(*self.size, scale)
+        index = np.full((size[1], size[0]), len(self.palette), dtype=np.uint16)
+        for kind, color, width, start, count in self.ops.tolist():
+            values = self.coords[start:start + count].tolist()
+            mask = Image.new('L', size, 0)
+            draw = ScaledDraw(mask, scale)
+            if kind in (OP_POLYGON, OP_POLYGON_OUTLINE, OP_LINE):
+                points = list(zip(values[0::2], values[1::2]))
+                if kind == OP_POLYGON:
+                    draw.polygon(points, fill=255)
+                elif kind == OP_POLYGON_OUTLINE:
+                    draw.polygon(points, outline=255, width=width)
+                else:
+                    draw.line(points, fill=255, width=width)
+            elif kind == OP_ELLIPSE:
+                draw.ellipse(values, fill=255)
+            else:
+                draw.ellipse(values, outline=255, width=width)
+            index[np.asarray(mask) > 0] = color
+        return index
+
+    def _palette_table(self, overrides: dict = None) -> np.ndarray:
+        table = np.zeros((len(self.palette) + 1, 4), dtype=np.uint8)
+        table[:-1] = self.palette
+        for name, value in (overrides or {}).items():
+            if name not in self.palette_names:
+                raise KeyError(f"{self.name}: no palette entry {name!r}")
+            table[self.palette_names.index(name)] = parse_color(value)
+        return table
+
+    def render(self, scale: float = 1.0, palette: dict = None) -> Image.Image:
+        """Render one sprite, optionally with palette overrides {name: colour}."""
+        return Image.fromarray(self._palette_table(palette)[self.index_map(scale)], 'RGBA')
+
+    @trace_stage
+    def render_batch(self, palettes: list, scale: float = 1.0) -> np.ndarray:
+        """Render one sprite per palette override dict as (N, H, W, 4) uint8."""
+        tables = np.stack([self._palette_table(p) for p in palettes])
+        return tables[:, self.index_map(scale)]
+
+
+def compile_sprite(name: str, sprite: dict, palette: dict = None) -> SpriteProgram:
+    """Compile one sprite spec (memoized on the spec's content)."""
+    palette = {**(palette or {}), **sprite.get("palette", {})}
+    digest = hashlib.sha1(json.dumps([name, sprite, palette], sort_keys=True).encode()).hexdigest()
+    if digest in _programs:
+        return _programs[digest]
+
+    palette_names, colors, slots = [], [], {}
+
+    def slot(ref) -> int:
+        key = json.dumps(ref)
+        if key not in slots:
+            if isinstance(ref, str) and ref in palette:
+                palette_names.append(ref)
+                colors.append(parse_color(palette[ref]))
+            elif isinstance(ref, str) and not ref.startswith('#'):
+                raise ValueError(f"{name}: unknown palette colour {ref!r}")
+            else:
+                palette_names.append(None)
+                colors.append(parse_color(ref))
+            slots[key] = len(colors) - 1
+        return slots[key]
+
+    ops, coords = [], []
+
+    def add(kind: int, color, values: list, width: int = 1) -> None:
+        ops.append((kind, slot(color), width, len(coords), len(values)))
+        coords.extend(values)
+
+    for i, layer in enumerate(sprite["layers"]):
+        width = layer.get("width", 1)
+        if "polygon" in layer:
+            points = [v for point in layer["polygon"] for v in point]
+            if "fill" in layer:
+                add(OP_POLYGON, layer["fill"], points)
+            if "outline" in layer:
+                add(OP_POLYGON_OUTLINE, layer["outline"], points, width)
+        elif "ellipse" in layer:
+            if len(layer["ellipse"]) != 4:
+                raise ValueError(f"{name}: layer {i}: ellipse needs [x0, y0, x1, y1]")
+            if "fill" in layer:
+                add(OP_ELLIPSE, layer["fill"], list(layer["ellipse"]))
+            if "outline" in layer:
+                add(OP_ELLIPSE_OUTLINE, layer["outline"], list(layer["ellipse"]), width)
+        elif "line" in layer:
+            add(OP_LINE, layer["fill"], [v for point in layer["line"] for v in point], width)
+        else:
+            raise ValueError(f"{name}: layer {i}: expected polygon, ellipse or line")
+
+    program = SpriteProgram(name, tuple(sprite["size"]), np.array(ops, dtype=OP_DTYPE),
+                            np.array(coords, dtype=np.float32), palette_names,
+                            np.array(colors, dtype=np.uint8).reshape(-1, 4))
+    _programs[digest] = program
+    return program
+
+
+def load_spec(path: str) -> dict:
+    """Compile every sprite in a spec file. Returns name -> SpriteProgram."""
+    with open(path) as f:
+        spec = json.load(f)
+    return {name: compile_sprite(name, sprite, spec.get("palette"))
+            for name, sprite in spec["sprites"].items()}
+
+
+def spec_sprites(path: str) -> dict:
+    """Map name -> callable(scale) for export_scales, from a spec file."""
+    return {name: functools.partial(_render_program, program)
+            for name, program in load_spec(path).items()}
+
+
+def _render_program(program: SpriteProgram, scale: float = 1.0) -> Image.Image:
+    return program.render(scale)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Transparent-border trimming and trimmed atlas packing for sprite generators.
+
+Most sprites cover a small part of their canvas: decorations sit in the
+middle of a 64x64 tile and river tiles only fill the inner diamond. Trimming
+each sprite to its alpha bounding box and packing the results into one atlas
+cuts both the atlas area and the pixels sampled at runtime.
+
+Placement on screen does not change. For every sprite the manifest records:
+- frame        - [x, y, w, h] of the trimmed pixels in the atlas
+- source_size  - [w, h] of the untrimmed canvas
+- trim_offset  - [x, y] of the trimmed rect inside the canvas
+- pivot        - the canvas pivot (its centre, where a centered Godot
+                 Sprite2D anchors) relative to the trimmed rect
+- hull         - optional convex hull of the opaque pixels, as polygon
+                 points relative to the trimmed rect (for tight meshes)
+
+With mask=True the atlas page also gets a 1-bit picking mask (see
+sprite_mask), named by the manifest's top-level "mask" entry.
+
+Not run directly; imported by the generate_*.py scripts.
+"""
+
+from PIL import Image
+from sprite_mask import write_mask
+from sprite_profile import trace_stage
+import numpy as np
+import json
+import os
+
+ATLAS_MAX_WIDTH = 1024
+ATLAS_PADDING = 1  # Transparent gap between frames (avoids filter bleeding)
+
+
+def alpha_bounds(frames: np.ndarray) -> np.ndarray:
+    """Tight alpha bounding boxes for a batch of same-size RGBA frames.
+
+    `frames` is (N, H, W, 4). Returns (N, 4) ints [x0, y0, x1, y1] with
+    exclusive x1/y1; fully transparent frames get an empty box at 0.
+    """
+    opaque = frames[..., 3] > 0
+    cols = opaque.any(axis=1)  # (N, W)
+    rows = opaque.any(axis=2)  # (N, H)
+    width, height = cols.shape[1], rows.shape[1]
+
+    x0 = cols.argmax(axis=1)
+    x1 = width - cols[:, ::-1].argmax(axis=1)
+    y0 = rows.argmax(axis=1)
+    y1 = height - rows[:, ::-1].argmax(axis=1)
+
+    bounds = np.stack([x0, y0, x1, y1], axis=1)
+    bounds[~cols.any(axis=1)] = 0
+    return bounds
+
+
+def convex_hull(alpha: np.ndarray) -> list:
+    """Convex hull of the opaque pixels of one alpha array, in pixel corners.
+
+    Only the leftmost and rightmost opaque pixel of each row can lie on the
+    hull, so their corners are collected with array ops and passed to a
+    monotone chain. Returns counter-clockwise [x, y] points.
+    """
+    opaque = alpha > 0
+    rows = np.flatnonzero(opaque.any(axis=1))
+    if rows.size == 0:
+        return []
+    width = opaque.shape[1]
+    left = opaque[rows].argmax(axis=1)
+    right = width - opaque[rows, ::-1].argmax(axis=1)
+
+    xs = np.concatenate([left, left, right, right])
+    ys = np.concatenate([rows, rows + 1, rows, rows + 1])
+    points = sorted(set(zip(xs.tolist(), ys.tolist())))
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return [list(p) for p in lower[:-1] + upper[:-1]]
+
+
+def shelf_pack(sizes: list, max_width: int = ATLAS_MAX_WIDTH,
+               padding: int = ATLAS_PADDING) -> tuple:
+    """Pack (w, h) rects into rows, tallest first.
+
+    Returns ([(x, y)] in input order, (atlas_width, atlas_height)).
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf_height = atlas_width = 0
+    for i in order:
+        w, h = sizes[i]
+        if x > 0 and x + w > max_width:
+            x, y = 0, y + shelf_height + padding
+            shelf_height = 0
+        positions[i] = (x, y)
+        atlas_width = max(atlas_width, x + w)
+        shelf_height = max(shelf_height, h)
+        x += w + padding
+    return positions, (max(1, atlas_width), max(1, y + shelf_height))
+
+
+@trace_stage
+def trim_sprites(sprites: dict, hull: bool = False) -> dict:
+    """Trim every sprite to its alpha bounds.
+
+    `sprites` maps name -> RGBA Image. Sprites are batched by canvas size so
+    bounds are found in one vectorized pass per size. Returns name ->
+    (trimmed pixels, manifest entry without `frame`).
+    """
+    by_size = {}
+    for name, img in sprites.items():
+        by_size.setdefault(img.size, []).append(name)
+
+    trimmed = {}
+    for (width, height), names in by_size.items():
+        frames = np.stack([np.asarray(sprites[name].convert('RGBA')) for name in names])
+        for name, frame, (x0, y0, x1, y1) in zip(names, frames, alpha_bounds(frames).tolist()):
+            pixels = frame[y0:y1, x0:x1]
+            entry = {
+                "source_size": [width, height],
+                "trim_offset": [x0, y0],
+                "pivot": [width / 2 - x0, height / 2 - y0],
+            }
+            if hull:
+                entry["hull"] = convex_hull(pixels[..., 3])
+            trimmed[name] = (pixels, entry)
+    return trimmed
+
+
+def build_trimmed_atlas(sprites: dict, hull: bool = False) -> tuple:
+    """Trim and pack sprites into one atlas. Returns (atlas Image, manifest)."""
+    trimmed = trim_sprites(sprites, hull)
+    names = list(trimmed)
+    sizes = [(trimmed[n][0].shape[1], trimmed[n][0].shape[0]) for n in names]
+    positions, (atlas_width, atlas_height) = shelf_pack(sizes)
+
+    atlas = np.zeros((atlas_height, atlas_width, 4), dtype=np.uint8)
+    frames = {}
+    for name, (x, y), (w, h) in zip(names, positions, sizes):
+        pixels, entry = trimmed[name]
+        atlas[y:y + h, x:x + w] = pixels
+        frames[name] = {"frame": [x, y, w, h], **entry}
+
+    source_area = sum(e["source_size"][0] * e["source_size"][1] for e in frames.values())
+    trimmed_area = sum(w * h for w, h in sizes)
+    manifest = {
+        "atlas_size": [atlas_width, atlas_height],
+        "source_area": source_area,
+        "trimmed_area": trimmed_area,
+        "frames": frames,
+    }
+    return Image.fromarray(atlas, 'RGBA'), manifest
+
+
+def write_trimmed_atlas(sprites: dict, output_dir: str, atlas_name: str,
+                        hull: bool = False, writer=None, mask: bool = False) -> str:
+    """Write <atlas_name>.png and <atlas_name>.json (and <atlas_name>.mask).
+
+    Returns the manifest path.
+    """
+    atlas, manifest = build_trimmed_atlas(sprites, hull)
+    manifest = {"atlas": f"{atlas_name}.png", **manifest}
+    if mask:
+        manifest = {"mask": f"{atlas_name}.mask", **manifest}
+        write_mask(atlas, os.path.join(output_dir, f"{atlas_name}.mask"))
+
+    atlas_path = os.path.join(output_dir, f"{atlas_name}.png")
+    if writer is not None:
+        writer.submit(atlas, atlas_path)
+    else:
+        atlas.save(atlas_path, 'PNG')
+        print(f"  Created {atlas_path} ({atlas.width}x{atlas.height})")
+
+    manifest_path = os.path.join(output_dir, f"{atlas_name}.json")
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Pipelined PNG encoding and writing for sprite generators.
+
+PNG (zlib) encoding releases the GIL, so it can run on writer threads while
+the main thread renders the next sprite. PipelinedWriter feeds a bounded
+queue into a small thread pool; submit() blocks when the queue is full, which
+caps how many rendered images are held in memory at once.
+
+On close it reports total encode time (summed over writer threads) and how
+much encoding was hidden behind rendering: the wall-clock time during which
+at least one writer was encoding, minus the time the main thread spent
+waiting on the writer.
+
+Not run directly; imported by the generate_*.py scripts.
+"""
+
+from PIL import Image
+from sprite_profile import trace_span
+import queue
+import threading
+import time
+
+WRITER_THREADS = 2
+MAX_PENDING = 4  # Rendered images allowed in flight (back-pressure limit)
+
+
+class PipelinedWriter:
+    """Encode and save images on background threads.
+
+    Use as a context manager; leaving the block waits for all writes and
+    prints a summary. If the block raises, that exception wins over any
+    write error. Images must not be modified after submit().
+    """
+
+    def __init__(self, threads: int = WRITER_THREADS, max_pending: int = MAX_PENDING,
+                 verbose: bool = True):
+        self.verbose = verbose
+        self.files = 0
+        self.encode_time = 0.0  # Summed over writer threads
+        self.busy_time = 0.0    # Wall clock with at least one writer encoding
+        self.wait_time = 0.0
+        self._active = 0
+        self._busy_since = 0.0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._error = None
+        self._threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(threads)]
+        for thread in self._threads:
+            thread.start()
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            img, path = item
+            with self._lock:
+                start = time.perf_counter()
+                if self._active == 0:
+                    self._busy_since = start
+                self._active += 1
+            try:
+                with trace_span("png_encode", path=path):
+                    img.save(path, 'PNG')
+                with self._lock:
+                    self.files += 1
+                    if self.verbose:
+                        print(f"  Created {path} ({img.width}x{img.height})")
+            except Exception as e:  # Re-raised on the main thread
+                with self._lock:
+                    self._error = self._error or e
+            finally:
+                with self._lock:
+                    end = time.perf_counter()
+                    self.encode_time += end - start
+                    self._active -= 1
+                    if self._active == 0:
+                        self.busy_time += end - self._busy_since
+                self._queue.task_done()
+
+    def submit(self, img: Image.Image, path: str) -> None:
+        """Queue an image for encoding; blocks while the queue is full."""
+        if self._error:
+            raise self._error
+        start = time.perf_counter()
+        self._queue.put((img, path))
+        self.wait_time += time.perf_counter() - start
+
+    def close(self) -> None:
+        """Wait for all queued writes and stop the writer threads."""
+        start = time.perf_counter()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self.wait_time += time.perf_counter() - start
+        if self._error:
+            raise self._error
+
+    @property
+    def hidden_time(self) -> float:
+        """Wall-clock encoding that overlapped with rendering on the main thread."""
+        return max(0.0, self.busy_time - self.wait_time)
+
+    def summary(self) -> str:
+        return (f"Encoded {self.files} PNGs in {self.encode_time:.2f}s "
+                f"({self.busy_time:.2f}s wall), {self.hidden_time:.2f}s hidden behind rendering")
+
+    def __enter__(self) -> "PipelinedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            # Still stop the writers, but let the body's exception propagate:
+            # a write error raised here would hide the render failure
+            try:
+                self.close()
+            except Exception:
+                pass
+            return
+        self.close()
+        if self.verbose:
+            print(f"  {self.summary()}")
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Watch generator sources and data, re-rendering only the affected sprites.
+
+Polls scripts/generate_*.py, the shared scripts/sprite_*.py helpers,
+data/blocks.json and data/terrain.json. On a change it works out which
+sprites could render differently and rewrites just those PNGs.
+
+Dependency tracking is per top-level definition. Each script is parsed
+with ast, and every function, class and constant is fingerprinted by its
+unparsed source, so comment and whitespace edits do not count. A sprite's
+fingerprint combines:
+- the definitions reachable from its create function, following name
+  references inside the module and `from sprite_x import y` into helpers
+- the arguments bound to it (the block colours in a BLOCK_COLORS
+  partial, the scale)
+- the contents of any watched data file named by a reachable constant
+  (e.g. TERRAIN_CONFIG = "data/terrain.json")
+
+Changed modules are reloaded with importlib, along with every module that
+imports from them. Then the sprite tables are rebuilt, and sprites whose
+fingerprint changed (or whose output is missing) are rendered again. Editing
+one polygon in create_corner_ne re-renders corner_ne only; editing one
+colour in BLOCK_COLORS re-renders that block only.
+
+Watched sprites are the sprite_catalog entries at 1x (or --scales for
+scalable ones): blocks, decorations, river tiles, underground layers,
+backgrounds and ground textures. Atlases, icons and other derived outputs
+still come from the generators themselves.
+
+Usage: python3 scripts/watch_sprites.py [--scales 1 2] [--interval 0.25]
+"""
+
+from sprite_profile import trace_span
+import argparse
+import ast
+import functools
+import hashlib
+import importlib
+import inspect
+import os
+import sprite_catalog
+import sys
+import time
+import traceback
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FILES = ("data/blocks.json", "data/terrain.json")
+POLL_INTERVAL = 0.25  # Seconds between mtime checks
+
+
+def watched_files() -> list:
+    """Scripts and data files to poll."""
+    scripts = sorted(
+        os.path.join(SCRIPTS_DIR, f) for f in os.listdir(SCRIPTS_DIR)
+        if f.endswith(".py") and f.startswith(("generate_", "sprite_"))
+    )
+    return scripts + [f for f in DATA_FILES if os.path.exists(f)]
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.encode() if isinstance(part, str) else part)
+    return h.hexdigest()
+
+
+class SourceIndex:
+    """Top-level definitions of one script, fingerprinted by unparsed source."""
+
+    def __init__(self, path: str):
+        with open(path) as f:
+            tree = ast.parse(f.read(), path)
+
+        self.defs = {}     # name -> (digest, referenced names)
+        self.imports = {}  # local name -> (module, name) for sibling scripts
+        self.paths = {}    # constant name -> string value
+        for node in tree.body:
+            if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                if os.path.exists(os.path.join(SCRIPTS_DIR, f"{node.module}.py")):
+                    for alias in node.names:
+                        self.imports[alias.asname or alias.name] = (node.module, alias.name)
+                continue
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names = [node.name]
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                names = [t.id for t in targets if isinstance(t, ast.Name)]
+                if isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+                    self.paths.update({name: node.value.value for name in names})
+            else:
+                continue
+            refs = {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+            for name in names:
+                self.defs[name] = (_digest(ast.unparse(node)), refs - {name})
+
+    @property
+    def local_imports(self) -> set:
+        return {module for module, _ in self.imports.values()}
+
+
+class DependencyTracker:
+    """Fingerprints sprites from the definitions they can reach."""
+
+    def __init__(self):
+        self._indexes = {}  # module -> (mtime_ns, SourceIndex)
+
+    def index(self, module: str) -> SourceIndex:
+        path = os.path.join(SCRIPTS_DIR, f"{module}.py")
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._indexes.get(module)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, SourceIndex(path))
+            self._indexes[module] = cached
+        return cached[1]
+
+    def dependents(self, changed: set) -> list:
+        """Changed modules plus everything importing them, dependencies first."""
+        modules = [os.path.splitext(f)[0] for f in os.listdir(SCRIPTS_DIR)
+                   if f.endswith(".py") and f.startswith(("generate_", "sprite_"))]
+        order, visiting = [], set()
+
+        def visit(module: str) -> bool:
+            """Add `module` (after its imports) if it depends on a change."""
+            if module in order:
+                return True
+            if module in visiting:
+                return False
+            visiting.add(module)
+            affected = module in changed
+            for imported in sorted(self.index(module).local_imports):
+                affected |= visit(imported)
+            if affected:
+                order.append(module)
+            return affected
+
+        for module in sorted(modules):
+            visit(module)
+        return order
+
+    def closure(self, module: str, name: str, data_digests: dict) -> str:
+        """Digest of every definition and data file reachable from module.name."""
+        seen, parts = set(), []
+        stack = [(module, name)]
+        while stack:
+            key = stack.pop()
+            if key in seen:
+                continue
+            seen.add(key)
+            index = self.index(key[0])
+            if key[1] in index.imports:
+                stack.append(index.imports[key[1]])
+                continue
+            if key[1] not in index.defs:
+                continue  # Builtin, parameter or local name
+            digest, refs = index.defs[key[1]]
+            parts.append(f"{key[0]}.{key[1]}:{digest}")
+            if index.paths.get(key[1]) in data_digests:
+                parts.append(data_digests[index.paths[key[1]]])
+            stack.extend((key[0], ref) for ref in refs if ref in index.defs or ref in index.imports)
+        return _digest(*sorted(parts))
+
+    def fingerprint(self, render, data_digests: dict) -> str:
+        """Fingerprint a render callable: its function's closure plus bound args."""
+        args, keywords = (), {}
+        if isinstance(render, functools.partial):
+            args, keywords = render.args, render.keywords
+            render = render.func
+        func = inspect.unwrap(render)
+        return _digest(self.closure(func.__module__, func.__name__, data_digests),
+                       repr(args), repr(sorted(keywords.items())))
+
+
+def watch_targets(modules: dict, scales: list) -> dict:
+    """Map output path -> callable() returning the sprite Image."""
+    targets = {}
+    for entry in sprite_catalog.sprite_catalog(modules).values():
+        for scale in (scales if entry["scalable"] else [1.0]):
+            targets[sprite_catalog.output_path(entry, scale)] = sprite_catalog.sprite_call(entry, scale=scale)
+    return targets
+
+
+class SpriteWatcher:
+    """Polls watched files and keeps sprite outputs in step with them."""
+
+    def __init__(self, scales: list):
+        self.scales = scales
+        self.tracker = DependencyTracker()
+        self.modules = sprite_catalog.load_modules()
+        self.mtimes = self._mtimes()
+        self.fingerprints = {}
+
+    def _mtimes(self) -> dict:
+        return {path: os.stat(path).st_mtime_ns for path in watched_files()}
+
+    def _data_digests(self) -> dict:
+        digests = {}
+        for path in DATA_FILES:
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    digests[path] = _digest(f.read())
+        return digests
+
+    def _reload(self, changed_paths: list) -> None:
+        changed = {os.path.splitext(os.path.basename(p))[0] for p in changed_paths if p.endswith(".py")}
+        for module in self.tracker.dependents(changed):
+            if module in sys.modules:
+                importlib.reload(sys.modules[module])
+        self.modules = {name: sys.modules[name] for name in sprite_catalog.CATALOG_MODULES}
+
+    def update(self, changed_paths: list = ()) -> int:
+        """Reload, re-fingerprint and render stale sprites. Returns sprites written."""
+        start = time.perf_counter()
+        if changed_paths:
+            self._reload(changed_paths)
+
+        data_digests = self._data_digests()
+        targets = watch_targets(self.modules, self.scales)
+        rendered = 0
+        for path, render in targets.items():
+            fingerprint = self.tracker.fingerprint(render, data_digests)
+            if self.fingerprints.get(path) == fingerprint and os.path.exists(path):
+                continue
+            # The first pass only records fingerprints; existing files are kept
+            if path in self.fingerprints or not os.path.exists(path):
+                with trace_span("watch_render", path=path):
+                    img = render()
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                img.save(path, 'PNG')
+                print(f"  Updated {path} ({img.width}x{img.height})")
+                rendered += 1
+            self.fingerprints[path] = fingerprint
+
+        if changed_paths:
+            names = ", ".join(os.path.relpath(p) for p in changed_paths)
+            print(f"  {names}: {rendered} of {len(targets)} sprites re-rendered "
+                  f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return rendered
+
+    def poll(self) -> list:
+        """Paths whose mtime changed since the last poll."""
+        mtimes = self._mtimes()
+        changed = [path for path, mtime in mtimes.items() if self.mtimes.get(path) != mtime]
+        self.mtimes = mtimes
+        return changed
+
+    def run(self, interval: float) -> None:
+        self.update()
+        print(f"Watching {len(self.mtimes)} files ({len(self.fingerprints)} sprites), Ctrl+C to stop")
+        while True:
+            time.sleep(interval)
+            changed = self.poll()
+            if not changed:
+                continue
+            try:
+                self.update(changed)
+            except SyntaxError as e:  # Half-saved edit; wait for the next save
+                print(f"  {os.path.relpath(e.filename)}:{e.lineno}: {e.msg}")
+            except Exception:  # Keep watching through broken edits
+                traceback.print_exc()
+                print("  Update failed; waiting for the next change")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-render sprites affected by source or data changes.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0],
+                        help="scales to keep up to date for scalable sprites")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL,
+                        help="seconds between polls")
+    args = parser.parse_args()
+
+    watcher = SpriteWatcher(args.scales)
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+
+if __name__ == "__main__":
+    main()